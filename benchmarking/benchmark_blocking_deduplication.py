@@ -0,0 +1,53 @@
+# python3 -m pytest benchmarking/benchmark_blocking_deduplication.py
+from itertools import combinations
+
+import pandas as pd
+import pytest
+
+from splink.blocking import block_using_rules_sqls
+from splink.duckdb.linker import DuckDBLinker
+
+df = pd.read_csv("./benchmarking/fake_20000_from_splink_demos.csv")
+
+columns = ["first_name", "surname", "dob", "city", "email"]
+
+# Each pair of columns, first exactly and then on their first three characters
+blocking_rules = [
+    f"l.{col_1} = r.{col_1} and l.{col_2} = r.{col_2}"
+    for col_1, col_2 in combinations(columns, 2)
+] + [
+    f"substr(l.{col_1}, 1, 3) = substr(r.{col_1}, 1, 3) "
+    f"and substr(l.{col_2}, 1, 3) = substr(r.{col_2}, 1, 3)"
+    for col_1, col_2 in combinations(columns, 2)
+]
+
+
+def block_pairs(linker):
+    df_concat_with_tf = linker._initialise_df_concat_with_tf()
+    for sql in block_using_rules_sqls(linker):
+        linker._enqueue_sql(
+            sql["sql"], sql["output_table_name"], sql.get("materialise")
+        )
+    df_blocked = linker._execute_sql_pipeline([df_concat_with_tf], use_cache=False)
+    row_count = df_blocked._row_count()
+    df_blocked.drop_table_from_database_and_remove_from_cache()
+    return row_count
+
+
+@pytest.mark.parametrize("strategy", ["evaluate_rules", "hashed_match_keys"])
+@pytest.mark.parametrize("num_rules", [5, 10, 20])
+def test_blocking_deduplication(benchmark, num_rules, strategy):
+    settings = {
+        "link_type": "dedupe_only",
+        "blocking_rules_to_generate_predictions": blocking_rules[:num_rules],
+    }
+    linker = DuckDBLinker(df, settings, set_up_basic_logging=False)
+    linker.set_blocking_deduplication_strategy(strategy)
+
+    benchmark.pedantic(
+        block_pairs,
+        args=(linker,),
+        rounds=5,
+        iterations=1,
+        warmup_rounds=1,
+    )
@@ -0,0 +1,46 @@
+# python3 -m pytest benchmarking/benchmark_blocking_pair_generation.py
+import pandas as pd
+import pytest
+
+from splink.blocking import block_using_rules_sqls
+from splink.duckdb.linker import DuckDBLinker
+
+df = pd.read_csv("./benchmarking/fake_20000_from_splink_demos.csv")
+
+# From small blocks to large ones
+blocking_rules = {
+    "surname": "l.surname = r.surname",
+    "year_of_birth": "substr(l.dob, 1, 4) = substr(r.dob, 1, 4)",
+    "city": "l.city = r.city",
+}
+
+
+def block_pairs(linker):
+    df_concat_with_tf = linker._initialise_df_concat_with_tf()
+    for sql in block_using_rules_sqls(linker):
+        linker._enqueue_sql(
+            sql["sql"], sql["output_table_name"], sql.get("materialise")
+        )
+    df_blocked = linker._execute_sql_pipeline([df_concat_with_tf], use_cache=False)
+    row_count = df_blocked._row_count()
+    df_blocked.drop_table_from_database_and_remove_from_cache()
+    return row_count
+
+
+@pytest.mark.parametrize("strategy", ["join", "groupwise"])
+@pytest.mark.parametrize("rule", blocking_rules.keys())
+def test_blocking_pair_generation(benchmark, rule, strategy):
+    settings = {
+        "link_type": "dedupe_only",
+        "blocking_rules_to_generate_predictions": [blocking_rules[rule]],
+    }
+    linker = DuckDBLinker(df, settings, set_up_basic_logging=False)
+    linker.set_blocking_pair_generation_strategy(strategy)
+
+    benchmark.pedantic(
+        block_pairs,
+        args=(linker,),
+        rounds=5,
+        iterations=1,
+        warmup_rounds=1,
+    )
@@ -0,0 +1,33 @@
+# python3 -m pytest benchmarking/benchmark_import_time.py
+import subprocess
+import sys
+
+# Import in a fresh interpreter each round, since modules are only imported once
+# per process
+IMPORT_SCRIPT = "import splink.duckdb.linker"
+
+
+def import_splink_in_fresh_interpreter():
+    subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], check=True)
+
+
+def start_interpreter():
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+
+
+def test_import_duckdb_linker(benchmark):
+    benchmark.pedantic(
+        import_splink_in_fresh_interpreter,
+        rounds=10,
+        iterations=1,
+        warmup_rounds=1,
+    )
+
+
+def test_interpreter_startup_baseline(benchmark):
+    benchmark.pedantic(
+        start_interpreter,
+        rounds=10,
+        iterations=1,
+        warmup_rounds=1,
+    )
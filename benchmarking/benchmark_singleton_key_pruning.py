@@ -0,0 +1,47 @@
+# python3 -m pytest benchmarking/benchmark_singleton_key_pruning.py
+import pandas as pd
+import pytest
+
+from splink.blocking import block_using_rules_sqls
+from splink.duckdb.linker import DuckDBLinker
+
+df = pd.read_csv("./benchmarking/fake_20000_from_splink_demos.csv")
+
+# Around 70% of records have a unique or null value of the join keys of each rule
+blocking_rules = [
+    "l.surname = r.surname and l.dob = r.dob",
+    "l.first_name = r.first_name and l.surname = r.surname",
+    "l.first_name = r.first_name and l.dob = r.dob",
+]
+
+
+def block_pairs(linker):
+    df_concat_with_tf = linker._initialise_df_concat_with_tf()
+    for sql in block_using_rules_sqls(linker):
+        linker._enqueue_sql(
+            sql["sql"], sql["output_table_name"], sql.get("materialise")
+        )
+    df_blocked = linker._execute_sql_pipeline([df_concat_with_tf], use_cache=False)
+    row_count = df_blocked._row_count()
+    df_blocked.drop_table_from_database_and_remove_from_cache()
+    return row_count
+
+
+@pytest.mark.parametrize("singleton_key_pruning", [False, True])
+def test_singleton_key_pruning(benchmark, singleton_key_pruning):
+    settings = {
+        "link_type": "dedupe_only",
+        "blocking_rules_to_generate_predictions": blocking_rules,
+        # The columns of both records are read by the join, as when predicting
+        "additional_columns_to_retain": ["first_name", "surname", "dob", "city"],
+    }
+    linker = DuckDBLinker(df, settings, set_up_basic_logging=False)
+    linker.set_singleton_key_pruning(singleton_key_pruning)
+
+    benchmark.pedantic(
+        block_pairs,
+        args=(linker,),
+        rounds=5,
+        iterations=1,
+        warmup_rounds=1,
+    )
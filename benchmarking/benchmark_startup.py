@@ -0,0 +1,67 @@
+# python3 -m pytest benchmarking/benchmark_startup.py
+import pandas as pd
+
+import splink.duckdb.comparison_library as cl
+from splink.duckdb.linker import DuckDBLinker
+from splink.sqlglot_cache import clear_sqlglot_caches
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+columns = ["first_name", "surname", "city", "email"]
+
+comparisons = []
+for col in columns:
+    comparisons.extend(
+        [
+            cl.exact_match(col, term_frequency_adjustments=True),
+            cl.levenshtein_at_thresholds(col, [1, 2]),
+            cl.jaro_winkler_at_thresholds(col, [0.9, 0.7]),
+            cl.jaccard_at_thresholds(col, [0.9, 0.7]),
+        ]
+    )
+# Output column names must be unique
+for i, comparison in enumerate(comparisons):
+    comparison._comparison_dict["output_column_name"] = f"comparison_{i}"
+
+settings = {
+    "link_type": "dedupe_only",
+    "comparisons": comparisons,
+    "blocking_rules_to_generate_predictions": [
+        "l.first_name = r.first_name",
+        "l.surname = r.surname",
+        "l.city = r.city and l.email = r.email",
+    ],
+    "retain_matching_columns": True,
+    "retain_intermediate_calculation_columns": True,
+}
+
+
+def construct_linker_and_generate_sql():
+    linker = DuckDBLinker(df, settings)
+    settings_obj = linker._settings_obj
+    for br in settings_obj._blocking_rules_to_generate_predictions:
+        br._equi_join_conditions
+    settings_obj._columns_to_select_for_blocking
+    settings_obj._columns_to_select_for_comparison_vector_values
+    settings_obj._columns_to_select_for_bayes_factor_parts
+    settings_obj._columns_to_select_for_predict
+
+
+def test_linker_construction_cold(benchmark):
+    benchmark.pedantic(
+        construct_linker_and_generate_sql,
+        setup=clear_sqlglot_caches,
+        rounds=10,
+        iterations=1,
+        warmup_rounds=0,
+    )
+
+
+def test_linker_construction_warm(benchmark):
+    construct_linker_and_generate_sql()
+    benchmark.pedantic(
+        construct_linker_and_generate_sql,
+        rounds=10,
+        iterations=1,
+        warmup_rounds=1,
+    )
@@ -3,9 +3,14 @@ from __future__ import annotations
 from copy import deepcopy
 from typing import TYPE_CHECKING, Union
 
-import pandas as pd
-
-from .blocking import BlockingRule, _sql_gen_where_condition, block_using_rules_sqls
+from .blocking import (
+    BlockingRule,
+    SortedNeighbourhoodBlockingRule,
+    _sql_gen_where_condition,
+    block_using_rules_sqls,
+    materialise_nearest_neighbour_id_tables,
+    materialise_sorted_neighbourhood_id_tables,
+)
 from .misc import calculate_cartesian, calculate_reduction_ratio
 
 # https://stackoverflow.com/questions/39740632/python-type-hinting-without-cyclic-imports
@@ -36,6 +41,31 @@ def number_of_comparisons_generated_by_blocking_rule_post_filters_sql(
     return sql
 
 
+def number_of_comparisons_generated_by_sorted_neighbourhood_rule_sqls(
+    linker: Linker,
+    blocking_rule: SortedNeighbourhoodBlockingRule,
+):
+    """SQL to count the comparisons generated by a sorted neighbourhood blocking
+    rule from the records in `__splink__df_concat`"""
+    sqls = []
+
+    sql = blocking_rule.sorted_records_sql(linker, "__splink__df_concat")
+    sqls.append({"sql": sql, "output_table_name": "__splink__df_sorted_neighbourhood"})
+
+    sql = blocking_rule.marginal_neighbour_id_pairs_table_sql(
+        linker, "__splink__df_sorted_neighbourhood"
+    )
+    sqls.append({"sql": sql, "output_table_name": "__splink__neighbour_ids"})
+
+    sql = """
+    select count(*) as count_of_pairwise_comparisons_generated
+    from __splink__neighbour_ids
+    """
+    sqls.append({"sql": sql, "output_table_name": "__splink__analyse_blocking_rule"})
+
+    return sqls
+
+
 def cumulative_comparisons_generated_by_blocking_rules(
     linker: Linker, blocking_rules, output_chart=True, return_dataframe=False
 ):
@@ -82,6 +112,11 @@ def cumulative_comparisons_generated_by_blocking_rules(
 
         cartesian = calculate_cartesian(row_count_df, settings_obj._link_type)
 
+    sorted_neighbourhood_brs = materialise_sorted_neighbourhood_id_tables(
+        linker, concat
+    )
+    nearest_neighbour_brs = materialise_nearest_neighbour_id_tables(linker, concat)
+
     # Calculate the total number of rows generated by each blocking rule
     sql_infos = block_using_rules_sqls(linker)
     for sql_info in sql_infos:
@@ -105,6 +140,8 @@ def cumulative_comparisons_generated_by_blocking_rules(
         br_n["row_count"] = []
         br_n["match_key"] = []
     cumulative_blocking_rule_count.drop_table_from_database_and_remove_from_cache()
+    [b.drop_materialised_id_pairs_dataframe() for b in sorted_neighbourhood_brs]
+    [b.drop_materialised_id_pairs_dataframe() for b in nearest_neighbour_brs]
     br_count, br_keys = list(br_n["row_count"]), list(br_n["match_key"].astype("int"))
 
     if len(br_count) != len(brs_as_objs):
@@ -144,17 +181,34 @@ def cumulative_comparisons_generated_by_blocking_rules(
     linker._analyse_blocking_mode = False
 
     if return_dataframe:
+        import pandas as pd
+
         return pd.DataFrame(br_comparisons)
     else:
         return br_comparisons
 
 
 def count_comparisons_from_blocking_rule_pre_filter_conditions_sqls(
-    linker: "Linker", blocking_rule: Union[str, "BlockingRule"]
+    linker: "Linker",
+    blocking_rule: Union[str, "BlockingRule"],
+    input_tablename_l: str = None,
+    input_tablename_r: str = None,
 ):
+    """SQL to count the comparisons generated by the equi-join conditions of a
+    blocking rule, by counting the records with each value of its join keys.
+
+    By default the records in `__splink__df_concat` (or in the two input tables,
+    for a two dataset link) are counted.  `input_tablename_l` and
+    `input_tablename_r` override this.
+    """
     if isinstance(blocking_rule, str):
         blocking_rule = BlockingRule(blocking_rule, sqlglot_dialect=linker._sql_dialect)
 
+    if isinstance(blocking_rule, SortedNeighbourhoodBlockingRule):
+        return _count_sorted_neighbourhood_comparisons_pre_filter_conditions_sqls(
+            blocking_rule, input_tablename_l or "__splink__df_concat"
+        )
+
     join_conditions = blocking_rule._equi_join_conditions
 
     l_cols_sel = []
@@ -180,15 +234,16 @@ def count_comparisons_from_blocking_rule_pre_filter_conditions_sqls(
 
     sqls = []
 
-    if linker._two_dataset_link_only:
-        #    Can just use the raw input datasets
-        keys = list(linker._input_tables_dict.keys())
-        input_tablename_l = linker._input_tables_dict[keys[0]].physical_name
-        input_tablename_r = linker._input_tables_dict[keys[1]].physical_name
+    if input_tablename_l is None or input_tablename_r is None:
+        if linker._two_dataset_link_only:
+            #    Can just use the raw input datasets
+            keys = list(linker._input_tables_dict.keys())
+            input_tablename_l = linker._input_tables_dict[keys[0]].physical_name
+            input_tablename_r = linker._input_tables_dict[keys[1]].physical_name
 
-    else:
-        input_tablename_l = "__splink__df_concat"
-        input_tablename_r = "__splink__df_concat"
+        else:
+            input_tablename_l = "__splink__df_concat"
+            input_tablename_r = "__splink__df_concat"
 
     if not join_conditions:
         if linker._two_dataset_link_only:
@@ -247,3 +302,32 @@ def count_comparisons_from_blocking_rule_pre_filter_conditions_sqls(
     sqls.append({"sql": sql, "output_table_name": "__splink__total_of_block_counts"})
 
     return sqls
+
+
+def _count_sorted_neighbourhood_comparisons_pre_filter_conditions_sqls(
+    blocking_rule: SortedNeighbourhoodBlockingRule, input_tablename: str
+):
+    """Each of the n records with a non-null sort key is compared with up to
+    `window_size` records either side of it, so, counting both orientations of each
+    pair as the equi-join counts do, 2 * (w * n - w * (w + 1) / 2) comparisons are
+    generated if n > w, and n * (n - 1) otherwise"""
+    w = blocking_rule.window_size
+
+    sql = f"""
+    select count(*) as record_count
+    from {input_tablename}
+    where ({blocking_rule.sort_key}) is not null
+    """
+    sqls = [{"sql": sql, "output_table_name": "__splink__sorted_neighbourhood_count"}]
+
+    sql = f"""
+    select
+        case
+            when record_count > {w}
+            then 2 * ({w} * record_count - {w * (w + 1) // 2})
+            else record_count * (record_count - 1)
+        end as count_of_pairwise_comparisons_generated
+    from __splink__sorted_neighbourhood_count
+    """
+    sqls.append({"sql": sql, "output_table_name": "__splink__total_of_block_counts"})
+    return sqls
@@ -1,15 +1,26 @@
 from __future__ import annotations
 
 import logging
+import re
+from dataclasses import dataclass
+from itertools import product
 from typing import TYPE_CHECKING, List
 
-from sqlglot import parse_one
-from sqlglot.expressions import Column, Join
+from sqlglot.expressions import Column, Or
 from sqlglot.optimizer.eliminate_joins import join_condition
+from sqlglot.optimizer.simplify import always_true, simplify
 
+from .comparison_level_sql import (
+    great_circle_distance_km_sql,
+    squared_chord_length,
+    unit_vector_sqls,
+)
 from .input_column import InputColumn
+from .minhash_lsh import lsh_expected_recall, optimal_lsh_parameters
 from .misc import ensure_is_list
+from .nearest_neighbours import nearest_neighbours
 from .splink_dataframe import SplinkDataFrame
+from .sqlglot_cache import parse_join_condition
 from .unique_id_concat import _composite_unique_id_from_nodes_sql
 
 logger = logging.getLogger(__name__)
@@ -24,10 +35,71 @@ def blocking_rule_to_obj(br):
         return br
     elif isinstance(br, dict):
         blocking_rule = br.get("blocking_rule", None)
-        if blocking_rule is None:
+        sort_key = br.get("sort_key", None)
+        minhash_column = br.get("minhash_column", None)
+        levenshtein_column = br.get("levenshtein_column", None)
+        qgram_column = br.get("qgram_column", None)
+        embedding_column = br.get("embedding_column", None)
+        lat_col = br.get("lat_col", None)
+        if all(
+            v is None
+            for v in [
+                blocking_rule,
+                sort_key,
+                minhash_column,
+                levenshtein_column,
+                qgram_column,
+                embedding_column,
+                lat_col,
+            ]
+        ):
             raise ValueError("No blocking rule submitted...")
         sqlglot_dialect = br.get("sql_dialect", None)
 
+        if lat_col is not None:
+            return GeoGridBlockingRule(
+                lat_col,
+                br.get("long_col", None),
+                br.get("km_threshold", None),
+                sqlglot_dialect,
+            )
+
+        if embedding_column is not None:
+            return EmbeddingNearestNeighbourBlockingRule(
+                blocking_rule or "1=1",
+                sqlglot_dialect,
+                embedding_column,
+                k=br.get("k", 10),
+                chunk_size=br.get("chunk_size", 1024),
+            )
+
+        if qgram_column is not None:
+            return QGramBlockingRule(
+                qgram_column,
+                sqlglot_dialect,
+                shingle_type=br.get("shingle_type", "qgram"),
+                shingle_size=br.get("shingle_size", 3),
+                min_shared_tokens=br.get("min_shared_tokens", 1),
+                max_token_frequency=br.get("max_token_frequency", 1000),
+            )
+
+        if levenshtein_column is not None:
+            return LevenshteinBlockingRule(
+                levenshtein_column,
+                sqlglot_dialect,
+                max_distance=br.get("max_distance", 1),
+            )
+
+        if minhash_column is not None:
+            return MinHashLSHBlockingRule(
+                minhash_column,
+                sqlglot_dialect,
+                jaccard_threshold=br.get("jaccard_threshold", 0.5),
+                num_perm=br.get("num_perm", 64),
+                shingle_type=br.get("shingle_type", "qgram"),
+                shingle_size=br.get("shingle_size", 3),
+            )
+
         salting_partitions = br.get("salting_partitions", None)
         arrays_to_explode = br.get("arrays_to_explode", None)
 
@@ -37,6 +109,19 @@ def blocking_rule_to_obj(br):
                 " both salted and exploding"
             )
 
+        if sort_key is not None:
+            if arrays_to_explode is not None or salting_partitions is not None:
+                raise ValueError(
+                    "Splink does not support sorted neighbourhood blocking rules "
+                    "that are salted or exploding"
+                )
+            return SortedNeighbourhoodBlockingRule(
+                blocking_rule or "1=1",
+                sqlglot_dialect,
+                sort_key,
+                br.get("window_size", 5),
+            )
+
         if salting_partitions is not None:
             return SaltedBlockingRule(
                 blocking_rule, sqlglot_dialect, salting_partitions
@@ -71,6 +156,9 @@ class BlockingRule:
         self.blocking_rule_sql = blocking_rule_sql
         self.preceding_rules: List[BlockingRule] = []
         self.sqlglot_dialect = sqlglot_dialect
+        # Set by materialise_hot_key_tables if hot key salting is enabled
+        self.hot_keys_table: SplinkDataFrame = None
+        self.hot_key_partitions = 0
 
     @property
     def sql_dialect(self):
@@ -95,43 +183,309 @@ class BlockingRule:
         # meaning these comparisons get lost
         return f"coalesce(({self.blocking_rule_sql}),false)"
 
-    def exclude_pairs_generated_by_all_preceding_rules_sql(self, linker: Linker):
+    def exclude_pairs_generated_by_all_preceding_rules_sql(
+        self, linker: Linker, match_key_hashes: MatchKeyHashes = None
+    ):
         """A SQL string that excludes the results of ALL previous blocking rules from
         the pairwise comparisons generated.
+
+        If `match_key_hashes` is provided, preceding rules with hashed join keys are
+        excluded by comparing the hashes, rather than by evaluating the rule.
         """
         if not self.preceding_rules:
             return ""
         or_clauses = [
-            br.exclude_pairs_generated_by_this_rule_sql(linker)
+            match_key_hashes.exclude_pairs_generated_by_rule_sql(br)
+            if match_key_hashes is not None and match_key_hashes.is_hashed(br)
+            else br.exclude_pairs_generated_by_this_rule_sql(linker)
             for br in self.preceding_rules
         ]
         previous_rules = " OR ".join(or_clauses)
         return f"AND NOT ({previous_rules})"
 
-    def create_blocked_pairs_sql(self, linker: Linker, where_condition, probability):
+    def create_blocked_pairs_sql(
+        self,
+        linker: Linker,
+        where_condition,
+        probability,
+        match_key_hashes: MatchKeyHashes = None,
+    ):
+        if self.hot_keys_table is not None:
+            return self._create_hot_key_salted_blocked_pairs_sql(
+                linker, where_condition, probability, match_key_hashes
+            )
+
+        if self._equi_join_disjuncts:
+            return self._create_disjunct_blocked_pairs_sql(
+                linker, where_condition, probability, match_key_hashes
+            )
+
+        if self._uses_groupwise_pair_generation(linker, match_key_hashes):
+            return self._create_groupwise_blocked_pairs_sql(
+                linker, where_condition, probability, match_key_hashes
+            )
+
         columns_to_select = linker._settings_obj._columns_to_select_for_blocking
         sql_select_expr = ", ".join(columns_to_select)
+        tablename_l, tablename_r = _blocking_input_tablenames(linker, match_key_hashes)
+        if self._uses_singleton_key_pruning(linker, match_key_hashes):
+            tablename_l = self._pruned_input_tablename(linker, match_key_hashes)
+            tablename_r = tablename_l
+        exclude_preceding_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
+            linker, match_key_hashes
+        )
 
         sql = f"""
             select
             {sql_select_expr}
             , '{self.match_key}' as match_key
             {probability}
-            from {linker._input_tablename_l} as l
-            inner join {linker._input_tablename_r} as r
+            from {tablename_l} as l
+            inner join {tablename_r} as r
             on
             ({self.blocking_rule_sql})
             {where_condition}
-            {self.exclude_pairs_generated_by_all_preceding_rules_sql(linker)}
+            {exclude_preceding_sql}
             """
         return sql
 
+    def _create_hot_key_salted_blocked_pairs_sql(
+        self,
+        linker: Linker,
+        where_condition,
+        probability,
+        match_key_hashes: MatchKeyHashes = None,
+    ):
+        """As `create_blocked_pairs_sql`, but the comparisons generated by each hot
+        key are split between several statements, according to the salt of the
+        left hand record, so that they are spread across threads.  Comparisons
+        generated by other keys are unaffected."""
+        columns_to_select = linker._settings_obj._columns_to_select_for_blocking
+        sql_select_expr = ", ".join(columns_to_select)
+        tablename_l, tablename_r = _blocking_input_tablenames(linker, match_key_hashes)
+        exclude_preceding_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
+            linker, match_key_hashes
+        )
+
+        hot_keys_join_condition = " and ".join(
+            f"{key_l} = hot_keys.key_{i}"
+            for i, (key_l, _) in enumerate(self._equi_join_conditions_with_table_prefix)
+        )
+        partitions = "hot_keys.__splink__salting_partitions"
+
+        partition_conditions = [f"AND {partitions} is null"] + [
+            f"AND {linker._salt_bucket_sql('l', partitions)} = {partition}"
+            for partition in range(self.hot_key_partitions)
+        ]
+
+        sqls = []
+        for partition_condition in partition_conditions:
+            sql = f"""
+            select
+            {sql_select_expr}
+            , '{self.match_key}' as match_key
+            {probability}
+            from {tablename_l} as l
+            left join {self.hot_keys_table.physical_name} as hot_keys
+            on {hot_keys_join_condition}
+            inner join {tablename_r} as r
+            on
+            ({self.blocking_rule_sql} {partition_condition})
+            {where_condition}
+            {exclude_preceding_sql}
+            """
+            sqls.append(sql)
+        return " UNION ALL ".join(sqls)
+
+    def _create_disjunct_blocked_pairs_sql(
+        self,
+        linker: Linker,
+        where_condition,
+        probability,
+        match_key_hashes: MatchKeyHashes = None,
+    ):
+        """As `create_blocked_pairs_sql`, but for a rule which is a disjunction of
+        conditions containing equi-joins, such as
+        `l.first_name = r.first_name OR l.dob = r.dob`.
+
+        SQL engines cannot use a hash join for such a condition, so evaluate it for
+        every pair of records.  Instead, each condition is joined separately, and
+        pairs satisfying an earlier condition are excluded from the later ones, so
+        that each pair is generated once.
+        """
+        columns_to_select = linker._settings_obj._columns_to_select_for_blocking
+        sql_select_expr = ", ".join(columns_to_select)
+        tablename_l, tablename_r = _blocking_input_tablenames(linker, match_key_hashes)
+        exclude_preceding_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
+            linker, match_key_hashes
+        )
+
+        disjuncts = [
+            disjunct.sql(dialect=linker._sql_dialect)
+            for disjunct in self._equi_join_disjuncts
+        ]
+
+        sqls = []
+        for i, disjunct in enumerate(disjuncts):
+            exclude_preceding_disjuncts_sql = "".join(
+                f" AND NOT coalesce(({d}), false)" for d in disjuncts[:i]
+            )
+            sql = f"""
+            select
+            {sql_select_expr}
+            , '{self.match_key}' as match_key
+            {probability}
+            from {tablename_l} as l
+            inner join {tablename_r} as r
+            on
+            ({disjunct})
+            {where_condition}
+            {exclude_preceding_sql}
+            {exclude_preceding_disjuncts_sql}
+            """
+            sqls.append(sql)
+        return " UNION ALL ".join(sqls)
+
+    def _uses_singleton_key_pruning(
+        self, linker: Linker, match_key_hashes: MatchKeyHashes = None
+    ):
+        if not linker._singleton_key_pruning:
+            return False
+        # Other types of rule generate their pairs in their own way
+        if type(self) is not BlockingRule:
+            return False
+        if self.hot_keys_table is not None or self._equi_join_disjuncts:
+            return False
+        if self._uses_groupwise_pair_generation(linker, match_key_hashes):
+            return False
+        if linker._self_link_mode or not self._block_keys:
+            return False
+        tablename_l, tablename_r = _blocking_input_tablenames(linker, match_key_hashes)
+        return tablename_l == tablename_r
+
+    def _pruned_input_tablename(
+        self, linker: Linker, match_key_hashes: MatchKeyHashes = None
+    ):
+        tablename, _ = _blocking_input_tablenames(linker, match_key_hashes)
+        return f"{tablename}_pruned_{self.match_key}"
+
+    def pruned_input_table_sql(
+        self, linker: Linker, match_key_hashes: MatchKeyHashes = None
+    ):
+        """SQL selecting the records whose join keys are shared with at least one
+        other record, which are the only records the rule can pair.  See
+        `Linker.set_singleton_key_pruning()`.
+
+        Records with a null key are excluded too, since the join condition is not
+        satisfied by nulls.
+        """
+        tablename, _ = _blocking_input_tablenames(linker, match_key_hashes)
+        block_keys = self._block_keys
+        keys_select_expr = ", ".join(
+            f"{key} as __splink__key_{i}" for i, key in enumerate(block_keys)
+        )
+        keys_join_condition = " and ".join(
+            f"{key} = __splink__keys.__splink__key_{i}"
+            for i, key in enumerate(block_keys)
+        )
+        return f"""
+            select __splink__records.*
+            from {tablename} as __splink__records
+            inner join (
+                select {keys_select_expr}
+                from {tablename}
+                group by {", ".join(block_keys)}
+                having count(*) > 1
+            ) as __splink__keys
+            on {keys_join_condition}
+            """
+
+    def _uses_groupwise_pair_generation(
+        self, linker: Linker, match_key_hashes: MatchKeyHashes = None
+    ):
+        if linker._blocking_pair_generation_strategy != "groupwise":
+            return False
+        if linker._self_link_mode or not self._block_keys:
+            return False
+        tablename_l, tablename_r = _blocking_input_tablenames(linker, match_key_hashes)
+        return tablename_l == tablename_r
+
+    def _create_groupwise_blocked_pairs_sql(
+        self,
+        linker: Linker,
+        where_condition,
+        probability,
+        match_key_hashes: MatchKeyHashes = None,
+    ):
+        """As `create_blocked_pairs_sql`, but rather than joining each record to
+        every record with the same join keys and then discarding the half of the
+        pairs in which the left hand record has the greater unique id, the records
+        of each block are aggregated into a list sorted by unique id, and each
+        record is paired with the records after it in the list.  See
+        `Linker.set_blocking_pair_generation_strategy()`.
+        """
+        columns_to_select = linker._settings_obj._columns_to_select_for_blocking
+        sql_select_expr = ", ".join(columns_to_select)
+        tablename, _ = _blocking_input_tablenames(linker, match_key_hashes)
+        exclude_preceding_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
+            linker, match_key_hashes
+        )
+
+        block_keys = self._block_keys
+        block_keys_not_null = " and ".join(f"({key}) is not null" for key in block_keys)
+        unique_id_sql = _composite_unique_id_from_nodes_sql(
+            linker._settings_obj._unique_id_input_columns
+        )
+        # Conditions of the rule other than the equi-join conditions
+        _, _, filter_condition = join_condition(self._parsed_join_condition)
+        filter_condition = simplify(filter_condition.copy())
+        filter_sql = ""
+        if not always_true(filter_condition):
+            filter_sql = f"AND ({filter_condition.sql(linker._sql_dialect)})"
+
+        # `l` and `r` are structs holding the records, so the columns of the
+        # records are selected in the same way as from a join
+        return f"""
+            select
+            {sql_select_expr}
+            , '{self.match_key}' as match_key
+            {probability}
+            from (
+                select l, unnest(records[i + 1:]) as r
+                from (
+                    select
+                        records,
+                        unnest(records) as l,
+                        unnest(range(1, len(records) + 1)) as i
+                    from (
+                        select list(
+                            __splink__records order by {unique_id_sql}
+                        ) as records
+                        from {tablename} as __splink__records
+                        where {block_keys_not_null}
+                        group by {", ".join(block_keys)}
+                    )
+                )
+            )
+            {where_condition}
+            {filter_sql}
+            {exclude_preceding_sql}
+            """
+
+    def derived_columns_sql(self, linker: Linker) -> dict:
+        """Columns the blocking rule needs which are computed once per record when
+        the input records are concatenated, as a dict of column name to SQL"""
+        return {}
+
+    def drop_hot_keys_table(self):
+        self.hot_keys_table.drop_table_from_database_and_remove_from_cache()
+        self.hot_keys_table = None
+        self.hot_key_partitions = 0
+
     @property
     def _parsed_join_condition(self):
         br = self.blocking_rule_sql
-        return parse_one("INNER JOIN r", into=Join).on(
-            br, dialect=self.sqlglot_dialect
-        )  # using sqlglot==11.4.1
+        return parse_join_condition(br, dialect=self.sqlglot_dialect)
 
     @property
     def _equi_join_conditions(self):
@@ -165,6 +519,49 @@ class BlockingRule:
 
         return keys
 
+    @property
+    def _block_keys(self):
+        """If each of the equi-join conditions of the blocking rule compares the
+        same expression of both records, the expressions, e.g.
+        ['surname', 'substr(dob, 1, 4)'].  Otherwise an empty list.
+        """
+        keys = self._equi_join_conditions
+        if any(key_l != key_r for key_l, key_r in keys):
+            return []
+        return [key_l for key_l, _ in keys]
+
+    @property
+    def _equi_join_disjuncts(self):
+        """If the blocking rule is a disjunction of conditions which each contain
+        an equi-join, the syntax trees of the conditions.  Otherwise an empty list.
+        """
+        condition = self._parsed_join_condition.args.get("on")
+        if condition is None:
+            return []
+        condition = condition.unnest()
+        if not isinstance(condition, Or):
+            return []
+
+        disjuncts = [disjunct.unnest() for disjunct in condition.flatten()]
+        for disjunct in disjuncts:
+            disjunct_sql = disjunct.sql(dialect=self.sqlglot_dialect)
+            join = parse_join_condition(disjunct_sql, dialect=self.sqlglot_dialect)
+            source_keys, _, _ = join_condition(join)
+            if not source_keys:
+                return []
+        return disjuncts
+
+    @property
+    def _equi_join_conditions_with_table_prefix(self):
+        """As `_equi_join_conditions`, but retaining the `l.` and `r.` table
+        prefixes, e.g. [(l.name, r.name), (substr(l.dob,1,4), substr(r.dob,1,4))]
+        """
+        source_keys, join_keys, _ = join_condition(self._parsed_join_condition)
+        return [
+            (i.sql(dialect=self.sqlglot_dialect), j.sql(self.sqlglot_dialect))
+            for (i, j) in zip(source_keys, join_keys)
+        ]
+
     @property
     def _filter_conditions(self):
         # A more accurate term might be "non-equi-join conditions"
@@ -228,31 +625,51 @@ class SaltedBlockingRule(BlockingRule):
     def _as_completed_dict(self):
         return self.as_dict()
 
-    def _salting_condition(self, salt):
-        return f"AND ceiling(l.__splink_salt * {self.salting_partitions}) = {salt + 1}"
+    def _replicated_table_sql(self, tablename):
+        """Each record of the table, repeated once for each salt bucket"""
+        salt_buckets_sql = " union all ".join(
+            f"select {salt} as __splink_salt_bucket"
+            for salt in range(self.salting_partitions)
+        )
+        return f"""
+            (select unsalted.*, salt_buckets.__splink_salt_bucket
+            from {tablename} as unsalted
+            cross join ({salt_buckets_sql}) as salt_buckets)
+            """
 
-    def create_blocked_pairs_sql(self, linker: Linker, where_condition, probability):
+    def create_blocked_pairs_sql(
+        self,
+        linker: Linker,
+        where_condition,
+        probability,
+        match_key_hashes: MatchKeyHashes = None,
+    ):
+        """Each left hand record is assigned to one salt bucket, and the right hand
+        table is replicated across all of the buckets, so that adding the bucket to
+        the join condition splits the comparisons generated by each key between
+        `salting_partitions` tasks without changing the pairs generated."""
         columns_to_select = linker._settings_obj._columns_to_select_for_blocking
         sql_select_expr = ", ".join(columns_to_select)
+        tablename_l, tablename_r = _blocking_input_tablenames(linker, match_key_hashes)
+        exclude_preceding_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
+            linker, match_key_hashes
+        )
+        salt_bucket_l = linker._salt_bucket_sql("l", self.salting_partitions)
 
-        sqls = []
-        for salt in range(self.salting_partitions):
-            salt_condition = self._salting_condition(salt)
-            sql = f"""
+        sql = f"""
             select
             {sql_select_expr}
             , '{self.match_key}' as match_key
             {probability}
-            from {linker._input_tablename_l} as l
-            inner join {linker._input_tablename_r} as r
+            from {tablename_l} as l
+            inner join {self._replicated_table_sql(tablename_r)} as r
             on
-            ({self.blocking_rule_sql} {salt_condition})
+            ({self.blocking_rule_sql}
+            AND {salt_bucket_l} = r.__splink_salt_bucket)
             {where_condition}
-            {self.exclude_pairs_generated_by_all_preceding_rules_sql(linker)}
+            {exclude_preceding_sql}
             """
-
-            sqls.append(sql)
-        return " UNION ALL ".join(sqls)
+        return sql
 
 
 class ExplodingBlockingRule(BlockingRule):
@@ -275,17 +692,7 @@ class ExplodingBlockingRule(BlockingRule):
         settings_obj = linker._settings_obj
         unique_id_col = settings_obj._unique_id_column_name
 
-        link_type = settings_obj._link_type
-
-        if linker._two_dataset_link_only:
-            link_type = "two_dataset_link_only"
-
-        if linker._self_link_mode:
-            link_type = "self_link"
-
-        where_condition = _sql_gen_where_condition(
-            link_type, settings_obj._unique_id_input_columns
-        )
+        where_condition = _id_pairs_where_condition(linker)
 
         id_expr_l = _composite_unique_id_from_nodes_sql(
             settings_obj._unique_id_input_columns, "l"
@@ -294,11 +701,6 @@ class ExplodingBlockingRule(BlockingRule):
             settings_obj._unique_id_input_columns, "r"
         )
 
-        if link_type == "two_dataset_link_only":
-            where_condition = (
-                where_condition + " and l.source_dataset < r.source_dataset"
-            )
-
         sql = f"""
             select distinct
                 {id_expr_l} as {unique_id_col}_l,
@@ -322,166 +724,1283 @@ class ExplodingBlockingRule(BlockingRule):
         so that subsequent statements do not produce duplicate pairs
         """
 
-        unique_id_column = linker._settings_obj._unique_id_column_name
-        splink_df = self.exploded_id_pair_table
-        ids_to_compare_sql = f"select * from {splink_df.physical_name}"
-
-        settings_obj = linker._settings_obj
-        id_expr_l = _composite_unique_id_from_nodes_sql(
-            settings_obj._unique_id_input_columns, "l"
-        )
-        id_expr_r = _composite_unique_id_from_nodes_sql(
-            settings_obj._unique_id_input_columns, "r"
-        )
-
-        return f"""EXISTS (
-            select 1 from ({ids_to_compare_sql}) as ids_to_compare
-            where (
-                {id_expr_l} = ids_to_compare.{unique_id_column}_l and
-                {id_expr_r} = ids_to_compare.{unique_id_column}_r
-            )
-        )
-        """
-
-    def create_blocked_pairs_sql(self, linker: Linker, where_condition, probability):
-        columns_to_select = linker._settings_obj._columns_to_select_for_blocking
-        sql_select_expr = ", ".join(columns_to_select)
+        return _id_pair_in_table_sql(linker, self.exploded_id_pair_table)
 
+    def create_blocked_pairs_sql(
+        self,
+        linker: Linker,
+        where_condition,
+        probability,
+        match_key_hashes: MatchKeyHashes = None,
+    ):
+        # The marginal id pairs table already excludes pairs generated by the
+        # preceding rules, so match_key_hashes is not needed
         if self.exploded_id_pair_table is None:
             raise ValueError(
                 "Exploding blocking rules are not supported for the function you have"
                 " called."
             )
-        settings_obj = linker._settings_obj
-        id_expr_l = _composite_unique_id_from_nodes_sql(
-            settings_obj._unique_id_input_columns, "l"
-        )
-        id_expr_r = _composite_unique_id_from_nodes_sql(
-            settings_obj._unique_id_input_columns, "r"
+        return _blocked_pairs_from_id_pairs_sql(
+            linker, self.exploded_id_pair_table, self.match_key, probability
         )
 
-        exploded_id_pair_table = self.exploded_id_pair_table
-        unique_id_col = linker._settings_obj._unique_id_column_name
-        sql = f"""
-            select
-                {sql_select_expr},
-                '{self.match_key}' as match_key
-                {probability}
-            from {exploded_id_pair_table.physical_name} as pairs
-            left join {linker._input_tablename_l} as l
-                on pairs.{unique_id_col}_l={id_expr_l}
-            left join {linker._input_tablename_r} as r
-                on pairs.{unique_id_col}_r={id_expr_r}
-        """
-        return sql
-
     def as_dict(self):
         output = super().as_dict()
         output["arrays_to_explode"] = self.array_columns_to_explode
         return output
 
 
-def materialise_exploded_id_tables(linker: Linker):
-    settings_obj = linker._settings_obj
+class DerivedKeysBlockingRule(ExplodingBlockingRule):
+    """An exploding blocking rule on an array of keys which Splink derives from a
+    column of the input records when they are concatenated, so that the keys are
+    computed once per record.
 
-    blocking_rules = settings_obj._blocking_rules_to_generate_predictions
-    exploding_blocking_rules = [
-        br for br in blocking_rules if isinstance(br, ExplodingBlockingRule)
-    ]
-    exploded_tables = []
+    Subclasses set `source_column` and `keys_column`, and implement `keys_sql`.
+    """
 
-    input_dataframe = linker._initialise_df_concat_with_tf()
-    input_colnames = {col.name for col in input_dataframe.columns}
+    source_column: str
+    keys_column: str
+    # Whether leading and trailing whitespace is removed from values before their
+    # keys are derived, so that blank values have no keys
+    trim_values = False
 
-    for br in exploding_blocking_rules:
-        arrays_to_explode_quoted = [
-            InputColumn(colname, sql_dialect=linker._sql_dialect).quote().name
-            for colname in br.array_columns_to_explode
-        ]
-        expl_sql = linker._explode_arrays_sql(
-            "__splink__df_concat_with_tf",
-            br.array_columns_to_explode,
-            list(input_colnames.difference(arrays_to_explode_quoted)),
-        )
+    def keys_sql(self, linker: Linker) -> str:
+        raise NotImplementedError
 
-        linker._enqueue_sql(
-            expl_sql,
-            "__splink__df_concat_with_tf_unnested",
-        )
+    def derived_columns_sql(self, linker: Linker) -> dict:
+        return {self.keys_column: self.keys_sql(linker)}
 
-        base_name = "__splink__marginal_exploded_ids_blocking_rule"
-        table_name = f"{base_name}_mk_{br.match_key}"
+    def _value_sql(self, linker: Linker):
+        # Null and empty values have no keys, so are not compared
+        column = InputColumn(self.source_column, sql_dialect=linker._sql_dialect)
+        if self.trim_values:
+            return f"nullif(trim({column.name}), '')"
+        return f"nullif({column.name}, '')"
 
-        sql = br.marginal_exploded_id_pairs_table_sql(linker, br)
+    def _as_completed_dict(self):
+        return self.as_dict()
 
-        linker._enqueue_sql(sql, table_name)
 
-        marginal_ids_table = linker._execute_sql_pipeline([input_dataframe])
-        br.exploded_id_pair_table = marginal_ids_table
-        exploded_tables.append(marginal_ids_table)
-    return exploding_blocking_rules
+class MinHashLSHBlockingRule(DerivedKeysBlockingRule):
+    """Compares records whose values of a text column have similar sets of
+    shingles, using MinHash locality sensitive hashing.
 
+    When the records are concatenated, the MinHash signature of the shingles of the
+    column is computed once per record, and split into bands.  The hash of the
+    signature within each band is a key, and records sharing any key are compared.
+    This is implemented as an exploding blocking rule on the array of keys.
 
-def _sql_gen_where_condition(link_type, unique_id_cols):
-    id_expr_l = _composite_unique_id_from_nodes_sql(unique_id_cols, "l")
-    id_expr_r = _composite_unique_id_from_nodes_sql(unique_id_cols, "r")
+    The number of bands, and of rows of the signature in each band, are chosen from
+    `num_perm` hash functions so that pairs with a Jaccard similarity above
+    `jaccard_threshold` are likely to be compared and pairs below it are not.
+    """
 
-    if link_type in ("two_dataset_link_only", "self_link"):
-        where_condition = " where 1=1 "
-    elif link_type in ["link_and_dedupe", "dedupe_only"]:
-        where_condition = f"where {id_expr_l} < {id_expr_r}"
-    elif link_type == "link_only":
-        source_dataset_col = unique_id_cols[0]
-        where_condition = (
-            f"where {id_expr_l} < {id_expr_r} "
-            f"and l.{source_dataset_col.name} != r.{source_dataset_col.name}"
+    trim_values = True
+
+    def __init__(
+        self,
+        minhash_column: str,
+        sqlglot_dialect: str = None,
+        jaccard_threshold: float = 0.5,
+        num_perm: int = 64,
+        shingle_type: str = "qgram",
+        shingle_size: int = 3,
+    ):
+        if not 0 < jaccard_threshold <= 1:
+            raise ValueError("jaccard_threshold must be between 0 and 1")
+        if num_perm < 1:
+            raise ValueError("num_perm must be at least 1")
+        if shingle_type not in ("qgram", "token"):
+            raise ValueError("shingle_type must be 'qgram' or 'token'")
+
+        self.minhash_column = self.source_column = minhash_column
+        self.jaccard_threshold = jaccard_threshold
+        self.num_perm = num_perm
+        self.shingle_type = shingle_type
+        self.shingle_size = shingle_size
+        self.bands, self.rows = optimal_lsh_parameters(jaccard_threshold, num_perm)
+        self.expected_recall = lsh_expected_recall(
+            jaccard_threshold, self.bands, self.rows
         )
 
-    return where_condition
+        column_id = re.sub(r"\W", "_", minhash_column)
+        shingles_id = f"{shingle_type}{shingle_size if shingle_type == 'qgram' else ''}"
+        self.keys_column = (
+            f"__splink__minhash_{column_id}_{shingles_id}_{self.bands}x{self.rows}"
+        )
+        super().__init__(
+            f"l.{self.keys_column} = r.{self.keys_column}",
+            sqlglot_dialect,
+            [self.keys_column],
+        )
 
+    def keys_sql(self, linker: Linker):
+        """SQL computing the array of band keys of each record"""
+        value_sql = self._value_sql(linker)
+        shingles_sql = linker._shingles_sql(
+            value_sql, self.shingle_type, self.shingle_size
+        )
+        band_keys_sql = linker._minhash_band_keys_sql(
+            shingles_sql, self.bands, self.rows
+        )
+        return f"case when {value_sql} is null then null else {band_keys_sql} end"
 
-def block_using_rules_sqls(linker: Linker):
-    """Use the blocking rules specified in the linker's settings object to
-    generate a SQL statement that will create pairwise record comparions
-    according to the blocking rule(s).
+    @property
+    def _lsh_description(self):
+        return (
+            f"MinHash blocking rule on {self.minhash_column} uses {self.bands} bands "
+            f"of {self.rows} rows. Pairs with a Jaccard similarity of "
+            f"{self.jaccard_threshold} are compared with probability "
+            f"{1 - (1 - self.jaccard_threshold ** self.rows) ** self.bands:.3f}, and "
+            f"the expected recall of pairs above it is {self.expected_recall:.3f}"
+        )
 
-    Where there are multiple blocking rules, the SQL statement contains logic
-    so that duplicate comparisons are not generated.
-    """
+    def as_dict(self):
+        output = {
+            "minhash_column": self.minhash_column,
+            "jaccard_threshold": self.jaccard_threshold,
+            "num_perm": self.num_perm,
+            "shingle_type": self.shingle_type,
+            "shingle_size": self.shingle_size,
+        }
+        output["sql_dialect"] = self.sql_dialect
+        return output
 
-    sqls = []
+    @property
+    def _human_readable_succinct(self):
+        return (
+            f"MinHash blocking rule on {self.minhash_column} with Jaccard "
+            f"threshold {self.jaccard_threshold}"
+        )
 
-    # For the two dataset link only, rather than a self join of
-    # __splink__df_concat_with_tf, it's much faster to split the input
-    # into two tables, and join (because then Splink doesn't have to evaluate)
-    # intra-dataset comparisons.
-    # see https://github.com/moj-analytical-services/splink/pull/1359
-    if (
-        linker._two_dataset_link_only
-        and not linker._find_new_matches_mode
-        and not linker._compare_two_records_mode
-    ):
-        source_dataset_col = (
-            source_dataset_col
-        ) = linker._settings_obj._source_dataset_column_name
-        # Need df_l to be the one with the lowest id to preeserve the property
-        # that the left dataset is the one with the lowest concatenated id
 
-        # This also needs to work for training u
-        if linker._train_u_using_random_sample_mode:
-            spl_switch = "_sample"
-        else:
-            spl_switch = ""
+class LevenshteinBlockingRule(DerivedKeysBlockingRule):
+    """Compares records whose values of a column are within `max_distance`
+    Levenshtein edits of each other, using an equi-join rather than evaluating the
+    distance for every pair of records.
 
-        df_concat_tf = linker._intermediate_table_cache["__splink__df_concat_with_tf"]
+    If two strings are within k edits of each other, deleting at most k characters
+    from each of them produces a common string.  When the records are
+    concatenated, every string obtainable by deleting up to k characters from the
+    value (its deletion neighbourhood) is computed once per record.  Records
+    sharing any of these strings are joined as an exploding blocking rule, and the
+    Levenshtein distance is then evaluated for these candidate pairs only.
 
-        sql = f"""
-        select * from __splink__df_concat_with_tf{spl_switch}
-        where {source_dataset_col} =
-            (select min({source_dataset_col}) from {df_concat_tf.physical_name})
-        """
-        sqls.append(
-            {
+    The deletion neighbourhood of a string of length n has O(n^k) members, so
+    `max_distance` should be small.
+    """
+
+    def __init__(
+        self,
+        levenshtein_column: str,
+        sqlglot_dialect: str = None,
+        max_distance: int = 1,
+    ):
+        if max_distance is None or max_distance < 1:
+            raise ValueError("max_distance must be at least 1")
+
+        self.levenshtein_column = self.source_column = levenshtein_column
+        self.max_distance = max_distance
+
+        column_id = re.sub(r"\W", "_", levenshtein_column)
+        self.keys_column = f"__splink__deletions_{column_id}_{max_distance}"
+        col = levenshtein_column
+        super().__init__(
+            f"l.{self.keys_column} = r.{self.keys_column} "
+            f"and levenshtein(l.{col}, r.{col}) <= {max_distance}",
+            sqlglot_dialect,
+            [self.keys_column],
+        )
+
+    def keys_sql(self, linker: Linker):
+        """SQL computing the deletion neighbourhood of each record's value"""
+        value_sql = self._value_sql(linker)
+        deletions_sql = linker._deletion_neighbourhood_sql(value_sql, self.max_distance)
+        return f"case when {value_sql} is null then null else {deletions_sql} end"
+
+    def as_dict(self):
+        return {
+            "levenshtein_column": self.levenshtein_column,
+            "max_distance": self.max_distance,
+            "sql_dialect": self.sql_dialect,
+        }
+
+    @property
+    def _human_readable_succinct(self):
+        return (
+            f"Levenshtein blocking rule on {self.levenshtein_column} with maximum "
+            f"distance {self.max_distance}"
+        )
+
+
+class QGramBlockingRule(DerivedKeysBlockingRule):
+    """Compares records whose values of a text column share at least
+    `min_shared_tokens` shingles (character q-grams, or whitespace separated
+    tokens), using an inverted index from each shingle to the records containing
+    it.
+
+    When the records are concatenated, the shingles of the column are computed
+    once per record.  Shingles contained in more than `max_token_frequency`
+    records, such as 'the' or 'road' in addresses, are pruned from the index,
+    since they say little about whether records match.  Each remaining shingle
+    generates at most `max_token_frequency` squared comparisons, which bounds the
+    number of comparisons however common the values of the column.
+    """
+
+    trim_values = True
+
+    def __init__(
+        self,
+        qgram_column: str,
+        sqlglot_dialect: str = None,
+        shingle_type: str = "qgram",
+        shingle_size: int = 3,
+        min_shared_tokens: int = 1,
+        max_token_frequency: int = 1000,
+    ):
+        if shingle_type not in ("qgram", "token"):
+            raise ValueError("shingle_type must be 'qgram' or 'token'")
+        if min_shared_tokens is None or min_shared_tokens < 1:
+            raise ValueError("min_shared_tokens must be at least 1")
+        if max_token_frequency is None or max_token_frequency < 2:
+            raise ValueError("max_token_frequency must be at least 2")
+
+        self.qgram_column = self.source_column = qgram_column
+        self.shingle_type = shingle_type
+        self.shingle_size = shingle_size
+        self.min_shared_tokens = min_shared_tokens
+        self.max_token_frequency = max_token_frequency
+
+        column_id = re.sub(r"\W", "_", qgram_column)
+        shingles_id = f"{shingle_type}{shingle_size if shingle_type == 'qgram' else ''}"
+        self.keys_column = f"__splink__shingles_{column_id}_{shingles_id}"
+        super().__init__(
+            f"l.{self.keys_column} = r.{self.keys_column}",
+            sqlglot_dialect,
+            [self.keys_column],
+        )
+
+    def keys_sql(self, linker: Linker):
+        """SQL computing the array of shingles of each record"""
+        value_sql = self._value_sql(linker)
+        shingles_sql = linker._shingles_sql(
+            value_sql, self.shingle_type, self.shingle_size
+        )
+        return f"case when {value_sql} is null then null else {shingles_sql} end"
+
+    pruned_index_tablename = "__splink__df_concat_with_tf_unnested_pruned"
+
+    def pruned_index_sql(self, linker: Linker):
+        """The exploded table, which is the inverted index with a row for each
+        shingle of each record, without the shingles contained in more than
+        `max_token_frequency` records"""
+        unique_id_input_columns = linker._settings_obj._unique_id_input_columns
+        id_expr = _composite_unique_id_from_nodes_sql(unique_id_input_columns)
+
+        # Shingles may be repeated within a record, so the records containing each
+        # shingle are counted distinctly
+        key = self.keys_column
+        tablename = "__splink__df_concat_with_tf_unnested"
+        return f"""
+            select * from {tablename}
+            where {key} in (
+                select {key} from {tablename}
+                group by {key}
+                having count(distinct {id_expr}) <= {self.max_token_frequency}
+            )
+            """
+
+    def marginal_exploded_id_pairs_table_sql(self, linker: Linker, br: BlockingRule):
+        """The id pairs of records sharing at least `min_shared_tokens` shingles
+        which are contained in no more than `max_token_frequency` records,
+        excluding those generated by the preceding rules.  Reads the pruned index
+        computed by `pruned_index_sql`"""
+        settings_obj = linker._settings_obj
+        unique_id_col = settings_obj._unique_id_column_name
+        unique_id_input_columns = settings_obj._unique_id_input_columns
+
+        id_expr_l = _composite_unique_id_from_nodes_sql(unique_id_input_columns, "l")
+        id_expr_r = _composite_unique_id_from_nodes_sql(unique_id_input_columns, "r")
+
+        # The shingles shared by each pair are counted distinctly, since they may be
+        # repeated within a record
+        key = self.keys_column
+        tablename = self.pruned_index_tablename
+
+        return f"""
+            select {unique_id_col}_l, {unique_id_col}_r
+            from (
+                select
+                    {id_expr_l} as {unique_id_col}_l,
+                    {id_expr_r} as {unique_id_col}_r,
+                    l.{key} as __splink__shared_shingle
+                from {tablename} as l
+                inner join {tablename} as r
+                on l.{key} = r.{key}
+                {_id_pairs_where_condition(linker)}
+                {self.exclude_pairs_generated_by_all_preceding_rules_sql(linker)}
+            ) as shared_shingles
+            group by {unique_id_col}_l, {unique_id_col}_r
+            having count(distinct __splink__shared_shingle) >= {self.min_shared_tokens}
+            """
+
+    def as_dict(self):
+        return {
+            "qgram_column": self.qgram_column,
+            "shingle_type": self.shingle_type,
+            "shingle_size": self.shingle_size,
+            "min_shared_tokens": self.min_shared_tokens,
+            "max_token_frequency": self.max_token_frequency,
+            "sql_dialect": self.sql_dialect,
+        }
+
+    @property
+    def _human_readable_succinct(self):
+        return (
+            f"Q-gram blocking rule on {self.qgram_column} with at least "
+            f"{self.min_shared_tokens} shared shingle(s)"
+        )
+
+
+class GeoGridBlockingRule(BlockingRule):
+    """Compares records whose coordinates are within `km_threshold` kilometres of
+    each other, using an equi-join rather than evaluating the distance for every
+    pair of records.
+
+    When the records are concatenated, each record is assigned to a cell of a grid
+    of cubes over the unit vectors of the coordinates, whose sides are the
+    straight line distance between points `km_threshold` apart.  Records within
+    `km_threshold` of each other are therefore in the same or adjacent cells.  Each
+    record is joined to the records in the 27 cells around its own, and the great
+    circle distance is then evaluated for these candidate pairs only.  Unlike a
+    grid of latitude and longitude, cells are the same size everywhere, including
+    near the poles and either side of the antimeridian.
+    """
+
+    def __init__(
+        self,
+        lat_col: str,
+        long_col: str,
+        km_threshold: float,
+        sqlglot_dialect: str = None,
+    ):
+        if long_col is None:
+            raise ValueError("Geospatial blocking rules need a long_col")
+        if km_threshold is None or km_threshold <= 0:
+            raise ValueError("km_threshold must be greater than zero")
+
+        self.lat_col = lat_col
+        self.long_col = long_col
+        self.km_threshold = km_threshold
+
+        column_id = re.sub(r"\W", "_", f"{lat_col}_{long_col}_{km_threshold}")
+        self.cell_columns = {
+            axis: f"__splink__geo_cell_{axis}_{column_id}" for axis in "xyz"
+        }
+        distance_sql = great_circle_distance_km_sql(
+            f"l.{lat_col}", f"r.{lat_col}", f"l.{long_col}", f"r.{long_col}"
+        )
+        super().__init__(f"{distance_sql} <= {km_threshold}", sqlglot_dialect)
+
+    def derived_columns_sql(self, linker: Linker):
+        """SQL computing the grid cell of each record's coordinates"""
+        lat = InputColumn(self.lat_col, sql_dialect=linker._sql_dialect)
+        long = InputColumn(self.long_col, sql_dialect=linker._sql_dialect)
+        # Cells are slightly larger than necessary, so that rounding errors in the
+        # distance cannot leave pairs within the threshold in non-adjacent cells
+        cell_size = squared_chord_length(self.km_threshold) ** 0.5 * 1.001
+        return {
+            self.cell_columns[axis]: f"cast(floor(({sql}) / {cell_size!r}) as bigint)"
+            for axis, sql in unit_vector_sqls(lat.name, long.name).items()
+        }
+
+    def create_blocked_pairs_sql(
+        self,
+        linker: Linker,
+        where_condition,
+        probability,
+        match_key_hashes: MatchKeyHashes = None,
+    ):
+        columns_to_select = linker._settings_obj._columns_to_select_for_blocking
+        sql_select_expr = ", ".join(columns_to_select)
+        tablename_l, tablename_r = _blocking_input_tablenames(linker, match_key_hashes)
+        exclude_preceding_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
+            linker, match_key_hashes
+        )
+
+        # The left hand records are replicated once for each adjacent cell, so that
+        # the right hand records are found by an equi-join on the cell.  Each pair
+        # is generated by exactly one offset.  The adjacent cells are columns of a
+        # subquery, since otherwise DuckDB may not recognise the join as an
+        # equi-join
+        offsets_sql = " union all ".join(
+            f"select {x} as __splink__offset_x, {y} as __splink__offset_y, "
+            f"{z} as __splink__offset_z"
+            for x, y, z in product([-1, 0, 1], repeat=3)
+        )
+        neighbour_cells_sql = ", ".join(
+            f"{column} + __splink__offset_{axis} as __splink__neighbour_cell_{axis}"
+            for axis, column in self.cell_columns.items()
+        )
+        cell_join_sql = " and ".join(
+            f"r.{column} = l.__splink__neighbour_cell_{axis}"
+            for axis, column in self.cell_columns.items()
+        )
+
+        return f"""
+            select
+            {sql_select_expr}
+            , '{self.match_key}' as match_key
+            {probability}
+            from (
+                select *, {neighbour_cells_sql}
+                from {tablename_l}
+                cross join ({offsets_sql}) as offsets
+            ) as l
+            inner join {tablename_r} as r
+            on ({cell_join_sql} and ({self.blocking_rule_sql}))
+            {where_condition}
+            {exclude_preceding_sql}
+            """
+
+    def as_dict(self):
+        return {
+            "lat_col": self.lat_col,
+            "long_col": self.long_col,
+            "km_threshold": self.km_threshold,
+            "sql_dialect": self.sql_dialect,
+        }
+
+    def _as_completed_dict(self):
+        return self.as_dict()
+
+    @property
+    def _human_readable_succinct(self):
+        return (
+            f"Geospatial blocking rule on {self.lat_col} and {self.long_col} within "
+            f"{self.km_threshold}km"
+        )
+
+
+def derived_blocking_keys_select_sql(linker: Linker) -> str:
+    """The columns needed by the blocking rules used to generate predictions which
+    are derived from the input records, such as keys or grid cells, to add to the
+    select statement which concatenates the input records"""
+    if linker._settings_obj_ is None:
+        return ""
+    columns_sql = {}
+    for br in linker._settings_obj._blocking_rules_to_generate_predictions:
+        columns_sql.update(br.derived_columns_sql(linker))
+    return "".join(f", {sql} as {column}" for column, sql in columns_sql.items())
+
+
+def materialise_exploded_id_tables(linker: Linker):
+    settings_obj = linker._settings_obj
+
+    blocking_rules = settings_obj._blocking_rules_to_generate_predictions
+    exploding_blocking_rules = [
+        br for br in blocking_rules if isinstance(br, ExplodingBlockingRule)
+    ]
+    exploded_tables = []
+
+    input_dataframe = linker._initialise_df_concat_with_tf()
+    input_colnames = {col.name for col in input_dataframe.columns}
+
+    for br in exploding_blocking_rules:
+        if isinstance(br, MinHashLSHBlockingRule):
+            logger.info(br._lsh_description)
+
+        arrays_to_explode_quoted = [
+            InputColumn(colname, sql_dialect=linker._sql_dialect).quote().name
+            for colname in br.array_columns_to_explode
+        ]
+        expl_sql = linker._explode_arrays_sql(
+            "__splink__df_concat_with_tf",
+            br.array_columns_to_explode,
+            list(input_colnames.difference(arrays_to_explode_quoted)),
+        )
+
+        linker._enqueue_sql(
+            expl_sql,
+            "__splink__df_concat_with_tf_unnested",
+        )
+
+        if isinstance(br, QGramBlockingRule):
+            linker._enqueue_sql(br.pruned_index_sql(linker), br.pruned_index_tablename)
+
+        base_name = "__splink__marginal_exploded_ids_blocking_rule"
+        table_name = f"{base_name}_mk_{br.match_key}"
+
+        sql = br.marginal_exploded_id_pairs_table_sql(linker, br)
+
+        linker._enqueue_sql(sql, table_name)
+
+        marginal_ids_table = linker._execute_sql_pipeline([input_dataframe])
+        br.exploded_id_pair_table = marginal_ids_table
+        exploded_tables.append(marginal_ids_table)
+    return exploding_blocking_rules
+
+
+class SortedNeighbourhoodBlockingRule(BlockingRule):
+    """Pairs each record with the `window_size` records either side of it when all
+    records are sorted by `sort_key`.
+
+    The number of comparisons generated grows linearly with the number of records,
+    however skewed the values of the sort key, and records with similar but not
+    identical keys (e.g. 'Smith' and 'Smyth') can be compared without a non
+    equi-join.  Records whose sort key is null are not compared.
+
+    `blocking_rule` is an additional condition neighbouring pairs of records must
+    satisfy.  It defaults to `1=1`, so that every neighbouring pair is compared.
+    """
+
+    def __init__(
+        self,
+        blocking_rule: str = "1=1",
+        sqlglot_dialect: str = None,
+        sort_key: str = None,
+        window_size: int = 5,
+    ):
+        if sort_key is None:
+            raise ValueError("Sorted neighbourhood blocking rules need a sort_key")
+        if window_size is None or window_size < 1:
+            raise ValueError("window_size must be at least 1")
+
+        super().__init__(blocking_rule, sqlglot_dialect)
+        self.sort_key = sort_key
+        self.window_size = window_size
+        self.neighbour_id_pair_table: SplinkDataFrame = None
+
+    def sorted_records_sql(self, linker: Linker, input_tablename: str):
+        """The records with a non-null sort key, with their position in the sort
+        order.  The unique id breaks ties, so that the order is deterministic."""
+        id_expr = _composite_unique_id_from_nodes_sql(
+            linker._settings_obj._unique_id_input_columns
+        )
+        return f"""
+            select *,
+            row_number() over (order by {self.sort_key}, {id_expr})
+                as __splink__sorted_neighbourhood_rank
+            from {input_tablename}
+            where ({self.sort_key}) is not null
+            """
+
+    def marginal_neighbour_id_pairs_table_sql(self, linker: Linker, tablename: str):
+        """The id pairs of records within `window_size` places of each other in the
+        table of sorted records, excluding those generated by the preceding rules.
+
+        Rather than a range join on the rank, which most backends can only execute
+        as a nested loop, the left hand records are replicated once for each offset
+        within the window, so that the right hand records are found by an
+        equi-join on the rank.
+        """
+        settings_obj = linker._settings_obj
+        unique_id_col = settings_obj._unique_id_column_name
+
+        id_expr_l = _composite_unique_id_from_nodes_sql(
+            settings_obj._unique_id_input_columns, "l"
+        )
+        id_expr_r = _composite_unique_id_from_nodes_sql(
+            settings_obj._unique_id_input_columns, "r"
+        )
+
+        # Both orientations of each pair are generated, and the where condition
+        # retains the one expected by the link type
+        offsets = [o for o in range(-self.window_size, self.window_size + 1) if o]
+        offsets_sql = " union all ".join(
+            f"select {offset} as __splink__offset" for offset in offsets
+        )
+
+        return f"""
+            select
+                {id_expr_l} as {unique_id_col}_l,
+                {id_expr_r} as {unique_id_col}_r
+            from {tablename} as l
+            cross join ({offsets_sql}) as offsets
+            inner join {tablename} as r
+            on (
+                r.__splink__sorted_neighbourhood_rank
+                    = l.__splink__sorted_neighbourhood_rank + offsets.__splink__offset
+                and ({self.blocking_rule_sql})
+            )
+            {_id_pairs_where_condition(linker)}
+            {self.exclude_pairs_generated_by_all_preceding_rules_sql(linker)}
+            """
+
+    def drop_materialised_id_pairs_dataframe(self):
+        self.neighbour_id_pair_table.drop_table_from_database_and_remove_from_cache()
+        self.neighbour_id_pair_table = None
+
+    def exclude_pairs_generated_by_this_rule_sql(self, linker: Linker):
+        return _id_pair_in_table_sql(linker, self.neighbour_id_pair_table)
+
+    def create_blocked_pairs_sql(
+        self,
+        linker: Linker,
+        where_condition,
+        probability,
+        match_key_hashes: MatchKeyHashes = None,
+    ):
+        if self.neighbour_id_pair_table is None:
+            raise ValueError(
+                "Sorted neighbourhood blocking rules are not supported for the "
+                "function you have called."
+            )
+        return _blocked_pairs_from_id_pairs_sql(
+            linker, self.neighbour_id_pair_table, self.match_key, probability
+        )
+
+    def as_dict(self):
+        output = super().as_dict()
+        output["sort_key"] = self.sort_key
+        output["window_size"] = self.window_size
+        return output
+
+    def _as_completed_dict(self):
+        return self.as_dict()
+
+    @property
+    def _human_readable_succinct(self):
+        sql = self._abbreviated_sql(75)
+        return (
+            f"Sorted neighbourhood blocking rule on {self.sort_key} with window "
+            f"size {self.window_size}, using SQL: {sql}"
+        )
+
+
+def materialise_sorted_neighbourhood_id_tables(
+    linker: Linker, input_dataframe: SplinkDataFrame = None
+):
+    """Materialise the id pairs generated by each sorted neighbourhood blocking
+    rule.  The records are read from `input_dataframe`, which defaults to
+    `__splink__df_concat_with_tf`.
+
+    Returns the sorted neighbourhood blocking rules.
+    """
+    settings_obj = linker._settings_obj
+
+    blocking_rules = settings_obj._blocking_rules_to_generate_predictions
+    sorted_neighbourhood_rules = [
+        br for br in blocking_rules if isinstance(br, SortedNeighbourhoodBlockingRule)
+    ]
+    if not sorted_neighbourhood_rules:
+        return []
+
+    if input_dataframe is None:
+        input_dataframe = linker._initialise_df_concat_with_tf()
+
+    for br in sorted_neighbourhood_rules:
+        sql = br.sorted_records_sql(linker, input_dataframe.templated_name)
+        linker._enqueue_sql(sql, "__splink__df_sorted_neighbourhood")
+
+        sql = br.marginal_neighbour_id_pairs_table_sql(
+            linker, "__splink__df_sorted_neighbourhood"
+        )
+        table_name = f"__splink__marginal_neighbour_ids_blocking_rule_mk_{br.match_key}"
+        linker._enqueue_sql(sql, table_name)
+
+        br.neighbour_id_pair_table = linker._execute_sql_pipeline([input_dataframe])
+    return sorted_neighbourhood_rules
+
+
+class EmbeddingNearestNeighbourBlockingRule(BlockingRule):
+    """Pairs each record with the `k` records whose embeddings, a numeric array
+    column of the input records, have the highest cosine similarity to its own.
+
+    The embeddings are read from the backend, and the nearest neighbours are found
+    in memory by chunked matrix products with NumPy.  The pairs of neighbours are
+    registered as a table, from which the id pairs of the rule are materialised.
+    Each record generates at most `k` comparisons, however its embedding is
+    distributed, and records whose embedding is null are not compared.
+
+    `blocking_rule` is an additional condition pairs of neighbours must satisfy.
+    It defaults to `1=1`, so that every pair of neighbours is compared.
+    """
+
+    def __init__(
+        self,
+        blocking_rule: str = "1=1",
+        sqlglot_dialect: str = None,
+        embedding_column: str = None,
+        k: int = 10,
+        chunk_size: int = 1024,
+    ):
+        if embedding_column is None:
+            raise ValueError(
+                "Nearest neighbour blocking rules need an embedding_column"
+            )
+        if k is None or k < 1:
+            raise ValueError("k must be at least 1")
+        if chunk_size is None or chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        super().__init__(blocking_rule, sqlglot_dialect)
+        self.embedding_column = embedding_column
+        self.k = k
+        self.chunk_size = chunk_size
+        self.neighbour_id_pair_table: SplinkDataFrame = None
+        self.nearest_neighbours_table: SplinkDataFrame = None
+
+    def register_nearest_neighbours_table(
+        self, linker: Linker, input_dataframe: SplinkDataFrame
+    ) -> SplinkDataFrame:
+        """Find the nearest neighbours of each record of `input_dataframe`, and
+        register the pairs of their ids as a table.  The table is dropped with the
+        id pairs of the rule, by `drop_materialised_id_pairs_dataframe`."""
+        settings_obj = linker._settings_obj
+        unique_id_input_columns = settings_obj._unique_id_input_columns
+        id_expr = _composite_unique_id_from_nodes_sql(unique_id_input_columns)
+        embedding = InputColumn(self.embedding_column, sql_dialect=linker._sql_dialect)
+
+        # Records from the same dataset are not compared in a link only job, so
+        # should not be each other's neighbours
+        link_only = settings_obj._link_type == "link_only"
+        group_sql = (
+            f", {unique_id_input_columns[0].name} as __splink__group"
+            if link_only
+            else ""
+        )
+        sql = f"""
+            select {id_expr} as __splink__id, {embedding.name} as __splink__embedding
+            {group_sql}
+            from {input_dataframe.physical_name}
+            where {embedding.name} is not null
+            """
+        linker._enqueue_sql(sql, "__splink__df_embeddings")
+        embeddings_df = linker._execute_sql_pipeline([input_dataframe])
+
+        # The embeddings are streamed in Arrow batches and converted to arrays, so
+        # that only the arrays, not a Python object per value, are held in memory
+        import numpy as np
+
+        ids, embeddings, groups = [], [], []
+        for batch in embeddings_df.iter_batches():
+            if batch.num_rows == 0:
+                continue
+            columns = dict(zip(batch.schema.names, batch.columns))
+            ids.extend(columns["__splink__id"].to_pylist())
+            values = columns["__splink__embedding"].flatten()
+            embeddings.append(
+                values.to_numpy(zero_copy_only=False)
+                .astype(np.float32)
+                .reshape(batch.num_rows, -1)
+            )
+            if link_only:
+                groups.extend(columns["__splink__group"].to_pylist())
+
+        rows, neighbours = nearest_neighbours(
+            np.concatenate(embeddings) if embeddings else np.empty((0, 0)),
+            self.k,
+            self.chunk_size,
+            groups if link_only else None,
+        )
+        table_name = f"__splink__nearest_neighbours_mk_{self.match_key}"
+        if len(rows) == 0:
+            # Spark cannot infer the types of the columns of an empty table, so it
+            # is selected from the embeddings, which have ids of the same type
+            sql = f"""
+                select __splink__id as __splink__id_l, __splink__id as __splink__id_r
+                from {embeddings_df.physical_name}
+                where 1 = 0
+                """
+            neighbours_table = linker._sql_to_splink_dataframe_checking_cache(
+                sql, table_name
+            )
+        else:
+            pairs = {
+                "__splink__id_l": [ids[i] for i in rows],
+                "__splink__id_r": [ids[i] for i in neighbours],
+            }
+            neighbours_table = linker.register_table(pairs, table_name, overwrite=True)
+        embeddings_df.drop_table_from_database_and_remove_from_cache()
+        return neighbours_table
+
+    def marginal_neighbour_id_pairs_table_sql(
+        self,
+        linker: Linker,
+        input_tablename: str,
+        nearest_neighbours_table: SplinkDataFrame,
+    ):
+        """The id pairs of records which are nearest neighbours of each other,
+        excluding those generated by the preceding rules"""
+        settings_obj = linker._settings_obj
+        unique_id_col = settings_obj._unique_id_column_name
+
+        id_expr_l = _composite_unique_id_from_nodes_sql(
+            settings_obj._unique_id_input_columns, "l"
+        )
+        id_expr_r = _composite_unique_id_from_nodes_sql(
+            settings_obj._unique_id_input_columns, "r"
+        )
+
+        # Both orientations of each pair are generated, and the where condition
+        # retains the one expected by the link type
+        neighbours = nearest_neighbours_table.physical_name
+        return f"""
+            select distinct
+                {id_expr_l} as {unique_id_col}_l,
+                {id_expr_r} as {unique_id_col}_r
+            from (
+                select __splink__id_l, __splink__id_r from {neighbours}
+                union all
+                select __splink__id_r, __splink__id_l from {neighbours}
+            ) as neighbours
+            inner join {input_tablename} as l
+            on neighbours.__splink__id_l = {id_expr_l}
+            inner join {input_tablename} as r
+            on (
+                neighbours.__splink__id_r = {id_expr_r}
+                and ({self.blocking_rule_sql})
+            )
+            {_id_pairs_where_condition(linker)}
+            {self.exclude_pairs_generated_by_all_preceding_rules_sql(linker)}
+            """
+
+    def drop_materialised_id_pairs_dataframe(self):
+        self.neighbour_id_pair_table.drop_table_from_database_and_remove_from_cache()
+        self.neighbour_id_pair_table = None
+        # The neighbours are registered from memory, so are not marked as created
+        # by Splink
+        self.nearest_neighbours_table.drop_table_from_database_and_remove_from_cache(
+            force_non_splink_table=True
+        )
+        self.nearest_neighbours_table = None
+
+    def exclude_pairs_generated_by_this_rule_sql(self, linker: Linker):
+        return _id_pair_in_table_sql(linker, self.neighbour_id_pair_table)
+
+    def create_blocked_pairs_sql(
+        self,
+        linker: Linker,
+        where_condition,
+        probability,
+        match_key_hashes: MatchKeyHashes = None,
+    ):
+        if self.neighbour_id_pair_table is None:
+            raise ValueError(
+                "Nearest neighbour blocking rules are not supported for the "
+                "function you have called."
+            )
+        return _blocked_pairs_from_id_pairs_sql(
+            linker, self.neighbour_id_pair_table, self.match_key, probability
+        )
+
+    def as_dict(self):
+        output = super().as_dict()
+        output["embedding_column"] = self.embedding_column
+        output["k"] = self.k
+        output["chunk_size"] = self.chunk_size
+        return output
+
+    def _as_completed_dict(self):
+        return self.as_dict()
+
+    @property
+    def _human_readable_succinct(self):
+        sql = self._abbreviated_sql(75)
+        return (
+            f"Nearest neighbour blocking rule on {self.embedding_column} with k = "
+            f"{self.k}, using SQL: {sql}"
+        )
+
+
+def materialise_nearest_neighbour_id_tables(
+    linker: Linker, input_dataframe: SplinkDataFrame = None
+):
+    """Materialise the id pairs generated by each nearest neighbour blocking rule.
+    The records are read from `input_dataframe`, which defaults to
+    `__splink__df_concat_with_tf`.
+
+    Returns the nearest neighbour blocking rules.
+    """
+    settings_obj = linker._settings_obj
+
+    blocking_rules = settings_obj._blocking_rules_to_generate_predictions
+    nearest_neighbour_rules = [
+        br
+        for br in blocking_rules
+        if isinstance(br, EmbeddingNearestNeighbourBlockingRule)
+    ]
+    if not nearest_neighbour_rules:
+        return []
+
+    if input_dataframe is None:
+        input_dataframe = linker._initialise_df_concat_with_tf()
+
+    for br in nearest_neighbour_rules:
+        br.nearest_neighbours_table = br.register_nearest_neighbours_table(
+            linker, input_dataframe
+        )
+        sql = br.marginal_neighbour_id_pairs_table_sql(
+            linker, input_dataframe.physical_name, br.nearest_neighbours_table
+        )
+        table_name = f"__splink__marginal_neighbour_ids_blocking_rule_mk_{br.match_key}"
+        linker._enqueue_sql(sql, table_name)
+
+        br.neighbour_id_pair_table = linker._execute_sql_pipeline(
+            [input_dataframe, br.nearest_neighbours_table]
+        )
+    return nearest_neighbour_rules
+
+
+@dataclass(frozen=True)
+class HotKeySalting:
+    """Settings for splitting the comparisons generated by the largest blocks of
+    each blocking rule.  See `Linker.set_hot_key_salting()`"""
+
+    max_block_size: int
+    max_partitions: int
+
+
+def materialise_hot_key_tables(linker: Linker):
+    """For each blocking rule used to generate predictions, find the values of its
+    join keys which generate more than `max_block_size` comparisons, and
+    materialise them along with the number of partitions to split their
+    comparisons into.
+
+    Returns the blocking rules which have hot keys.
+    """
+    hot_key_salting: HotKeySalting = linker._hot_key_salting
+    if hot_key_salting is None:
+        return []
+
+    # Avoid a circular import, since analyse_blocking imports from this module
+    from .analyse_blocking import (
+        count_comparisons_from_blocking_rule_pre_filter_conditions_sqls,
+    )
+
+    settings_obj = linker._settings_obj
+    # Salted and exploding blocking rules generate comparisons differently, and
+    # rules without equi-join conditions have no keys
+    blocking_rules = [
+        br
+        for br in settings_obj._blocking_rules_to_generate_predictions
+        if type(br) is BlockingRule and br._equi_join_conditions
+    ]
+    if not blocking_rules:
+        return []
+
+    input_dataframe = linker._initialise_df_concat_with_tf()
+
+    if linker._two_dataset_link_only:
+        input_tablenames = {}
+    else:
+        input_tablenames = {
+            "input_tablename_l": "__splink__df_concat_with_tf",
+            "input_tablename_r": "__splink__df_concat_with_tf",
+        }
+
+    max_block_size = hot_key_salting.max_block_size
+    rules_with_hot_keys = []
+    for br in blocking_rules:
+        sqls = count_comparisons_from_blocking_rule_pre_filter_conditions_sqls(
+            linker, br, **input_tablenames
+        )
+        # The final step sums the counts of all blocks
+        for sql in sqls[:-1]:
+            linker._enqueue_sql(sql["sql"], sql["output_table_name"])
+
+        key_columns = ", ".join(
+            f"key_{i}" for i in range(len(br._equi_join_conditions))
+        )
+        sql = f"""
+        select
+            {key_columns},
+            block_count,
+            least(
+                cast(ceil(block_count / {max_block_size}) as int),
+                {hot_key_salting.max_partitions}
+            ) as __splink__salting_partitions
+        from __splink__block_counts
+        where block_count > {max_block_size}
+        """
+        linker._enqueue_sql(sql, f"__splink__hot_keys_mk_{br.match_key}")
+        hot_keys_table = linker._execute_sql_pipeline([input_dataframe])
+
+        sql = f"""
+        select
+            count(*) as hot_key_count,
+            max(__splink__salting_partitions) as partitions
+        from {hot_keys_table.physical_name}
+        """
+        summary_table = linker._sql_to_splink_dataframe_checking_cache(
+            sql, "__splink__hot_keys_summary"
+        )
+        summary = summary_table.as_record_dict()[0]
+        summary_table.drop_table_from_database_and_remove_from_cache()
+
+        if not summary["hot_key_count"]:
+            hot_keys_table.drop_table_from_database_and_remove_from_cache()
+            continue
+
+        logger.info(
+            f"Splitting the comparisons generated by {summary['hot_key_count']} "
+            f"hot key(s) of blocking rule {br.blocking_rule_sql} into up to "
+            f"{summary['partitions']} partitions"
+        )
+        br.hot_keys_table = hot_keys_table
+        br.hot_key_partitions = int(summary["partitions"])
+        rules_with_hot_keys.append(br)
+
+    return rules_with_hot_keys
+
+
+def _id_pairs_where_condition(linker: Linker):
+    """The where condition of the tables of id pairs materialised by exploding and
+    sorted neighbourhood blocking rules.  Pairs across two datasets are oriented
+    so that the left hand record belongs to the first dataset."""
+    settings_obj = linker._settings_obj
+    link_type = settings_obj._link_type
+
+    if linker._two_dataset_link_only:
+        link_type = "two_dataset_link_only"
+
+    if linker._self_link_mode:
+        link_type = "self_link"
+
+    where_condition = _sql_gen_where_condition(
+        link_type, settings_obj._unique_id_input_columns
+    )
+
+    if link_type == "two_dataset_link_only":
+        where_condition = where_condition + " and l.source_dataset < r.source_dataset"
+
+    return where_condition
+
+
+def _id_pair_in_table_sql(linker: Linker, id_pairs_table: SplinkDataFrame):
+    """A SQL condition which is true if the pair of records is in the table of id
+    pairs"""
+    unique_id_column = linker._settings_obj._unique_id_column_name
+    ids_to_compare_sql = f"select * from {id_pairs_table.physical_name}"
+
+    settings_obj = linker._settings_obj
+    id_expr_l = _composite_unique_id_from_nodes_sql(
+        settings_obj._unique_id_input_columns, "l"
+    )
+    id_expr_r = _composite_unique_id_from_nodes_sql(
+        settings_obj._unique_id_input_columns, "r"
+    )
+
+    return f"""EXISTS (
+        select 1 from ({ids_to_compare_sql}) as ids_to_compare
+        where (
+            {id_expr_l} = ids_to_compare.{unique_id_column}_l and
+            {id_expr_r} = ids_to_compare.{unique_id_column}_r
+        )
+    )
+    """
+
+
+def _blocked_pairs_from_id_pairs_sql(
+    linker: Linker, id_pairs_table: SplinkDataFrame, match_key, probability
+):
+    """The blocked pairs of records whose ids are in the table of id pairs"""
+    settings_obj = linker._settings_obj
+    sql_select_expr = ", ".join(settings_obj._columns_to_select_for_blocking)
+
+    id_expr_l = _composite_unique_id_from_nodes_sql(
+        settings_obj._unique_id_input_columns, "l"
+    )
+    id_expr_r = _composite_unique_id_from_nodes_sql(
+        settings_obj._unique_id_input_columns, "r"
+    )
+
+    unique_id_col = settings_obj._unique_id_column_name
+    return f"""
+        select
+            {sql_select_expr},
+            '{match_key}' as match_key
+            {probability}
+        from {id_pairs_table.physical_name} as pairs
+        left join {linker._input_tablename_l} as l
+            on pairs.{unique_id_col}_l={id_expr_l}
+        left join {linker._input_tablename_r} as r
+            on pairs.{unique_id_col}_r={id_expr_r}
+    """
+
+
+def _sql_gen_where_condition(link_type, unique_id_cols):
+    id_expr_l = _composite_unique_id_from_nodes_sql(unique_id_cols, "l")
+    id_expr_r = _composite_unique_id_from_nodes_sql(unique_id_cols, "r")
+
+    if link_type in ("two_dataset_link_only", "self_link"):
+        where_condition = " where 1=1 "
+    elif link_type in ["link_and_dedupe", "dedupe_only"]:
+        where_condition = f"where {id_expr_l} < {id_expr_r}"
+    elif link_type == "link_only":
+        source_dataset_col = unique_id_cols[0]
+        where_condition = (
+            f"where {id_expr_l} < {id_expr_r} "
+            f"and l.{source_dataset_col.name} != r.{source_dataset_col.name}"
+        )
+
+    return where_condition
+
+
+class MatchKeyHashes:
+    """Hashes of the equi-join keys of blocking rules, computed once per record.
+
+    A pair of records can only have been generated by a preceding blocking rule if
+    the hashes of that rule's join keys are equal.  Subsequent rules can therefore
+    exclude these pairs by comparing two integers, rather than by evaluating the
+    preceding rule for every pair they generate.  The preceding rule is still
+    evaluated where the hashes are equal, so a hash collision cannot cause a pair
+    to be lost.
+
+    Only rules which generate their pairs by joining on their equi-join keys are
+    hashed.  Rules without equi-join conditions, and exploding, sorted
+    neighbourhood, nearest neighbour and geospatial rules, whose pairs are found
+    by other means, are excluded by evaluating the rule as usual.
+    """
+
+    def __init__(self, linker: Linker, blocking_rules: List[BlockingRule]):
+        self.linker = linker
+        # The final rule is never a preceding rule, so never needs to be hashed
+        self.hashed_rules = [
+            br
+            for br in blocking_rules[:-1]
+            if not isinstance(
+                br,
+                (
+                    ExplodingBlockingRule,
+                    SortedNeighbourhoodBlockingRule,
+                    EmbeddingNearestNeighbourBlockingRule,
+                    GeoGridBlockingRule,
+                ),
+            )
+            and br._equi_join_conditions
+        ]
+
+    def is_hashed(self, br: BlockingRule):
+        return any(br is hashed_rule for hashed_rule in self.hashed_rules)
+
+    def _hash_columns(self, br: BlockingRule):
+        """The names of the columns holding the hashes of the left and right join
+        keys of the rule, and the join keys themselves"""
+        keys = br._equi_join_conditions
+        keys_l = [key_l for key_l, _ in keys]
+        keys_r = [key_r for _, key_r in keys]
+        column_name = f"__splink__match_key_hash_{br.match_key}"
+        if keys_l == keys_r:
+            return (column_name, keys_l), (column_name, keys_r)
+        return (f"{column_name}_l", keys_l), (f"{column_name}_r", keys_r)
+
+    def _hash_sql(self, keys):
+        # The join condition is not satisfied if any of the keys are null
+        any_key_null = " or ".join(f"({key}) is null" for key in keys)
+        return (
+            f"case when {any_key_null} then null "
+            f"else {self.linker._hash_sql(keys)} end"
+        )
+
+    @property
+    def tablenames(self):
+        tablename_l = self.linker._input_tablename_l
+        tablename_r = self.linker._input_tablename_r
+        if tablename_l == tablename_r:
+            tablename = f"{tablename_l}_with_match_key_hashes"
+            return tablename, tablename
+        return (
+            f"{tablename_l}_with_match_key_hashes",
+            f"{tablename_r}_with_match_key_hashes",
+        )
+
+    def _hashes_sql(self, input_tablename, sides):
+        hash_columns = {}
+        for br in self.hashed_rules:
+            for side, (column_name, keys) in zip("lr", self._hash_columns(br)):
+                if side in sides:
+                    hash_columns[column_name] = self._hash_sql(keys)
+
+        hashes_select_expr = ", ".join(
+            f"{hash_sql} as {column_name}"
+            for column_name, hash_sql in hash_columns.items()
+        )
+        return f"select *, {hashes_select_expr} from {input_tablename}"
+
+    def input_tables_sqls(self):
+        """The SQL to add the hashes to the tables of records being blocked"""
+        input_tablename_l = self.linker._input_tablename_l
+        input_tablename_r = self.linker._input_tablename_r
+        tablename_l, tablename_r = self.tablenames
+
+        # The tables are read by every blocking rule, so are materialised to avoid
+        # the hashes being recomputed by each rule
+        if input_tablename_l == input_tablename_r:
+            sql = self._hashes_sql(input_tablename_l, sides="lr")
+            return [{"sql": sql, "output_table_name": tablename_l, "materialise": True}]
+
+        return [
+            {
+                "sql": self._hashes_sql(input_tablename_l, sides="l"),
+                "output_table_name": tablename_l,
+                "materialise": True,
+            },
+            {
+                "sql": self._hashes_sql(input_tablename_r, sides="r"),
+                "output_table_name": tablename_r,
+                "materialise": True,
+            },
+        ]
+
+    def exclude_pairs_generated_by_rule_sql(self, br: BlockingRule):
+        (column_name_l, _), (column_name_r, _) = self._hash_columns(br)
+        rule_sql = br.exclude_pairs_generated_by_this_rule_sql(self.linker)
+        return (
+            f"(case when l.{column_name_l} = r.{column_name_r} "
+            f"then {rule_sql} else false end)"
+        )
+
+
+def _blocking_input_tablenames(linker: Linker, match_key_hashes: MatchKeyHashes):
+    if match_key_hashes is not None:
+        return match_key_hashes.tablenames
+    return linker._input_tablename_l, linker._input_tablename_r
+
+
+def block_using_rules_sqls(linker: Linker):
+    """Use the blocking rules specified in the linker's settings object to
+    generate a SQL statement that will create pairwise record comparions
+    according to the blocking rule(s).
+
+    Where there are multiple blocking rules, the SQL statement contains logic
+    so that duplicate comparisons are not generated.
+    """
+
+    sqls = []
+
+    # For the two dataset link only, rather than a self join of
+    # __splink__df_concat_with_tf, it's much faster to split the input
+    # into two tables, and join (because then Splink doesn't have to evaluate)
+    # intra-dataset comparisons.
+    # see https://github.com/moj-analytical-services/splink/pull/1359
+    if (
+        linker._two_dataset_link_only
+        and not linker._find_new_matches_mode
+        and not linker._compare_two_records_mode
+    ):
+        source_dataset_col = (
+            source_dataset_col
+        ) = linker._settings_obj._source_dataset_column_name
+        # Need df_l to be the one with the lowest id to preeserve the property
+        # that the left dataset is the one with the lowest concatenated id
+
+        # This also needs to work for training u
+        if linker._train_u_using_random_sample_mode:
+            spl_switch = "_sample"
+        else:
+            spl_switch = ""
+
+        df_concat_tf = linker._intermediate_table_cache["__splink__df_concat_with_tf"]
+
+        sql = f"""
+        select * from __splink__df_concat_with_tf{spl_switch}
+        where {source_dataset_col} =
+            (select min({source_dataset_col}) from {df_concat_tf.physical_name})
+        """
+        sqls.append(
+            {
                 "sql": sql,
                 "output_table_name": f"__splink__df_concat_with_tf{spl_switch}_left",
             }
@@ -536,10 +2055,33 @@ def block_using_rules_sqls(linker: Linker):
     else:
         probability = ""
 
+    match_key_hashes = None
+    if linker._blocking_deduplication_strategy == "hashed_match_keys":
+        match_key_hashes = MatchKeyHashes(linker, blocking_rules)
+        if match_key_hashes.hashed_rules:
+            sqls.extend(match_key_hashes.input_tables_sqls())
+        else:
+            match_key_hashes = None
+
+    # The records are pruned in a separate step.  Both sides of the join read it,
+    # so the pipeline materialises it rather than pruning the records twice
+    for br in blocking_rules:
+        if br._uses_singleton_key_pruning(linker, match_key_hashes):
+            sqls.append(
+                {
+                    "sql": br.pruned_input_table_sql(linker, match_key_hashes),
+                    "output_table_name": br._pruned_input_tablename(
+                        linker, match_key_hashes
+                    ),
+                }
+            )
+
     br_sqls = []
 
     for br in blocking_rules:
-        sql = br.create_blocked_pairs_sql(linker, where_condition, probability)
+        sql = br.create_blocked_pairs_sql(
+            linker, where_condition, probability, match_key_hashes
+        )
         br_sqls.append(sql)
 
     sql = " UNION ALL ".join(br_sqls)
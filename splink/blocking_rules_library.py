@@ -2,12 +2,11 @@ from __future__ import annotations
 
 import warnings
 
-import sqlglot
-
 from .blocking import BlockingRule, blocking_rule_to_obj
 from .blocking_rule_composition import and_
 from .misc import ensure_is_list
 from .sql_transform import add_quotes_and_table_prefix
+from .sqlglot_cache import parse_one
 
 
 def exact_match_rule(
@@ -36,7 +35,7 @@ def exact_match_rule(
         stacklevel=2,
     )
 
-    syntax_tree = sqlglot.parse_one(col_name, read=_sql_dialect)
+    syntax_tree = parse_one(col_name, read=_sql_dialect)
 
     l_col = add_quotes_and_table_prefix(syntax_tree, "l").sql(_sql_dialect)
     r_col = add_quotes_and_table_prefix(syntax_tree, "r").sql(_sql_dialect)
@@ -1,6 +1,8 @@
 import logging
 from collections import UserDict
 from copy import copy
+from itertools import count
+from weakref import finalize
 
 from .splink_dataframe import SplinkDataFrame
 
@@ -12,34 +14,90 @@ class CacheDictWithLogging(UserDict):
         super().__init__()
         self.executed_queries = []
         self.queries_retrieved_from_cache = []
+        # Optional on-disk store of results that persists across sessions,
+        # see Linker.enable_persistent_cache()
+        self.persistent_cache = None
+
+        # Optional limit on the total size of tables held in the cache,
+        # see Linker.set_memory_budget()
+        self.memory_budget_bytes = None
+        self._table_sizes = {}
+        self._last_used = {}
+        self._use_counter = count()
+        # The number of live SplinkDataFrames handed out by the cache, by physical
+        # name.  A table with no live handles is no longer in use by Splink or the
+        # user, and can be safely evicted
+        self._reference_counts = {}
+        # Whether tables are dropped once no longer referenced, rather than only
+        # when over the memory budget, and those awaiting a drop
+        self.drop_unreferenced = False
+        self._unreferenced = set()
+
+    def _track_handle(self, splink_dataframe: SplinkDataFrame):
+        physical_name = splink_dataframe.physical_name
+        counts = self._reference_counts
+        counts[physical_name] = counts.get(physical_name, 0) + 1
+        finalize(splink_dataframe, self._release_handle, physical_name)
+
+    def _release_handle(self, physical_name):
+        counts = self._reference_counts
+        counts[physical_name] -= 1
+        if counts[physical_name] == 0:
+            del counts[physical_name]
+            if self.drop_unreferenced:
+                # Dropped by drop_unreferenced_tables(), since this may be called
+                # by the garbage collector part way through executing SQL
+                self._unreferenced.add(physical_name)
+
+    def _mark_used(self, physical_name):
+        self._last_used[physical_name] = next(self._use_counter)
 
     def __getitem__(self, key) -> SplinkDataFrame:
         splink_dataframe = super().__getitem__(key)
 
         # Return a copy so that user can modify physical or templated name
         # without modifying the version in the cache
-        return copy(splink_dataframe)
+        splink_dataframe = copy(splink_dataframe)
+        self._track_handle(splink_dataframe)
+        return splink_dataframe
 
     def __setitem__(self, key, value):
         if not isinstance(value, SplinkDataFrame):
             raise TypeError("Cached items must be of type SplinkDataFrame")
 
-        super().__setitem__(key, value)
+        # Store a copy, so that the cache's own reference does not count
+        # towards the references held by the caller
+        super().__setitem__(key, copy(value))
+        self._track_handle(value)
+        self._mark_used(value.physical_name)
 
         logger.log(
             1, f"Setting cache for {key}" f" with physical name {value.physical_name}"
         )
 
+    def __delitem__(self, key):
+        physical_name = self.data[key].physical_name
+        super().__delitem__(key)
+
+        if not any(df.physical_name == physical_name for df in self.data.values()):
+            self._table_sizes.pop(physical_name, None)
+            self._last_used.pop(physical_name, None)
+
     def invalidate_cache(self):
         self.data = dict()
+        self._table_sizes = {}
+        self._last_used = {}
+        self._unreferenced = set()
 
     def get_with_logging(self, key):
         df = self[key]
         phy_name = df.physical_name
+        self._mark_used(phy_name)
         logger.debug(
             f"Using cache for template name {key}" f" with physical name {phy_name}"
         )
-        self.queries_retrieved_from_cache.append(df)
+        # Track a copy, so the tracker does not hold a reference to the table
+        self.queries_retrieved_from_cache.append(copy(df))
 
         return df
 
@@ -72,3 +130,87 @@ class CacheDictWithLogging(UserDict):
                 names.append(df.templated_name)
 
         return name_to_find in names
+
+    def record_table_size(self, physical_name, size_bytes):
+        if size_bytes is not None:
+            self._table_sizes[physical_name] = size_bytes
+
+    @property
+    def total_size_bytes(self):
+        return sum(self._table_sizes.values())
+
+    def reference_count(self, physical_name):
+        """The number of live SplinkDataFrames which refer to this table, excluding
+        the cache's own copy"""
+        return self._reference_counts.get(physical_name, 0)
+
+    def _is_evictable(self, splink_dataframe: SplinkDataFrame):
+        # Only evict tables Splink can recompute if they're needed again
+        return (
+            splink_dataframe.created_by_splink
+            and splink_dataframe.sql_used_to_create is not None
+            and self.reference_count(splink_dataframe.physical_name) == 0
+        )
+
+    def drop_unreferenced_tables(self, protected_physical_names=()):
+        """Drop the intermediate tables which have stopped being referenced by any
+        SplinkDataFrame since this was last called.
+
+        Tables cached by their templated name, such as the term frequency tables,
+        are looked up by name whenever they are needed, so are kept until evicted
+        to stay within the memory budget.
+        """
+        unreferenced, self._unreferenced = self._unreferenced, set()
+        cached_by_name = {}
+        for key, df in self.data.items():
+            if key == df.templated_name:
+                unreferenced.discard(df.physical_name)
+            cached_by_name[df.physical_name] = df
+
+        for physical_name in unreferenced - set(protected_physical_names):
+            splink_dataframe = cached_by_name.get(physical_name)
+            if splink_dataframe is None or not self._is_evictable(splink_dataframe):
+                continue
+            logger.debug(
+                f"Dropping {splink_dataframe.templated_name} ({physical_name}) "
+                "as it is no longer referenced"
+            )
+            splink_dataframe.drop_table_from_database_and_remove_from_cache()
+
+    def enforce_memory_budget(self, protected_physical_names=()):
+        """Drop least recently used, unreferenced tables until the total size of
+        tables in the cache is within the memory budget"""
+        if self.memory_budget_bytes is None:
+            return
+        if self.total_size_bytes <= self.memory_budget_bytes:
+            return
+
+        cached_by_physical_name = {df.physical_name: df for df in self.data.values()}
+        candidates = sorted(
+            (
+                name
+                for name, df in cached_by_physical_name.items()
+                if name in self._table_sizes
+                and name not in protected_physical_names
+                and self._is_evictable(df)
+            ),
+            key=lambda name: self._last_used.get(name, -1),
+        )
+
+        for physical_name in candidates:
+            if self.total_size_bytes <= self.memory_budget_bytes:
+                break
+            splink_dataframe = cached_by_physical_name[physical_name]
+            logger.debug(
+                f"Evicting {splink_dataframe.templated_name} ({physical_name}) "
+                f"using {self._table_sizes[physical_name]:,} bytes from the cache "
+                "to stay within the memory budget"
+            )
+            splink_dataframe.drop_table_from_database_and_remove_from_cache()
+
+        if self.total_size_bytes > self.memory_budget_bytes:
+            logger.info(
+                f"Tables in the Splink cache use {self.total_size_bytes:,} bytes, "
+                f"exceeding the memory budget of {self.memory_budget_bytes:,} bytes, "
+                "but the remaining tables are still in use"
+            )
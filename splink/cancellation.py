@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+from .exceptions import ExecutionCancelledException
+
+if TYPE_CHECKING:
+    from .splink_dataframe import SplinkDataFrame
+
+
+class Cancellation:
+    """Allows an operation running on another thread, such as `linker.predict()`
+    started by `linker.apredict()`, to be cancelled.
+
+    Cancellation is cooperative: the linker checks whether it has been cancelled
+    before executing each SQL statement, and raises `ExecutionCancelledException` if
+    so.  The tables it creates are recorded so they can be dropped if the operation
+    is cancelled part way through.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self.created_tables: list[SplinkDataFrame] = []
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise ExecutionCancelledException("The Splink operation was cancelled")
+
+    def record_created_table(self, splink_dataframe: SplinkDataFrame):
+        # Tables may be created by several threads at once if independent pipelines
+        # are executed concurrently
+        with self._lock:
+            self.created_tables.append(splink_dataframe)
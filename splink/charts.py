@@ -1,19 +1,21 @@
 import json
 import math
 import os
-
-import numpy as np
-import pandas as pd
+from functools import lru_cache
 
 from .misc import read_resource
 from .waterfall_chart import records_to_waterfall_data
 
-altair_installed = True
 
-try:
-    import altair as alt
-except ImportError:
-    altair_installed = False
+@lru_cache(maxsize=None)
+def _altair():
+    """Import altair on first use rather than when Splink is imported, since it is
+    slow to import.  Returns None if altair is not installed."""
+    try:
+        import altair as alt
+    except ImportError:
+        return None
+    return alt
 
 
 def load_chart_definition(filename):
@@ -31,8 +33,9 @@ def _load_external_libs():
 
 
 def altair_or_json(chart_dict, as_dict=False):
-    if altair_installed:
-        if not as_dict:
+    if not as_dict:
+        alt = _altair()
+        if alt is not None:
             try:
                 return alt.Chart.from_dict(chart_dict)
 
@@ -98,6 +101,9 @@ def match_weights_chart(records, as_dict=False):
     records = [r for r in records if r["comparison_vector_value"] != -1]
     chart["data"]["values"] = records
 
+    import numpy as np
+    import pandas as pd
+
     df = pd.DataFrame.from_records(records)["log2_bayes_factor"]
     df = df.replace([np.inf, -np.inf], np.nan)
     df = df.dropna()
@@ -5,8 +5,6 @@ import os
 import random
 from typing import TYPE_CHECKING, Any
 
-from jinja2 import Template
-
 from .exceptions import SplinkException
 from .misc import EverythingEncoder, read_resource
 from .splink_dataframe import SplinkDataFrame
@@ -339,6 +337,8 @@ def render_splink_cluster_studio_html(
     edges_recs = df_edges_as_records(linker, df_predicted_edges, df_nodes)
 
     # Render template with cluster, nodes and edges
+    from jinja2 import Template
+
     template_path = "files/splink_cluster_studio/cluster_template.j2"
     template = Template(read_resource(template_path))
 
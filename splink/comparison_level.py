@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 import math
 import re
+from functools import lru_cache
 from statistics import median
 from textwrap import dedent
 from typing import TYPE_CHECKING
@@ -23,6 +24,7 @@ from .misc import (
 )
 from .parse_sql import get_columns_used_from_sql
 from .sql_transform import sqlglot_tree_signature
+from .sqlglot_cache import parse_one
 
 # https://stackoverflow.com/questions/39740632/python-type-hinting-without-cyclic-imports
 if TYPE_CHECKING:
@@ -31,10 +33,15 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def _exact_match_signature():
+    return sqlglot_tree_signature(parse_one("col_l = col_r"))
+
+
 def _is_exact_match(sql_syntax_tree):
     signature = sqlglot_tree_signature(sql_syntax_tree)
 
-    if signature != sqlglot_tree_signature(sqlglot.parse_one("col_l = col_r")):
+    if signature != _exact_match_signature():
         return False
 
     cols = [s.output_name for s in sql_syntax_tree.find_all(Column)]
@@ -97,6 +104,15 @@ def _default_u_values(num_levels):
     return u_vals
 
 
+def _bayes_factor_from_m_u(m_probability, u_probability):
+    if m_probability is None or u_probability is None:
+        return None
+    elif u_probability == 0:
+        return math.inf
+    else:
+        return m_probability / u_probability
+
+
 class ComparisonLevel:
     """Each ComparisonLevel defines a gradation (category) of similarity within a
     `Comparison`.
@@ -270,19 +286,25 @@ class ComparisonLevel:
 
     @property
     def _m_probability_description(self):
-        if self.m_probability is not None:
+        return self._describe_m_probability(self.m_probability)
+
+    def _describe_m_probability(self, m_probability):
+        if m_probability is not None:
             return (
                 "Amongst matching record comparisons, "
-                f"{self.m_probability:.2%} of records are in the "
+                f"{m_probability:.2%} of records are in the "
                 f"{self.label_for_charts.lower()} comparison level"
             )
 
     @property
     def _u_probability_description(self):
-        if self.u_probability is not None:
+        return self._describe_u_probability(self.u_probability)
+
+    def _describe_u_probability(self, u_probability):
+        if u_probability is not None:
             return (
                 "Amongst non-matching record comparisons, "
-                f"{self.u_probability:.2%} of records are in the "
+                f"{u_probability:.2%} of records are in the "
                 f"{self.label_for_charts.lower()} comparison level"
             )
 
@@ -360,12 +382,7 @@ class ComparisonLevel:
     def _bayes_factor(self):
         if self.is_null_level:
             return 1.0
-        if self.m_probability is None or self.u_probability is None:
-            return None
-        elif self.u_probability == 0:
-            return math.inf
-        else:
-            return self.m_probability / self.u_probability
+        return _bayes_factor_from_m_u(self.m_probability, self.u_probability)
 
     @property
     def _log2_bayes_factor(self):
@@ -376,18 +393,21 @@ class ComparisonLevel:
 
     @property
     def _bayes_factor_description(self):
+        return self._describe_bayes_factor(self._bayes_factor)
+
+    def _describe_bayes_factor(self, bayes_factor):
         text = (
             f"If comparison level is `{self.label_for_charts.lower()}` "
             "then comparison is"
         )
-        if self._bayes_factor == math.inf:
+        if bayes_factor == math.inf:
             return f"{text} certain to be a match"
-        elif self._bayes_factor == 0.0:
+        elif bayes_factor == 0.0:
             return f"{text} impossible to be a match"
-        elif self._bayes_factor >= 1.0:
-            return f"{text} {self._bayes_factor:,.2f} times more likely to be a match"
+        elif bayes_factor >= 1.0:
+            return f"{text} {bayes_factor:,.2f} times more likely to be a match"
         else:
-            mult = 1 / self._bayes_factor
+            mult = 1 / bayes_factor
             return f"{text}  {mult:,.2f} times less likely to be a match"
 
     @property
@@ -431,12 +451,50 @@ class ComparisonLevel:
         if dialect is None:
             dialect = "spark"
         try:
-            sqlglot.parse_one(sql, read=dialect)
+            parse_one(sql, read=dialect)
         except sqlglot.ParseError as e:
             raise ValueError(f"Error parsing sql_statement:\n{sql}") from e
 
         return True
 
+    @property
+    def _precomputed_columns(self) -> dict:
+        """Columns computed once per record when the input records are
+        concatenated, as a dict of column name to the SQL expression computing it
+        from the input columns.  The sql condition refers to them with the usual
+        `_l` and `_r` suffixes."""
+        return self._level_dict.get("precomputed_columns") or {}
+
+    @property
+    def _sql_condition_of_input_columns(self) -> str:
+        """The sql condition, with references to precomputed columns replaced by
+        the expressions which compute them from the input columns"""
+        if not self._precomputed_columns or self._is_else_level:
+            return self.sql_condition
+
+        precomputed = {
+            name.lower(): sql for name, sql in self._precomputed_columns.items()
+        }
+
+        def expand(node):
+            if not isinstance(node, Column) or node.table:
+                return node
+            match = re.match(r"(.*)(_[lr])$", node.name, flags=re.IGNORECASE)
+            if not match or match.group(1).lower() not in precomputed:
+                return node
+            expression = parse_one(
+                precomputed[match.group(1).lower()], read=self.sql_dialect
+            )
+            for col in expression.find_all(Column):
+                col.set(
+                    "this",
+                    Identifier(this=col.name + match.group(2), quoted=col.this.quoted),
+                )
+            return sqlglot.exp.Paren(this=expression)
+
+        tree = parse_one(self.sql_condition, read=self.sql_dialect)
+        return tree.transform(expand).sql(dialect=self.sql_dialect)
+
     @property
     def _input_columns_used_by_sql_condition(self) -> list[InputColumn]:
         # returns e.g. InputColumn(first_name), InputColumn(surname)
@@ -444,7 +502,9 @@ class ComparisonLevel:
         if self._is_else_level:
             return []
 
-        cols = get_columns_used_from_sql(self.sql_condition, dialect=self.sql_dialect)
+        cols = get_columns_used_from_sql(
+            self._sql_condition_of_input_columns, dialect=self.sql_dialect
+        )
         # Parsed order seems to be roughly in reverse order of apearance
         cols = cols[::-1]
 
@@ -472,6 +532,10 @@ class ComparisonLevel:
             if self._tf_adjustment_input_column:
                 output_cols.extend(self._tf_adjustment_input_column.l_r_tf_names_as_l_r)
 
+        for name in self._precomputed_columns:
+            col = InputColumn(name, sql_dialect=self.sql_dialect)
+            output_cols.extend(col.l_r_names_as_l_r)
+
         return dedupe_preserving_order(output_cols)
 
     @property
@@ -494,9 +558,7 @@ class ComparisonLevel:
         if self._is_else_level:
             return False
 
-        sql_syntax_tree = sqlglot.parse_one(
-            self.sql_condition.lower(), read=self.sql_dialect
-        )
+        sql_syntax_tree = parse_one(self.sql_condition.lower(), read=self.sql_dialect)
         sql_cnf = simplify(normalize(sql_syntax_tree))
 
         exprs = _get_and_subclauses(sql_cnf)
@@ -507,9 +569,7 @@ class ComparisonLevel:
 
     @property
     def _exact_match_colnames(self):
-        sql_syntax_tree = sqlglot.parse_one(
-            self.sql_condition.lower(), read=self.sql_dialect
-        )
+        sql_syntax_tree = parse_one(self.sql_condition.lower(), read=self.sql_dialect)
         sql_cnf = simplify(normalize(sql_syntax_tree))
 
         exprs = _get_and_subclauses(sql_cnf)
@@ -660,6 +720,9 @@ class ComparisonLevel:
         if self.disable_tf_exact_match_detection:
             output["disable_tf_exact_match_detection"] = True
 
+        if self._precomputed_columns:
+            output["precomputed_columns"] = self._precomputed_columns
+
         return output
 
     def _as_completed_dict(self):
@@ -696,6 +759,21 @@ class ComparisonLevel:
 
         return output
 
+    def _detailed_record_parameters(self, m_probability, u_probability):
+        """The fields of `_as_detailed_record` which depend on the m and u
+        probabilities, evaluated at the given probabilities rather than the current
+        ones.  Used to chart the history of parameters during EM training."""
+        bayes_factor = _bayes_factor_from_m_u(m_probability, u_probability)
+        return {
+            "m_probability": m_probability,
+            "u_probability": u_probability,
+            "m_probability_description": self._describe_m_probability(m_probability),
+            "u_probability_description": self._describe_u_probability(u_probability),
+            "bayes_factor": bayes_factor,
+            "log2_bayes_factor": math.log2(bayes_factor),
+            "bayes_factor_description": self._describe_bayes_factor(bayes_factor),
+        }
+
     @property
     def _parameter_estimates_as_records(self):
         output_records = []
@@ -3,7 +3,12 @@ from __future__ import annotations
 import warnings
 
 from .comparison_level import ComparisonLevel
-from .comparison_level_sql import great_circle_distance_km_sql
+from .comparison_level_sql import (
+    squared_chord_length,
+    squared_chord_length_sql,
+    unit_vector_column_names,
+    unit_vector_sqls,
+)
 from .input_column import InputColumn
 
 
@@ -1033,9 +1038,20 @@ class DistanceInKMLevelBase(ComparisonLevel):
         lat_l, lat_r = lat.names_l_r
         long_l, long_r = long.names_l_r
 
-        distance_km_sql = f"""
-        {great_circle_distance_km_sql(lat_l, lat_r, long_l, long_r)} <= {km_threshold}
-        """
+        # The unit vectors of the coordinates are computed once per record, so
+        # that the distance between each pair costs only a few multiplications
+        unit_vector_sqls_by_axis = unit_vector_sqls(lat.name, long.name)
+        vectors_l, vectors_r = {}, {}
+        precomputed_columns = {}
+        for axis, name in unit_vector_column_names(lat_col, long_col).items():
+            column = InputColumn(name, sql_dialect=self._sql_dialect)
+            vectors_l[axis], vectors_r[axis] = column.names_l_r
+            precomputed_columns[name] = unit_vector_sqls_by_axis[axis]
+
+        distance_km_sql = (
+            f"{squared_chord_length_sql(vectors_l, vectors_r)} "
+            f"<= {squared_chord_length(km_threshold)!r}"
+        )
 
         if not_null:
             null_sql = " AND ".join(
@@ -1046,6 +1062,7 @@ class DistanceInKMLevelBase(ComparisonLevel):
         level_dict = {
             "sql_condition": distance_km_sql,
             "label_for_charts": f"Distance less than {km_threshold}km",
+            "precomputed_columns": precomputed_columns,
         }
 
         if m_probability:
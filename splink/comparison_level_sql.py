@@ -1,8 +1,12 @@
-def great_circle_distance_km_sql(lat_l, lat_r, long_l, long_r):
-    # Earth mean radius = 6371 km
-    # see e.g. https://www.wolframalpha.com/input?i=earth+mean+radius+in+km
-    EARTH_RADIUS_KM = 6371
+import math
+import re
+
+# Earth mean radius = 6371 km
+# see e.g. https://www.wolframalpha.com/input?i=earth+mean+radius+in+km
+EARTH_RADIUS_KM = 6371
 
+
+def great_circle_distance_km_sql(lat_l, lat_r, long_l, long_r):
     partial_distance_sql = f"""
         sin( radians({lat_l}) ) * sin( radians({lat_r}) ) +
         cos( radians({lat_l}) ) * cos( radians({lat_r}) )
@@ -31,3 +35,39 @@ def great_circle_distance_km_sql(lat_l, lat_r, long_l, long_r):
         )
     """
     return distance_km_sql
+
+
+def unit_vector_sqls(lat, long):
+    """SQL computing the coordinates of the point on the unit sphere at latitude
+    `lat` and longitude `long` (in degrees), as a dict of the axis ('x', 'y' or
+    'z') to SQL.
+
+    The great circle distance between two points is a monotonic function of the
+    straight line (chord) distance between their unit vectors, so distances can be
+    compared with a few multiplications once the unit vectors are computed.
+    """
+    return {
+        "x": f"cos(radians({lat})) * cos(radians({long}))",
+        "y": f"cos(radians({lat})) * sin(radians({long}))",
+        "z": f"sin(radians({lat}))",
+    }
+
+
+def unit_vector_column_names(lat_col, long_col):
+    """The names of the columns of precomputed unit vector coordinates of the
+    latitude and longitude columns, as a dict of the axis to column name"""
+    column_id = re.sub(r"\W", "_", f"{lat_col}_{long_col}")
+    return {axis: f"__splink__unit_{axis}_{column_id}" for axis in "xyz"}
+
+
+def squared_chord_length(km):
+    """The squared straight line distance between the unit vectors of two points
+    whose great circle distance is `km`"""
+    return (2 * math.sin(min(km / (2 * EARTH_RADIUS_KM), math.pi / 2))) ** 2
+
+
+def squared_chord_length_sql(vectors_l, vectors_r):
+    """SQL computing the squared straight line distance between two unit vectors,
+    given as dicts of axis to SQL"""
+    differences = [f"({vectors_l[axis]} - {vectors_r[axis]})" for axis in "xyz"]
+    return " + ".join(f"{d} * {d}" for d in differences)
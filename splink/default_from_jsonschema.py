@@ -1,20 +1,30 @@
 from copy import deepcopy
+from functools import lru_cache
 
 from .validate_jsonschema import get_schema
 
 
+@lru_cache(maxsize=None)
+def _schema():
+    return get_schema()
+
+
 def default_value_from_schema(key, schema_part):
-    schema = deepcopy(get_schema())
+    schema = _schema()
     if schema_part == "root":
-        return schema["properties"][key]["default"]
+        default = schema["properties"][key]["default"]
 
-    if schema_part == "comparison":
+    elif schema_part == "comparison":
         cc = schema["properties"]["comparisons"]
-        return cc["items"]["properties"][key]["default"]
+        default = cc["items"]["properties"][key]["default"]
 
-    if schema_part == "comparison_level":
+    elif schema_part == "comparison_level":
         cc = schema["properties"]["comparisons"]
         cl = cc["items"]["properties"]["comparison_levels"]
-        return cl["items"]["properties"][key]["default"]
+        default = cl["items"]["properties"][key]["default"]
+
+    else:
+        return None
 
-    return None
+    # Some defaults are mutable (e.g. lists), so callers must get their own copy
+    return deepcopy(default)
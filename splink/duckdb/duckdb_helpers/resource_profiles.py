@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass
+
+from duckdb import DuckDBPyConnection
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_PROFILE_STAGES = ["tf", "blocking", "predict", "clustering", "default"]
+
+# Tables are assigned to a stage by the prefix of their templated name
+_STAGE_TABLE_PREFIXES = {
+    "tf": ["__splink__df_tf_"],
+    "blocking": [
+        "__splink__df_blocked",
+        "__splink__marginal_exploded_ids_blocking_rule",
+        "__splink__marginal_neighbour_ids_blocking_rule",
+        "__splink__df_sorted_neighbourhood",
+        "__splink__df_embeddings",
+        "__splink__hot_keys_mk_",
+        "__splink__df_concat_with_tf_unnested",
+        "__splink__df_concat_with_tf_left",
+        "__splink__df_concat_with_tf_right",
+    ],
+    "predict": [
+        "__splink__df_comparison_vectors",
+        "__splink__df_match_weight_parts",
+        "__splink__df_predict",
+        "__splink__find_matches_predictions",
+    ],
+    "clustering": [
+        "__splink__df_connected_components_df",
+        "__splink__df_neighbours",
+        "__splink__df_representatives",
+        "__splink__df_root_rows",
+    ],
+}
+
+
+def stage_of_table(templated_name: str) -> str:
+    """The pipeline stage which creates the table with the given templated name, or
+    'default' if it is not part of one of the stages with a resource profile"""
+    for stage, prefixes in _STAGE_TABLE_PREFIXES.items():
+        if any(templated_name.startswith(prefix) for prefix in prefixes):
+            return stage
+    return "default"
+
+
+def stage_of_statement(step_names: list[str]) -> str:
+    """The stage of a statement which computes the steps with the given templated
+    names, in the order they are computed.
+
+    A statement often spans stages, for instance the pipeline creating
+    `__splink__df_predict` also runs the blocking steps as CTEs, and the pipeline
+    creating `__splink__df_concat_with_tf` computes the term frequency tables.  The
+    statement takes the stage of its last step which belongs to one, so blocking
+    has a profile of its own only where its tables are materialised separately
+    from the comparisons, as are the tables of exploding, sorted neighbourhood and
+    nearest neighbour blocking rules.
+    """
+    for name in reversed(step_names):
+        stage = stage_of_table(name)
+        if stage != "default":
+            return stage
+    return "default"
+
+
+@dataclass(frozen=True)
+class DuckDBResourceProfile:
+    """DuckDB settings to apply while executing the SQL of a pipeline stage.
+
+    Settings left as None are not changed from those of the connection.
+
+    Attributes:
+        threads (int, optional): The number of threads DuckDB may use
+        memory_limit (int | str, optional): The maximum memory DuckDB may use before
+            spilling to disk, either in bytes or as a string such as '8GB'
+        temp_directory (str, optional): The directory DuckDB spills to
+        preserve_insertion_order (bool, optional): Whether DuckDB must keep rows in
+            insertion order.  Turning this off reduces the memory needed by large
+            queries
+    """
+
+    threads: int = None
+    memory_limit: int | str = None
+    temp_directory: str = None
+    preserve_insertion_order: bool = None
+
+    def settings(self) -> dict:
+        settings = {k: v for k, v in asdict(self).items() if v is not None}
+        if isinstance(settings.get("memory_limit"), int):
+            mib = max(1, settings["memory_limit"] // 1024**2)
+            settings["memory_limit"] = f"{mib}MiB"
+        return settings
+
+
+def _total_memory_bytes() -> int | None:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        # os.sysconf is not available on Windows
+        return None
+
+
+def automatic_resource_profiles(
+    cores: int = None, memory_bytes: int = None
+) -> dict[str, DuckDBResourceProfile]:
+    """Resource profiles derived from the cores and RAM of the machine.
+
+    Blocking and predict, which run large joins, may use all cores and most of the
+    RAM.  Connected components iterates many smaller queries whose intermediate
+    tables can be spilled, so uses fewer threads and a lower memory limit, leaving
+    memory for the tables it has already created.
+    """
+    cores = cores or os.cpu_count() or 1
+    if memory_bytes is None:
+        memory_bytes = _total_memory_bytes()
+
+    def memory_fraction(fraction):
+        return None if memory_bytes is None else int(memory_bytes * fraction)
+
+    return {
+        "tf": DuckDBResourceProfile(
+            threads=cores,
+            memory_limit=memory_fraction(0.5),
+            preserve_insertion_order=False,
+        ),
+        "blocking": DuckDBResourceProfile(
+            threads=cores,
+            memory_limit=memory_fraction(0.8),
+            preserve_insertion_order=False,
+        ),
+        "predict": DuckDBResourceProfile(
+            threads=cores,
+            memory_limit=memory_fraction(0.8),
+            preserve_insertion_order=False,
+        ),
+        "clustering": DuckDBResourceProfile(
+            threads=max(1, cores // 2),
+            memory_limit=memory_fraction(0.4),
+            preserve_insertion_order=False,
+        ),
+    }
+
+
+def _setting_literal(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    value = str(value).replace("'", "''")
+    return f"'{value}'"
+
+
+class DuckDBResourceGovernor:
+    """Applies the resource profile of each pipeline stage before its SQL is
+    executed.
+
+    DuckDB settings apply to the whole database, including cursors used by worker
+    threads, so they are only changed when a statement from a different stage is
+    executed.  Settings which are not part of the current stage's profile are
+    restored to the values the connection had before any profile was applied.
+    """
+
+    def __init__(self, profiles: dict[str, DuckDBResourceProfile]):
+        unknown_stages = set(profiles) - set(RESOURCE_PROFILE_STAGES)
+        if unknown_stages:
+            raise ValueError(
+                f"Unknown resource profile stage(s) {sorted(unknown_stages)}. "
+                f"Stages must be one of {RESOURCE_PROFILE_STAGES}"
+            )
+        self.profiles = {
+            stage: (
+                profile
+                if isinstance(profile, DuckDBResourceProfile)
+                else DuckDBResourceProfile(**profile)
+            )
+            for stage, profile in profiles.items()
+        }
+        self._baseline: dict = None
+        self._applied: dict = {}
+        self._lock = threading.Lock()
+
+    def _read_baseline(self, con: DuckDBPyConnection):
+        names = {
+            name for profile in self.profiles.values() for name in profile.settings()
+        }
+        self._baseline = {
+            name: con.execute(f"select current_setting('{name}')").fetchone()[0]
+            for name in names
+        }
+        self._applied = dict(self._baseline)
+
+    def _set(self, con: DuckDBPyConnection, settings: dict):
+        for name, value in settings.items():
+            if self._applied.get(name) != value:
+                con.execute(f"SET {name} = {_setting_literal(value)}")
+                self._applied[name] = value
+
+    def apply(self, con: DuckDBPyConnection, step_names: list[str]):
+        stage = stage_of_statement(step_names)
+        profile = self.profiles.get(stage) or self.profiles.get("default")
+        target = profile.settings() if profile else {}
+
+        with self._lock:
+            if self._baseline is None:
+                self._read_baseline(con)
+            settings = {**self._baseline, **target}
+            if settings != self._applied:
+                logger.debug(f"Applying {stage} resource profile: {target}")
+            self._set(con, settings)
+
+    def restore(self, con: DuckDBPyConnection):
+        """Restore the settings the connection had before any profile was
+        applied"""
+        with self._lock:
+            if self._baseline is not None:
+                self._set(con, self._baseline)
@@ -2,40 +2,149 @@ from __future__ import annotations
 
 import logging
 import os
+import re
+import sys
+import threading
+from contextlib import contextmanager
 from tempfile import TemporaryDirectory
 
 import duckdb
-import pandas as pd
 from duckdb import DuckDBPyConnection
 
+from ..exceptions import MissingDependencyException
 from ..input_column import InputColumn
 from ..linker import Linker
 from ..misc import (
     ensure_is_list,
 )
-from ..splink_dataframe import SplinkDataFrame
+from ..splink_dataframe import SplinkDataFrame, _import_pyarrow
 from .duckdb_helpers.duckdb_helpers import (
     create_temporary_duckdb_connection,
     duckdb_load_from_file,
     validate_duckdb_connection,
 )
+from .duckdb_helpers.resource_profiles import (
+    DuckDBResourceGovernor,
+    DuckDBResourceProfile,
+    automatic_resource_profiles,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _imported_dataframe_types():
+    """The dataframe types which may be passed as input tables.
+
+    A pandas, pyarrow or polars dataframe can only have been passed in if the library
+    has already been imported, so none is imported here just to check the type of
+    the inputs
+    """
+    dataframe_types = []
+    if "pandas" in sys.modules:
+        dataframe_types.append(sys.modules["pandas"].DataFrame)
+    if "pyarrow" in sys.modules:
+        dataframe_types.append(sys.modules["pyarrow"].lib.Table)
+    if "pyarrow.dataset" in sys.modules:
+        pyarrow_dataset = sys.modules["pyarrow.dataset"]
+        dataframe_types.extend([pyarrow_dataset.Dataset, pyarrow_dataset.Scanner])
+    if "polars" in sys.modules:
+        dataframe_types.append(sys.modules["polars"].DataFrame)
+    return dataframe_types
+
+
+def _is_pandas_dataframe(obj):
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(obj, pd.DataFrame)
+
+
+def _is_polars_dataframe(obj):
+    pl = sys.modules.get("polars")
+    return pl is not None and isinstance(obj, pl.DataFrame)
+
+
+def _records_to_arrow_or_pandas(records: dict | list):
+    """Convert a dict of columns or a list of records into a table which can be
+    registered with DuckDB.  Arrow is preferred where it is installed, since DuckDB
+    can read Arrow data without copying it, whereas string columns of a pandas
+    dataframe must be converted from Python objects."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        pa = None
+
+    if pa is not None:
+        try:
+            if isinstance(records, dict):
+                return pa.table(records)
+            # Unlike pa.Table.from_pylist, which only uses the keys of the first
+            # record, include keys missing from some of the records, as pandas does
+            column_names = list(dict.fromkeys(k for record in records for k in record))
+            return pa.table(
+                {c: [record.get(c) for record in records] for c in column_names}
+            )
+        except (pa.ArrowException, TypeError, ValueError):
+            # e.g. a column with values of mixed types, which pandas will hold as
+            # Python objects
+            pass
+
+    import pandas as pd
+
+    if isinstance(records, dict):
+        return pd.DataFrame(records)
+    return pd.DataFrame.from_records(records)
+
+
+# Approximate in-memory width of a single value of each type.  Strings and nested
+# types are stored as a 16 byte struct, plus a heap allocation for long values,
+# so this is a lower bound for these types
+_DUCKDB_TYPE_WIDTHS_BYTES = {
+    "BOOLEAN": 1,
+    "TINYINT": 1,
+    "UTINYINT": 1,
+    "SMALLINT": 2,
+    "USMALLINT": 2,
+    "INTEGER": 4,
+    "UINTEGER": 4,
+    "FLOAT": 4,
+    "DATE": 4,
+    "BIGINT": 8,
+    "UBIGINT": 8,
+    "DOUBLE": 8,
+    "TIMESTAMP": 8,
+    "HUGEINT": 16,
+}
+
+
 class DuckDBDataFrame(SplinkDataFrame):
     linker: DuckDBLinker
 
     @property
     def columns(self) -> list[InputColumn]:
-        d = self.as_record_dict(1)[0]
-
-        col_strings = list(d.keys())
+        # Read the column names from the relation, rather than fetching a row into
+        # pandas
+        sql = f"select * from {self.physical_name} limit 0"
+        col_strings = self.linker._con.query(sql).columns
         return [InputColumn(c, sql_dialect="duckdb") for c in col_strings]
 
     def validate(self):
         pass
 
+    def _row_count(self):
+        sql = f"select count(*) from {self.physical_name}"
+        return self.linker._con.execute(sql).fetchone()[0]
+
+    def _estimated_size_bytes(self):
+        con = self.linker._con
+        row_count = self._row_count()
+        column_types = con.execute(
+            f"select column_type from (describe {self.physical_name})"
+        ).fetchall()
+        row_width = sum(
+            _DUCKDB_TYPE_WIDTHS_BYTES.get(column_type.split("(")[0], 16)
+            for (column_type,) in column_types
+        )
+        return row_count * row_width
+
     def _drop_table_from_database(self, force_non_splink_table=False):
         self._check_drop_table_created_by_splink(force_non_splink_table)
 
@@ -55,6 +164,75 @@ class DuckDBDataFrame(SplinkDataFrame):
 
         return self.linker._con.query(sql).to_df()
 
+    def as_arrow(self, limit=None):
+        """Return the dataframe as a pyarrow Table.
+
+        Unlike `as_pandas_dataframe()`, string columns are not converted to Python
+        objects, so this is faster and uses substantially less memory for tables with
+        many string columns.
+
+        Args:
+            limit (int, optional): If provided, return this number of rows (equivalent
+            to a limit statement in SQL). Defaults to None, meaning return all rows
+
+        Examples:
+            ```py
+            df_predict = linker.predict()
+            arrow_table = df_predict.as_arrow()
+            ```
+        Returns:
+            pyarrow.Table: pyarrow Table
+        """
+        _import_pyarrow()
+        sql = f"select * from {self.physical_name}"
+        if limit:
+            sql += f" limit {limit}"
+
+        return self.linker._con.query(sql).arrow()
+
+    def to_polars(self, limit=None):
+        """Return the dataframe as a polars DataFrame, converted from Arrow without
+        copying the data.  Requires `polars`.
+
+        Args:
+            limit (int, optional): If provided, return this number of rows (equivalent
+            to a limit statement in SQL). Defaults to None, meaning return all rows
+
+        Examples:
+            ```py
+            df_predict = linker.predict()
+            polars_df = df_predict.to_polars()
+            ```
+        Returns:
+            polars.DataFrame: polars DataFrame
+        """
+        try:
+            import polars as pl
+        except ImportError:
+            raise MissingDependencyException(
+                "You need to install the 'polars' package to retrieve results as a "
+                "polars DataFrame."
+            ) from None
+
+        return pl.from_arrow(self.as_arrow(limit=limit))
+
+    def iter_batches(self, batch_size=100_000):
+        _import_pyarrow()
+        sql = f"select * from {self.physical_name}"
+
+        # Stream from a cursor where possible, so the caller can run other queries
+        # on the linker while iterating
+        if self.linker._can_execute_concurrently(sql):
+            con = self.linker._connection.cursor()
+        else:
+            con = self.linker._con
+        try:
+            reader = con.execute(sql).fetch_record_batch(batch_size)
+            yield from reader
+        finally:
+            if con is not self.linker._con:
+                con.close()
+
     def to_parquet(self, filepath, overwrite=False):
         if not overwrite:
             self.check_file_exists(filepath)
@@ -154,7 +332,13 @@ class DuckDBLinker(Linker):
         else:
             con = duckdb.connect(database=connection)
 
-        self._con = con
+        self._connection = con
+        self._output_schema = output_schema
+        # Worker threads executing pipelines concurrently each use their own cursor
+        self._thread_local = threading.local()
+        self._worker_cursors = set()
+        self._worker_cursors_lock = threading.Lock()
+        self._resource_governor: DuckDBResourceGovernor = None
 
         # If user has provided pandas dataframes, need to register
         # them with the database, using user-provided aliases
@@ -168,14 +352,7 @@ class DuckDBLinker(Linker):
             input_table_or_tables, input_table_aliases
         )
 
-        accepted_df_dtypes = [pd.DataFrame]
-        try:
-            # If pyarrow is installed, add to the accepted list
-            import pyarrow as pa
-
-            accepted_df_dtypes.append(pa.lib.Table)
-        except ImportError:
-            pass
+        accepted_df_dtypes = _imported_dataframe_types()
 
         super().__init__(
             input_tables,
@@ -188,8 +365,8 @@ class DuckDBLinker(Linker):
 
         # Quickly check for casting error in duckdb/pandas
         for i, (table, alias) in enumerate(zip(input_tables, input_aliases)):
-            if isinstance(table, pd.DataFrame):
-                if isinstance(alias, pd.DataFrame):
+            if _is_pandas_dataframe(table):
+                if _is_pandas_dataframe(alias):
                     alias = f"__splink__input_table_{i}"
 
                 self._check_cast_error(alias)
@@ -202,6 +379,52 @@ class DuckDBLinker(Linker):
                 """
             )
 
+    @property
+    def _con(self) -> DuckDBPyConnection:
+        return getattr(self._thread_local, "cursor", None) or self._connection
+
+    @_con.setter
+    def _con(self, con):
+        self._connection = con
+
+    @property
+    def _supports_concurrent_execution(self):
+        return True
+
+    @contextmanager
+    def _worker_thread_context(self):
+        cursor = self._connection.cursor()
+        if self._output_schema:
+            cursor.execute(f"SET schema '{self._output_schema}';")
+        self._thread_local.cursor = cursor
+        with self._worker_cursors_lock:
+            self._worker_cursors.add(cursor)
+        try:
+            yield
+        finally:
+            with self._worker_cursors_lock:
+                self._worker_cursors.discard(cursor)
+            self._thread_local.cursor = None
+            cursor.close()
+
+    def _interrupt_execution(self):
+        # Cursors are separate connections, so each must be interrupted
+        with self._worker_cursors_lock:
+            connections = [self._connection, *self._worker_cursors]
+        for connection in connections:
+            connection.interrupt()
+
+    def _can_execute_concurrently(self, sql):
+        # A cursor cannot see temporary views registered on the main connection,
+        # such as input tables registered from pandas dataframes
+        temporary_views = self._connection.execute(
+            "select view_name from duckdb_views() where temporary"
+        ).fetchall()
+        return not any(
+            re.search(rf"\b{re.escape(view_name)}\b", sql, re.IGNORECASE)
+            for (view_name,) in temporary_views
+        )
+
     def _table_to_splink_dataframe(
         self, templated_name, physical_name
     ) -> DuckDBDataFrame:
@@ -221,9 +444,98 @@ class DuckDBLinker(Linker):
 
         return DuckDBDataFrame(templated_name, physical_name, self)
 
+    def _execute_pipeline_statement(
+        self,
+        sql,
+        output_tablename_templated,
+        execution_hooks,
+        step_names,
+        use_cache=True,
+    ):
+        # The resource profile is chosen from the steps the statement computes, so
+        # that e.g. the term frequency tables computed as CTEs of
+        # __splink__df_concat_with_tf use the tf profile
+        self._thread_local.pipeline_step_names = step_names
+        try:
+            return super()._execute_pipeline_statement(
+                sql,
+                output_tablename_templated,
+                execution_hooks,
+                step_names,
+                use_cache,
+            )
+        finally:
+            self._thread_local.pipeline_step_names = None
+
     def _run_sql_execution(self, final_sql, templated_name, physical_name):
+        if self._resource_governor is not None:
+            step_names = getattr(self._thread_local, "pipeline_step_names", None)
+            self._resource_governor.apply(self._con, step_names or [templated_name])
         self._con.sql(final_sql)
 
+    def set_resource_profiles(
+        self, profiles: dict[str, DuckDBResourceProfile | dict] | str | None = "auto"
+    ):
+        """Set the threads, memory limit, spill directory and insertion order
+        preservation DuckDB uses for each stage of a Splink job.
+
+        Stages are `tf` (term frequency tables), `blocking`, `predict` and
+        `clustering` (connected components).  The `default` profile, if provided,
+        applies to any other SQL Splink executes.  Settings not specified in a stage's
+        profile keep the values the connection had before profiles were set.
+
+        Splink executes most stages as a single statement, so a statement's stage is
+        that of the last of its steps which belongs to a stage.  For instance, the
+        statement computing `__splink__df_concat_with_tf` uses the `tf` profile, and
+        the blocking joins executed as part of `predict()` use the `predict` profile.
+        The `blocking` profile applies where blocking tables are computed separately,
+        such as the id pairs of exploding, sorted neighbourhood and nearest neighbour
+        blocking rules.
+
+        Profiles are applied before each SQL statement is executed.  DuckDB settings
+        apply to the whole database, so the settings are shared by any statements
+        executing concurrently.
+
+        Examples:
+            Use profiles derived from the cores and RAM of the machine
+            ```py
+            linker.set_resource_profiles("auto")
+            ```
+            Spill connected components to a scratch disk
+            ```py
+            linker.set_resource_profiles(
+                {
+                    "predict": {"threads": 16, "memory_limit": "48GB"},
+                    "clustering": {
+                        "threads": 4,
+                        "memory_limit": "8GB",
+                        "temp_directory": "/scratch/duckdb",
+                    },
+                }
+            )
+            ```
+
+        Args:
+            profiles (dict | str | None): A dict mapping stage names to a
+                `DuckDBResourceProfile` or a dict of its settings, "auto" for profiles
+                derived from the machine's cores and RAM, or None to stop applying
+                profiles and restore the connection's original settings.  Defaults
+                to "auto".
+        """
+        if self._resource_governor is not None:
+            self._resource_governor.restore(self._con)
+            self._resource_governor = None
+
+        if profiles is None:
+            return
+        if isinstance(profiles, str):
+            if profiles != "auto":
+                raise ValueError(
+                    f"profiles must be a dict, 'auto' or None, not '{profiles}'"
+                )
+            profiles = automatic_resource_profiles()
+        self._resource_governor = DuckDBResourceGovernor(profiles)
+
     def register_table(self, input, table_name, overwrite=False):
         # If the user has provided a table name, return it as a SplinkDataframe
         if isinstance(input, str):
@@ -244,11 +556,15 @@ class DuckDBLinker(Linker):
         return self._table_to_splink_dataframe(table_name, table_name)
 
     def _table_registration(self, input, table_name):
-        if isinstance(input, dict):
-            input = pd.DataFrame(input)
-        elif isinstance(input, list):
-            input = pd.DataFrame.from_records(input)
-
+        if isinstance(input, (dict, list)):
+            input = _records_to_arrow_or_pandas(input)
+        elif _is_polars_dataframe(input):
+            # Polars dataframes are backed by Arrow memory, so can be converted
+            # without copying in most cases
+            input = input.to_arrow()
+
+        # Arrow tables, datasets and scanners are registered as views which DuckDB
+        # reads directly, without copying the data.
         # Registration errors will automatically
         # occur if an invalid data type is passed as an argument
         self._con.register(table_name, input)
@@ -264,10 +580,32 @@ class DuckDBLinker(Linker):
         else:
             return f"USING SAMPLE {percent}% (bernoulli)"
 
+    def _hash_sql(self, sql_expressions):
+        return f"hash({', '.join(sql_expressions)})"
+
+    @property
+    def _supports_groupwise_pair_generation(self):
+        return True
+
     @property
     def _infinity_expression(self):
         return "cast('infinity' as float8)"
 
+    def _explain_analyze(self, sql):
+        rows = self._con.execute(f"EXPLAIN ANALYZE {sql}").fetchall()
+        return "\n".join(plan for _, plan in rows)
+
+    def _read_parquet_sql(self, filepath):
+        return f"select * from read_parquet('{filepath}')"
+
+    def _input_table_fingerprint_sql(self, physical_name):
+        # hash(t) hashes the whole row as a struct.  Summing rather than xor-ing
+        # means duplicate rows do not cancel one another out
+        return f"""
+        select count(*) as row_count, sum(hash(t)::hugeint) as checksum
+        from {physical_name} as t
+        """
+
     def _table_exists_in_database(self, table_name):
         sql = f"PRAGMA table_info('{table_name}');"
 
@@ -304,7 +642,13 @@ class DuckDBLinker(Linker):
             ) from e
 
     def _delete_table_from_database(self, name):
-        drop_sql = f"""
+        # Tables registered from Python objects, such as Arrow tables, are views
+        sql = "select table_type from information_schema.tables where table_name = ?"
+        table_type = self._con.execute(sql, [name]).fetchone()
+        if table_type is not None and table_type[0] == "VIEW":
+            drop_sql = f"DROP VIEW IF EXISTS {name}"
+        else:
+            drop_sql = f"""
         DROP TABLE IF EXISTS {name}"""
         self._con.execute(drop_sql)
 
@@ -320,6 +664,50 @@ class DuckDBLinker(Linker):
             new_con.execute(f"IMPORT DATABASE '{tmpdir}';")
             new_con.close()
 
+    def _shingles_sql(self, column_sql, shingle_type, shingle_size):
+        if shingle_type == "token":
+            return (
+                f"list_filter(string_split_regex({column_sql}, '\\s+'), "
+                "t -> t <> '')"
+            )
+        q = shingle_size
+        # Strings shorter than q have a single shingle, the string itself
+        num_shingles = f"greatest(length({column_sql}) - {q} + 1, 1)"
+        return (
+            f"list_transform(range(1, {num_shingles} + 1), "
+            f"i -> substr({column_sql}, i, {q}))"
+        )
+
+    def _minhash_band_keys_sql(self, shingles_sql, bands, rows):
+        # The shingles and the signature are each bound to a lambda parameter by a
+        # list of one element, so are computed once per record
+        signature = (
+            f"list_transform(range({bands * rows}), "
+            "p -> list_min(list_transform(sh, s -> hash(s, p))))"
+        )
+        band_key = self._hash_sql(
+            ["b"] + [f"sig[b * {rows} + {row + 1}]" for row in range(rows)]
+        )
+        band_keys = f"list_transform(range({bands}), b -> {band_key})"
+        return (
+            f"list_transform([{shingles_sql}], sh -> "
+            f"list_transform([{signature}], sig -> {band_keys})[1])[1]"
+        )
+
+    def _deletion_neighbourhood_sql(self, column_sql, max_deletions):
+        neighbourhood = f"[{column_sql}]"
+        for d in range(max_deletions):
+            # Each string, and each string with one character deleted
+            deletions = (
+                f"list_transform(range(1, length(v{d}) + 1), "
+                f"i{d} -> substr(v{d}, 1, i{d} - 1) || substr(v{d}, i{d} + 1))"
+            )
+            neighbourhood = (
+                f"list_distinct(flatten(list_transform({neighbourhood}, "
+                f"v{d} -> list_concat([v{d}], {deletions}))))"
+            )
+        return neighbourhood
+
     def _explode_arrays_sql(
         self, tbl_name, columns_to_explode, other_columns_to_retain
     ):
@@ -111,7 +111,16 @@ class EMTrainingSession:
         self._settings_obj.comparisons = filtered_ccs
         self._comparisons_that_can_be_estimated = filtered_ccs
 
-        self._settings_obj_history = []
+        # The history of parameter estimates is held in arrays with one row per
+        # iteration, rather than by copying the settings object at each iteration.
+        # Columns of the m and u arrays correspond to the (non-null) comparison
+        # levels in `_comparison_levels_in_history`
+        self._comparison_levels_in_history = [
+            cl
+            for cc in self._settings_obj.comparisons
+            for cl in cc._comparison_levels_excluding_null
+        ]
+        self._allocate_parameter_history(self._settings_obj._max_iterations + 1)
 
         # Add iteration 0 i.e. the starting parameters
         self._add_iteration()
@@ -241,8 +250,45 @@ class EMTrainingSession:
 
         self._original_linker._em_training_sessions.append(self)
 
+    def _allocate_parameter_history(self, num_iterations):
+        import numpy as np
+
+        num_levels = len(self._comparison_levels_in_history)
+        self._m_history = np.empty((num_iterations, num_levels))
+        self._u_history = np.empty((num_iterations, num_levels))
+        self._lambda_history = np.empty(num_iterations)
+        self._num_iterations = 0
+
     def _add_iteration(self):
-        self._settings_obj_history.append(deepcopy(self._settings_obj))
+        import numpy as np
+
+        i = self._num_iterations
+        if i == len(self._lambda_history):
+            m_history, u_history = self._m_history, self._u_history
+            lambda_history = self._lambda_history
+            self._allocate_parameter_history(2 * i)
+            self._m_history[:i] = m_history
+            self._u_history[:i] = u_history
+            self._lambda_history[:i] = lambda_history
+
+        levels = self._comparison_levels_in_history
+        self._m_history[i] = np.fromiter(
+            (cl.m_probability for cl in levels), float, len(levels)
+        )
+        self._u_history[i] = np.fromiter(
+            (cl.u_probability for cl in levels), float, len(levels)
+        )
+        self._lambda_history[
+            i
+        ] = self._settings_obj._probability_two_random_records_match
+        self._num_iterations = i + 1
+
+    @property
+    def _parameter_history(self):
+        """m, u and probability_two_random_records_match arrays for the iterations
+        so far, indexed by iteration then comparison level"""
+        n = self._num_iterations
+        return self._m_history[:n], self._u_history[:n], self._lambda_history[:n]
 
     @property
     def _blocking_adjusted_probability_two_random_records_match(self):
@@ -279,25 +325,46 @@ class EMTrainingSession:
 
     @property
     def _iteration_history_records(self):
-        output_records = []
-
-        for iteration, settings_obj in enumerate(self._settings_obj_history):
-            records = settings_obj._parameters_as_detailed_records
+        m_history, u_history, lambda_history = self._parameter_history
+        settings_obj = self._settings_obj
+
+        # Fields which do not depend on the parameters are taken from the current
+        # settings, and the remainder recomputed for each iteration
+        current_records = settings_obj._parameters_as_detailed_records
+        level_index = {
+            id(cl): i for i, cl in enumerate(self._comparison_levels_in_history)
+        }
+        levels = [cl for cc in settings_obj.comparisons for cl in cc.comparison_levels]
+        # The first record is for probability_two_random_records_match
+        record_level_indices = [None] + [level_index.get(id(cl)) for cl in levels]
 
-            for r in records:
-                r["iteration"] = iteration
-                r[
+        output_records = []
+        for iteration, (m_values, u_values, lam) in enumerate(
+            zip(m_history.tolist(), u_history.tolist(), lambda_history.tolist())
+        ):
+            for record, cl, i in zip(
+                current_records, [None] + levels, record_level_indices
+            ):
+                record = dict(record)
+                if cl is None:
+                    record.update(settings_obj._prior_as_detailed_record(lam))
+                elif i is not None:
+                    record.update(
+                        cl._detailed_record_parameters(m_values[i], u_values[i])
+                    )
+                record["iteration"] = iteration
+                record[
                     "probability_two_random_records_match"
-                ] = self._settings_obj._probability_two_random_records_match
+                ] = settings_obj._probability_two_random_records_match
 
-            output_records.extend(records)
+                output_records.append(record)
         return output_records
 
     @property
     def _lambda_history_records(self):
+        _, _, lambda_history = self._parameter_history
         output_records = []
-        for i, s in enumerate(self._settings_obj_history):
-            lam = s._probability_two_random_records_match
+        for i, lam in enumerate(lambda_history.tolist()):
             r = {
                 "probability_two_random_records_match": lam,
                 "probability_two_random_records_match_reciprocal": 1 / lam,
@@ -345,8 +412,11 @@ class EMTrainingSession:
         return message
 
     def _max_change_in_parameters_comparison_levels(self):
-        previous_iteration = self._settings_obj_history[-2]
-        this_iteration = self._settings_obj_history[-1]
+        import numpy as np
+
+        m_history, u_history, lambda_history = self._parameter_history
+        change_m = m_history[-1] - m_history[-2]
+        change_u = u_history[-1] - u_history[-2]
         max_change = -0.1
 
         max_change_levels = {
@@ -355,41 +425,32 @@ class EMTrainingSession:
             "max_change_type": None,
             "max_change_value": None,
         }
-        comparisons = zip(previous_iteration.comparisons, this_iteration.comparisons)
-        for comparison in comparisons:
-            prev_cc = comparison[0]
-            this_cc = comparison[1]
-            z_cls = zip(prev_cc.comparison_levels, this_cc.comparison_levels)
-            for z_cl in z_cls:
-                if z_cl[0].is_null_level:
-                    continue
-                prev_cl = z_cl[0]
-                this_cl = z_cl[1]
-                change_m = this_cl.m_probability - prev_cl.m_probability
-                change_u = this_cl.u_probability - prev_cl.u_probability
-                change = max(abs(change_m), abs(change_u))
-                change_type = (
-                    "m_probability"
-                    if abs(change_m) > abs(change_u)
-                    else "u_probability"
-                )
-                change_value = change_m if abs(change_m) > abs(change_u) else change_u
-                if change > max_change:
-                    max_change = change
-                    max_change_levels["prev_comparison_level"] = prev_cl
-                    max_change_levels["current_comparison_level"] = this_cl
-                    max_change_levels["max_change_type"] = change_type
-                    max_change_levels["max_change_value"] = change_value
-                    max_change_levels["max_abs_change_value"] = abs(change_value)
-
-        change_probability_two_random_records_match = (
-            this_iteration._probability_two_random_records_match
-            - previous_iteration._probability_two_random_records_match
+        if len(self._comparison_levels_in_history) > 0:
+            change = np.maximum(np.abs(change_m), np.abs(change_u))
+            # argmax picks the first of equal changes, as the changes to each
+            # level were previously compared in order
+            i = int(np.argmax(change))
+            if abs(change_m[i]) > abs(change_u[i]):
+                change_type = "m_probability"
+                change_value = float(change_m[i])
+            else:
+                change_type = "u_probability"
+                change_value = float(change_u[i])
+
+            max_change = float(change[i])
+            max_change_levels[
+                "current_comparison_level"
+            ] = self._comparison_levels_in_history[i]
+            max_change_levels["max_change_type"] = change_type
+            max_change_levels["max_change_value"] = change_value
+            max_change_levels["max_abs_change_value"] = abs(change_value)
+
+        change_probability_two_random_records_match = float(
+            lambda_history[-1] - lambda_history[-2]
         )
 
         if abs(change_probability_two_random_records_match) > max_change:
             max_change = abs(change_probability_two_random_records_match)
-            max_change_levels["prev_comparison_level"] = None
             max_change_levels["current_comparison_level"] = None
             max_change_levels[
                 "max_change_type"
@@ -18,6 +18,10 @@ class EMTrainingException(SplinkException):
     pass
 
 
+class ExecutionCancelledException(SplinkException):
+    pass
+
+
 class MissingDependencyException(Exception):
     pass
 
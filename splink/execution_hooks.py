@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from .splink_dataframe import SplinkDataFrame
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ExecutionEvent:
+    """Passed to execution hooks, describing a single execution of SQL.
+
+    `physical_name` may be None in a `before` hook if the name of the output table
+    is not yet known.  `wall_time_seconds` is set for `after` and `on_error`
+    hooks, `result` for `after` hooks and `exception` for `on_error` hooks.
+    """
+
+    templated_name: str
+    physical_name: str
+    sql: str
+    started_at: float
+    wall_time_seconds: float = None
+    result: SplinkDataFrame = None
+    exception: Exception = None
+
+
+class ExecutionHooks:
+    """Callbacks run before and after SQL is executed, and if it errors, for example
+    to send stage timings and row counts to a metrics system.
+
+    Each callback is passed an `ExecutionEvent`.  Errors raised by callbacks are
+    logged rather than interrupting Splink.
+
+    Examples:
+        ```py
+        def record_timing(event):
+            metrics.timing(event.templated_name, event.wall_time_seconds)
+
+        handle = linker.execution_hooks.register(after=record_timing)
+        linker.predict()
+        linker.execution_hooks.remove(handle)
+        ```
+    """
+
+    def __init__(self):
+        self._hooks: dict[int, tuple[Callable, Callable, Callable]] = {}
+        self._next_handle = 0
+
+    def __len__(self):
+        return len(self._hooks)
+
+    def register(
+        self,
+        before: Callable[[ExecutionEvent], Any] = None,
+        after: Callable[[ExecutionEvent], Any] = None,
+        on_error: Callable[[ExecutionEvent], Any] = None,
+    ) -> int:
+        """Register callbacks to run around the execution of SQL
+
+        Args:
+            before (Callable, optional): Called before the SQL is executed.
+            after (Callable, optional): Called after the SQL is executed
+                successfully.
+            on_error (Callable, optional): Called if executing the SQL raises an
+                error, before the error is re-raised.
+
+        Returns:
+            int: A handle which can be passed to `remove()`
+        """
+        handle = self._next_handle
+        self._next_handle += 1
+        self._hooks[handle] = (before, after, on_error)
+        return handle
+
+    def remove(self, handle: int):
+        """Remove the callbacks registered with the given handle"""
+        del self._hooks[handle]
+
+    def clear(self):
+        """Remove all registered callbacks"""
+        self._hooks = {}
+
+    def _fire(self, position, event: ExecutionEvent):
+        for hooks in list(self._hooks.values()):
+            hook = hooks[position]
+            if hook is None:
+                continue
+            try:
+                hook(event)
+            except Exception:
+                logger.warning(
+                    f"Execution hook {hook!r} raised an error for "
+                    f"{event.templated_name}",
+                    exc_info=True,
+                )
+
+    def run(self, templated_name, physical_name, sql, func, *args, **kwargs):
+        """Call `func`, firing the registered callbacks around it"""
+        if not self._hooks:
+            return func(*args, **kwargs)
+
+        event = ExecutionEvent(templated_name, physical_name, sql, time.time())
+        self._fire(0, event)
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            event.wall_time_seconds = time.time() - event.started_at
+            event.exception = e
+            self._fire(2, event)
+            raise
+
+        event.wall_time_seconds = time.time() - event.started_at
+        event.result = result
+        if event.physical_name is None:
+            event.physical_name = getattr(result, "physical_name", None)
+        self._fire(1, event)
+        return result
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ExecutionProfileEntry:
+    """A record of a single table requested by Splink, which was either computed
+    by the backend or retrieved from the cache"""
+
+    templated_name: str
+    physical_name: str
+    cache_hit: bool
+    started_at: float
+    wall_time_seconds: float
+    row_count: int = None
+    size_bytes: int = None
+    explain_plan: str = None
+
+
+class ExecutionProfile:
+    """A record of each SQL statement executed by a linker, allowing you to see which
+    stages of e.g. `linker.predict()` dominate the run time.
+
+    Every table Splink requests is recorded, along with its templated name (the
+    purpose of the table, e.g. `__splink__df_blocked`), physical name, the wall
+    time taken to compute it, and whether it was retrieved from the cache.
+
+    Some information is expensive to collect, so is only recorded if requested:
+
+    - Set `collect_table_statistics = True` to record the number of rows in each
+      output table, and its size in bytes where the backend can report it.
+    - Set `explain_analyze = True` to record the backend's `EXPLAIN ANALYZE` plan
+      for each statement.  Note this executes each statement a second time.
+
+    Examples:
+        ```py
+        linker.execution_profile.collect_table_statistics = True
+        linker.predict()
+        df = linker.execution_profile.as_pandas_dataframe()
+        df.groupby("templated_name")["wall_time_seconds"].sum()
+        ```
+    """
+
+    def __init__(self, collect_table_statistics=False, explain_analyze=False):
+        self.collect_table_statistics = collect_table_statistics
+        self.explain_analyze = explain_analyze
+        self.entries: list[ExecutionProfileEntry] = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def record(
+        self,
+        templated_name,
+        physical_name,
+        cache_hit,
+        started_at,
+        wall_time_seconds,
+        row_count=None,
+        size_bytes=None,
+        explain_plan=None,
+    ) -> ExecutionProfileEntry:
+        entry = ExecutionProfileEntry(
+            templated_name=templated_name,
+            physical_name=physical_name,
+            cache_hit=cache_hit,
+            started_at=started_at,
+            wall_time_seconds=wall_time_seconds,
+            row_count=row_count,
+            size_bytes=size_bytes,
+            explain_plan=explain_plan,
+        )
+        self.entries.append(entry)
+        return entry
+
+    def reset(self):
+        """Remove all entries from the profile"""
+        self.entries = []
+
+    def as_record_dict(self) -> list[dict]:
+        return [asdict(entry) for entry in self.entries]
+
+    def as_pandas_dataframe(self):
+        """Return the profile as a pandas dataframe, with one row per table"""
+        import pandas as pd
+
+        columns = list(ExecutionProfileEntry.__dataclass_fields__)
+        return pd.DataFrame(self.as_record_dict(), columns=columns)
+
+    def to_json(self, out_path: str | None = None, overwrite: bool = False) -> str:
+        """Return the profile as a json string, optionally also writing it to a file
+
+        Args:
+            out_path (str, optional): File path for json file. If None, don't save
+                to file. Defaults to None.
+            overwrite (bool, optional): Overwrite if already exists? Defaults to
+                False.
+        """
+        profile_json = json.dumps(self.as_record_dict(), indent=4)
+        if out_path:
+            if os.path.isfile(out_path) and not overwrite:
+                raise ValueError(
+                    f"The path {out_path} already exists. Please provide a different "
+                    "path or set overwrite=True"
+                )
+            with open(out_path, "w", encoding="utf-8") as f:
+                f.write(profile_json)
+        return profile_json
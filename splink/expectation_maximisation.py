@@ -4,8 +4,6 @@ import logging
 import time
 from typing import TYPE_CHECKING
 
-import pandas as pd
-
 from .comparison_level import ComparisonLevel
 from .constants import LEVEL_NOT_OBSERVED_TEXT
 from .m_u_records_to_parameters import m_u_records_to_lookup_dict
@@ -139,6 +137,8 @@ def compute_proportions_for_new_parameters_pandas(m_u_df):
     data.loc[index, m_prob] = m_probs
     data.loc[index, u_prob] = u_probs
 
+    import pandas as pd
+
     data = pd.concat([random_records, data])
 
     return data.to_dict("records")
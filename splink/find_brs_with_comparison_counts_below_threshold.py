@@ -1,13 +1,15 @@
+from __future__ import annotations
+
 import logging
 import string
 from typing import TYPE_CHECKING, Dict, List, Set
 
-import pandas as pd
-
 from .blocking import BlockingRule
 from .input_column import InputColumn
 
 if TYPE_CHECKING:
+    import pandas as pd
+
     from .linker import Linker
 logger = logging.getLogger(__name__)
 
@@ -247,4 +249,6 @@ def find_blocking_rules_below_threshold_comparison_count(
             f"{max_comparisons_per_rule}. Try increasing the threshold."
         )
 
+    import pandas as pd
+
     return pd.DataFrame(results)
@@ -1,13 +1,24 @@
 from __future__ import annotations
 
-from copy import deepcopy
+from copy import copy
 from dataclasses import dataclass, replace
+from functools import lru_cache
 
 import sqlglot
 import sqlglot.expressions as exp
 
 from .default_from_jsonschema import default_value_from_schema
 from .sql_transform import sqlglot_tree_signature
+from .sqlglot_cache import SQLGLOT_PARSE_CACHE_SIZE, parse_one
+
+
+@lru_cache(maxsize=None)
+def _valid_column_signatures():
+    return {
+        sqlglot_tree_signature(parse_one("col_name")),
+        sqlglot_tree_signature(parse_one("col_name[1]")),
+        sqlglot_tree_signature(parse_one("col_name['lat']")),
+    }
 
 
 @dataclass(frozen=True)
@@ -73,9 +84,11 @@ class SqlglotColumnTreeBuilder:
 
     @property
     def sql(self):
-        return self.as_sqlglot_tree.sql(dialect=self.sqlglot_dialect)
+        return _column_tree_builder_sql(self)
 
+    # Builders are immutable, so the same instance can be shared between callers
     @classmethod
+    @lru_cache(maxsize=SQLGLOT_PARSE_CACHE_SIZE)
     def from_raw_column_name_or_column_reference(cls, input_str, sqlglot_dialect):
         def tree_to_sqlglot_column_tree_builder_args(sqlglot_tree, sqlglot_dialect):
             args = {"sqlglot_dialect": sqlglot_dialect, "quoted": True}
@@ -98,15 +111,11 @@ class SqlglotColumnTreeBuilder:
             else:
                 return f"{q_s}{input_str}{q_e}"
 
-        valid_signatures = {
-            sqlglot_tree_signature(sqlglot.parse_one("col_name")),
-            sqlglot_tree_signature(sqlglot.parse_one("col_name[1]")),
-            sqlglot_tree_signature(sqlglot.parse_one("col_name['lat']")),
-        }
+        valid_signatures = _valid_column_signatures()
 
         # If the raw string parses to a valid signature, use it
         try:
-            tree = sqlglot.parse_one(input_str, read=sqlglot_dialect)
+            tree = parse_one(input_str, read=sqlglot_dialect)
         except (sqlglot.ParseError, sqlglot.TokenError):
             pass
         else:
@@ -123,7 +132,7 @@ class SqlglotColumnTreeBuilder:
         q_s, q_e = _get_dialect_quotes(sqlglot_dialect)
         input_str = add_quotes_to_column_name(input_str, q_s, q_e)
         try:
-            tree = sqlglot.parse_one(input_str, read=sqlglot_dialect)
+            tree = parse_one(input_str, read=sqlglot_dialect)
         except (sqlglot.ParseError, sqlglot.TokenError):
             pass
         else:
@@ -135,6 +144,11 @@ class SqlglotColumnTreeBuilder:
         raise ValueError(f"Could not parse input column: {input_str}")
 
 
+@lru_cache(maxsize=SQLGLOT_PARSE_CACHE_SIZE)
+def _column_tree_builder_sql(col_builder: SqlglotColumnTreeBuilder) -> str:
+    return col_builder.as_sqlglot_tree.sql(dialect=col_builder.sqlglot_dialect)
+
+
 class InputColumn:
     """
     Represents a column or column reference in the input data to Splink.
@@ -216,20 +230,20 @@ class InputColumn:
         )
 
     def unquote(self) -> InputColumn:
-        self_copy = deepcopy(self)
+        self_copy = copy(self)
         b = replace(self_copy.col_builder, quoted=False)
         self_copy.col_builder = b
         return self_copy
 
     def quote(self) -> InputColumn:
-        self_copy = deepcopy(self)
+        self_copy = copy(self)
         b = replace(self_copy.col_builder, quoted=True)
         self_copy.col_builder = b
         return self_copy
 
     @property
     def as_base_dialect(self) -> InputColumn:
-        input_column_copy = deepcopy(self)
+        input_column_copy = copy(self)
         input_column_copy.sql_dialect = None
         return input_column_copy
 
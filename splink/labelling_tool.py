@@ -3,10 +3,6 @@ import logging
 import os
 from typing import TYPE_CHECKING
 
-import numpy as np
-import pandas as pd
-from jinja2 import Template
-
 from .misc import EverythingEncoder, read_resource
 from .splink_dataframe import SplinkDataFrame
 
@@ -69,6 +65,9 @@ def render_labelling_tool_html(
         "\nto give us feedback."
     )
 
+    import numpy as np
+    import pandas as pd
+
     comparisons_recs = df_comparisons.as_pandas_dataframe()
 
     comparisons_recs = comparisons_recs.replace(r"^\s*$", "", regex=True)
@@ -79,6 +78,8 @@ def render_labelling_tool_html(
 
     comparisons_recs = comparisons_recs.to_dict(orient="records")
     # Render template with cluster, nodes and edges
+    from jinja2 import Template
+
     template_path = "files/labelling_tool/template.j2"
     template = Template(read_resource(template_path))
 
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
 import logging
 import os
 import re
+import threading
 import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from copy import copy, deepcopy
+from functools import partial
 from pathlib import Path
 from statistics import median
+from typing import Callable
 
 import sqlglot
 
@@ -33,15 +39,22 @@ from .analyse_blocking import (
     count_comparisons_from_blocking_rule_pre_filter_conditions_sqls,
     cumulative_comparisons_generated_by_blocking_rules,
     number_of_comparisons_generated_by_blocking_rule_post_filters_sql,
+    number_of_comparisons_generated_by_sorted_neighbourhood_rule_sqls,
 )
 from .blocking import (
     BlockingRule,
+    HotKeySalting,
     SaltedBlockingRule,
+    SortedNeighbourhoodBlockingRule,
     block_using_rules_sqls,
     blocking_rule_to_obj,
     materialise_exploded_id_tables,
+    materialise_hot_key_tables,
+    materialise_nearest_neighbour_id_tables,
+    materialise_sorted_neighbourhood_id_tables,
 )
 from .cache_dict_with_logging import CacheDictWithLogging
+from .cancellation import Cancellation
 from .charts import (
     accuracy_chart,
     completeness_chart,
@@ -69,7 +82,13 @@ from .connected_components import (
 from .edge_metrics import compute_edge_metrics
 from .em_training_session import EMTrainingSession
 from .estimate_u import estimate_u_values
-from .exceptions import SplinkDeprecated, SplinkException
+from .exceptions import (
+    ExecutionCancelledException,
+    SplinkDeprecated,
+    SplinkException,
+)
+from .execution_hooks import ExecutionHooks
+from .execution_profile import ExecutionProfile
 from .find_brs_with_comparison_counts_below_threshold import (
     find_blocking_rules_below_threshold_comparison_count,
 )
@@ -100,6 +119,7 @@ from .misc import (
 )
 from .missingness import completeness_data, missingness_data
 from .optimise_cost_of_brs import suggest_blocking_rules
+from .persistent_cache import PersistentResultCache
 from .pipeline import SQLPipeline
 from .predict import predict_from_comparison_vectors_sqls
 from .profile_data import profile_columns
@@ -226,6 +246,17 @@ class Linker:
         self._pipeline = SQLPipeline()
 
         self._intermediate_table_cache: dict = CacheDictWithLogging()
+        # Guards the cache when independent pipelines are executed concurrently
+        self._cache_lock = threading.RLock()
+        self._execution_profile = ExecutionProfile()
+        self._execution_hooks = ExecutionHooks()
+        # Set while an operation started by an asynchronous method such as
+        # `apredict()` is running, so that it can be cancelled
+        self._cancellation: Cancellation | None = None
+        self._async_operation_lock = threading.Lock()
+        # Guards `_cancellation`, so that SQL is only interrupted on behalf of the
+        # operation which is running
+        self._cancellation_lock = threading.Lock()
 
         homogenised_tables, homogenised_aliases = self._register_input_tables(
             input_table_or_tables,
@@ -248,6 +279,11 @@ class Linker:
         self._analyse_blocking_mode = False
         self._deterministic_link_mode = False
 
+        self._blocking_deduplication_strategy = "evaluate_rules"
+        self._blocking_pair_generation_strategy = "join"
+        self._hot_key_salting: HotKeySalting = None
+        self._singleton_key_pruning = False
+
         self.debug_mode = False
 
     def _input_columns(
@@ -433,6 +469,44 @@ class Linker:
     ):
         raise NotImplementedError("Random sample sql not implemented for this linker")
 
+    def _hash_sql(self, sql_expressions: list[str]) -> str:
+        """SQL computing a 64 bit integer hash of the values of the expressions"""
+        raise NotImplementedError(f"Hashing is not supported for {type(self)}")
+
+    @property
+    def _supports_hash_sql(self) -> bool:
+        try:
+            self._hash_sql(["1"])
+        except NotImplementedError:
+            return False
+        return True
+
+    @property
+    def _supports_groupwise_pair_generation(self) -> bool:
+        """Whether the backend can generate the pairs of records of a blocking rule
+        from lists of the records of each block.  See
+        `set_blocking_pair_generation_strategy()`"""
+        return False
+
+    @property
+    def _random_salt_expression(self) -> str:
+        """SQL generating a random number in the range [0, 1)"""
+        return "random()"
+
+    def _salt_bucket_sql(self, table_prefix: str, partitions: int | str) -> str:
+        """SQL assigning each record of the table aliased `table_prefix` to one of
+        `partitions` salt buckets, numbered from zero.
+
+        Where the backend supports hashing, the bucket is derived from a hash of the
+        record's unique id, so records are assigned to the same bucket on every run.
+        Otherwise it is derived from the record's random `__splink_salt`.
+        """
+        if not self._supports_hash_sql:
+            return f"floor({table_prefix}.__splink_salt * {partitions})"
+        uid_cols = self._settings_obj._unique_id_input_columns
+        uid_sql = [f"{table_prefix}.{c.name}" for c in uid_cols]
+        return f"abs({self._hash_sql(uid_sql)} % {partitions})"
+
     def _register_input_tables(self, input_tables, input_aliases, accepted_df_dtypes):
         # 'homogenised' means all entries are strings representing tables
         homogenised_tables = []
@@ -550,7 +624,7 @@ class Linker:
         else:
             # In duckdb, calls to random() in a CTE pipeline cause problems:
             # https://gist.github.com/RobinL/d329e7004998503ce91b68479aa41139
-            if self._settings_obj.salting_required:
+            if self._salting_required:
                 materialise = True
 
             if materialise:
@@ -559,10 +633,23 @@ class Linker:
                 # we execute the pipeline, it'll get cleared anyway
                 self._pipeline.reset()
 
+            sqls = compute_all_term_frequencies_sqls(self)
+
+            # Each term frequency table depends only on df_concat, so where there
+            # are several they can be computed at the same time
+            if (
+                materialise
+                and len(sqls) > 2
+                and self._supports_concurrent_execution
+                and not self.debug_mode
+            ):
+                nodes_with_tf = self._compute_df_concat_with_tf_concurrently(sqls)
+                cache["__splink__df_concat_with_tf"] = nodes_with_tf
+                return nodes_with_tf
+
             sql = vertically_concatenate_sql(self)
             self._enqueue_sql(sql, "__splink__df_concat")
 
-            sqls = compute_all_term_frequencies_sqls(self)
             for sql in sqls:
                 self._enqueue_sql(sql["sql"], sql["output_table_name"])
 
@@ -572,6 +659,30 @@ class Linker:
 
         return nodes_with_tf
 
+    def _compute_df_concat_with_tf_concurrently(self, sqls) -> SplinkDataFrame:
+        """Materialise df_concat, compute the term frequency tables concurrently,
+        then join them onto df_concat
+
+        Args:
+            sqls (list[dict]): The output of `compute_all_term_frequencies_sqls`,
+                being one sql per term frequency table followed by the join
+        """
+        df_concat = self._initialise_df_concat(materialise=True)
+
+        *tf_sqls, join_sql = sqls
+        pipelines = []
+        for sql in tf_sqls:
+            pipeline = self._new_pipeline()
+            pipeline.enqueue_sql(sql["sql"], sql["output_table_name"])
+            pipelines.append(pipeline)
+
+        tf_dfs = self._execute_sql_pipelines_concurrently(pipelines, [df_concat])
+        for tf_df in tf_dfs:
+            self._intermediate_table_cache[tf_df.templated_name] = tf_df
+
+        self._enqueue_sql(join_sql["sql"], join_sql["output_table_name"])
+        return self._execute_sql_pipeline([df_concat, *tf_dfs])
+
     def _table_to_splink_dataframe(
         self, templated_name, physical_name
     ) -> SplinkDataFrame:
@@ -589,9 +700,24 @@ class Linker:
             "_table_to_splink_dataframe not implemented on this linker"
         )
 
-    def _enqueue_sql(self, sql, output_table_name):
-        """Add sql to the current pipeline, but do not execute the pipeline."""
-        self._pipeline.enqueue_sql(sql, output_table_name)
+    def _new_pipeline(self) -> SQLPipeline:
+        """A pipeline for SQL executed separately from the current pipeline, for
+        instance by `_execute_sql_pipelines_concurrently`, which fires the same
+        execution hooks as the current pipeline"""
+        return SQLPipeline(
+            reference_count_threshold=self._pipeline.reference_count_threshold,
+            cost_threshold=self._pipeline.cost_threshold,
+            execution_hooks=self._pipeline.execution_hooks,
+        )
+
+    def _enqueue_sql(self, sql, output_table_name, materialise=None):
+        """Add sql to the current pipeline, but do not execute the pipeline.
+
+        By default, the pipeline decides whether to materialise this step as a table
+        (see `set_pipeline_materialisation`).  Set `materialise` to True or False to
+        override this.
+        """
+        self._pipeline.enqueue_sql(sql, output_table_name, materialise=materialise)
 
     def _execute_sql_pipeline(
         self,
@@ -615,14 +741,20 @@ class Linker:
         """
 
         if not self.debug_mode:
-            sql_gen = self._pipeline._generate_pipeline(input_dataframes)
+            try:
+                input_dataframes = self._materialise_shared_pipeline_steps(
+                    input_dataframes, use_cache
+                )
 
-            output_tablename_templated = self._pipeline.queue[-1].output_table_name
+                sql_gen = self._pipeline._generate_pipeline(input_dataframes)
 
-            try:
-                dataframe = self._sql_to_splink_dataframe_checking_cache(
+                output_tablename_templated = self._pipeline.queue[-1].output_table_name
+
+                dataframe = self._execute_pipeline_statement(
                     sql_gen,
                     output_tablename_templated,
+                    self._pipeline.execution_hooks,
+                    [t.output_table_name for t in self._pipeline.queue],
                     use_cache,
                 )
             except Exception as e:
@@ -653,6 +785,271 @@ class Linker:
             self._pipeline.reset()
             return dataframe
 
+    def _materialise_shared_pipeline_steps(
+        self, input_dataframes: list[SplinkDataFrame], use_cache=True
+    ) -> list[SplinkDataFrame]:
+        """Execute, as separate tables, any steps of the current pipeline that the
+        pipeline decides should be materialised, for instance because they are
+        referenced several times by later steps.
+
+        Returns the input dataframes for the remainder of the pipeline, which
+        include the newly materialised tables
+        """
+        input_dataframes = list(input_dataframes)
+        while True:
+            task = self._pipeline._next_task_to_materialise()
+            if task is None:
+                break
+            split_pipeline = self._pipeline._split_off_task(task)
+            sql = split_pipeline._generate_pipeline(input_dataframes)
+            splink_dataframe = self._execute_pipeline_statement(
+                sql,
+                task.output_table_name,
+                split_pipeline.execution_hooks,
+                [
+                    t.output_table_name
+                    for t in self._pipeline.queue + split_pipeline.queue
+                ],
+                use_cache,
+            )
+            input_dataframes.append(splink_dataframe)
+        return input_dataframes
+
+    def _execute_pipeline_statement(
+        self,
+        sql,
+        output_tablename_templated,
+        execution_hooks: ExecutionHooks,
+        step_names: list[str],
+        use_cache=True,
+    ) -> SplinkDataFrame:
+        """Execute a statement generated by a pipeline, firing the pipeline's
+        execution hooks around it.
+
+        `step_names` are the templated names of the pipeline's steps, in the order
+        they are computed.  Where a step is materialised as a table of its own, the
+        names of the steps it is computed from follow those of the rest of the
+        pipeline
+        """
+        return execution_hooks.run(
+            output_tablename_templated,
+            None,
+            sql,
+            self._sql_to_splink_dataframe_checking_cache,
+            sql,
+            output_tablename_templated,
+            use_cache,
+        )
+
+    def _execute_sql_pipelines_concurrently(
+        self,
+        pipelines: list[SQLPipeline],
+        input_dataframes: list[SplinkDataFrame] = [],
+        use_cache=True,
+    ) -> list[SplinkDataFrame]:
+        """Execute several independent pipelines, none of which reads the output of
+        another, returning the resultant tables in the same order as `pipelines`.
+
+        Where the backend supports it, the pipelines are executed concurrently on a
+        pool of worker threads.  Otherwise, or in debug mode, they are executed one
+        after the other.
+
+        Args:
+            pipelines (list[SQLPipeline]): The pipelines to execute
+            input_dataframes (List[SplinkDataFrame], optional): A 'starting point' of
+                SplinkDataFrames, shared by all the pipelines. Defaults to [].
+            use_cache (bool, optional): If true, look at whether each SQL pipeline has
+                been executed before, and if so, use the existing result. Defaults to
+                True.
+
+        Returns:
+            list[SplinkDataFrame]: The results of each pipeline
+        """
+        original_pipeline = self._pipeline
+
+        try:
+            if (
+                self.debug_mode
+                or not self._supports_concurrent_execution
+                or len(pipelines) < 2
+            ):
+                results = []
+                for pipeline in pipelines:
+                    self._pipeline = pipeline
+                    results.append(
+                        self._execute_sql_pipeline(input_dataframes, use_cache)
+                    )
+                return results
+
+            jobs = []
+            for pipeline in pipelines:
+                self._pipeline = pipeline
+                pipeline_inputs = self._materialise_shared_pipeline_steps(
+                    input_dataframes, use_cache
+                )
+                sql = pipeline._generate_pipeline(pipeline_inputs)
+                jobs.append(
+                    (
+                        sql,
+                        pipeline.queue[-1].output_table_name,
+                        pipeline.execution_hooks,
+                        [t.output_table_name for t in pipeline.queue],
+                    )
+                )
+                pipeline.reset()
+        finally:
+            self._pipeline = original_pipeline
+
+        def execute_job(job):
+            sql, output_tablename_templated, execution_hooks, step_names = job
+            return self._execute_pipeline_statement(
+                sql,
+                output_tablename_templated,
+                execution_hooks,
+                step_names,
+                use_cache,
+            )
+
+        def execute_job_in_worker_thread(job):
+            with self._worker_thread_context():
+                return execute_job(job)
+
+        results = [None] * len(jobs)
+        concurrent_jobs = []
+        for i, job in enumerate(jobs):
+            if self._can_execute_concurrently(job[0]):
+                concurrent_jobs.append(i)
+            else:
+                results[i] = execute_job(job)
+
+        if concurrent_jobs:
+            max_workers = min(len(concurrent_jobs), os.cpu_count() or 1)
+            logger.debug(
+                f"Executing {len(concurrent_jobs)} independent pipelines "
+                f"using {max_workers} threads"
+            )
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                dataframes = executor.map(
+                    execute_job_in_worker_thread, [jobs[i] for i in concurrent_jobs]
+                )
+                for i, dataframe in zip(concurrent_jobs, dataframes):
+                    results[i] = dataframe
+
+        return results
+
+    @property
+    def _salting_required(self) -> bool:
+        """Whether records need a random `__splink_salt` column, which is used to
+        split the comparisons generated by salted blocking rules and hot keys on
+        backends which cannot derive the salt from a hash of the unique id"""
+        salted = (
+            self._settings_obj.salting_required or self._hot_key_salting is not None
+        )
+        return salted and not self._supports_hash_sql
+
+    @property
+    def _supports_concurrent_execution(self) -> bool:
+        """Whether the backend can safely execute several statements at once from
+        different threads.  Backends which can should override this to return True.
+        """
+        return False
+
+    def _worker_thread_context(self):
+        """A context manager within which a worker thread executes SQL, for instance
+        to give the thread its own connection to the database"""
+        return nullcontext()
+
+    def _can_execute_concurrently(self, sql) -> bool:
+        """Whether `sql` can be executed by a worker thread, rather than only by the
+        thread that owns the connection"""
+        return True
+
+    def _interrupt_execution(self):
+        """Interrupt any SQL the backend is currently executing on behalf of this
+        linker.  Called from another thread when an asynchronous operation is
+        cancelled.  Backends which support this should override it."""
+        pass
+
+    def _cancellable_execution_context(self):
+        """A context manager within which an operation which may be cancelled is
+        run, for instance to tag the work it submits to the backend"""
+        return nullcontext()
+
+    def _raise_if_cancelled(self):
+        cancellation = self._cancellation
+        if cancellation is not None:
+            cancellation.raise_if_cancelled()
+
+    def _run_cancellable(self, cancellation: Cancellation, func, *args, **kwargs):
+        """Run `func`, which may be cancelled using `cancellation`.  If it is
+        cancelled, the tables it created are dropped and
+        `ExecutionCancelledException` is raised."""
+        # Operations share the linker's SQL pipeline, so must run one at a time
+        with self._async_operation_lock:
+            with self._cancellation_lock:
+                self._cancellation = cancellation
+            try:
+                with self._cancellable_execution_context():
+                    result = func(*args, **kwargs)
+                cancellation.raise_if_cancelled()
+                return result
+            except Exception as e:
+                if not cancellation.cancelled:
+                    raise
+                self._pipeline.reset()
+                self._drop_tables_created_by_cancelled_operation(cancellation)
+                if isinstance(e, ExecutionCancelledException):
+                    raise
+                raise ExecutionCancelledException(
+                    "The Splink operation was cancelled"
+                ) from e
+            finally:
+                with self._cancellation_lock:
+                    self._cancellation = None
+
+    def _drop_tables_created_by_cancelled_operation(self, cancellation: Cancellation):
+        for splink_dataframe in cancellation.created_tables:
+            try:
+                splink_dataframe.drop_table_from_database_and_remove_from_cache()
+            except Exception:
+                logger.warning(
+                    f"Unable to drop table {splink_dataframe.physical_name} created "
+                    "by a cancelled operation",
+                    exc_info=True,
+                )
+        logger.info(
+            f"Operation cancelled. Dropped {len(cancellation.created_tables)} tables "
+            "created by the operation"
+        )
+
+    async def _run_in_thread(self, func, *args, **kwargs):
+        """Run `func` on a worker thread, so as not to block the event loop.
+
+        If the awaiting task is cancelled, `func` is cancelled before the next SQL
+        statement it executes, any statement currently executing is interrupted if the
+        backend supports it, and the tables created by `func` are dropped.
+        """
+        loop = asyncio.get_running_loop()
+        cancellation = Cancellation()
+        future = loop.run_in_executor(
+            None, partial(self._run_cancellable, cancellation, func, *args, **kwargs)
+        )
+        try:
+            # Shielded so the worker can be waited for if the task is cancelled
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            cancellation.cancel()
+            # An operation still waiting for another to finish has no SQL executing,
+            # so the other operation's SQL must not be interrupted
+            with self._cancellation_lock:
+                if self._cancellation is cancellation:
+                    self._interrupt_execution()
+            try:
+                await future
+            except ExecutionCancelledException:
+                pass
+            raise
+
     def _execute_sql_against_backend(
         self, sql: str, templated_name: str, physical_name: str
     ) -> SplinkDataFrame:
@@ -833,49 +1230,44 @@ class Linker:
         Return a SplinkDataFrame representing the results of the SQL
         """
 
-        to_hash = (sql + self._cache_uid).encode("utf-8")
-        hash = hashlib.sha256(to_hash).hexdigest()[:9]
-        # Ensure hash is valid sql table name
-        table_name_hash = f"{output_tablename_templated}_{hash}"
+        self._raise_if_cancelled()
 
-        if use_cache:
-            # Certain tables are put in the cache using their templated_name
-            # An example is __splink__df_concat_with_tf
-            # These tables are put in the cache when they are first calculated
-            # e.g. with _initialise_df_concat_with_tf()
-            # But they can also be put in the cache manually using
-            # e.g. register_table_input_nodes_concat_with_tf()
-
-            # Look for these 'named' tables in the cache prior
-            # to looking for the hashed version
-
-            if output_tablename_templated in self._intermediate_table_cache:
-                return self._intermediate_table_cache.get_with_logging(
-                    output_tablename_templated
-                )
+        started_at = time.time()
 
-            if table_name_hash in self._intermediate_table_cache:
-                return self._intermediate_table_cache.get_with_logging(table_name_hash)
+        table_name_hash, full_hash = self._table_name_hash_for_sql(
+            sql, output_tablename_templated
+        )
 
-            # If not in cache, fall back on checking the database
-            if self._table_exists_in_database(table_name_hash):
-                logger.debug(
-                    f"Found cache for {output_tablename_templated} "
-                    f"in database using table name with physical name {table_name_hash}"
+        if use_cache:
+            with self._cache_lock:
+                splink_dataframe = self._retrieve_cached_result(
+                    sql, output_tablename_templated, table_name_hash, full_hash
                 )
-                return self._table_to_splink_dataframe(
-                    output_tablename_templated, table_name_hash
+            if splink_dataframe is not None:
+                self._execution_profile.record(
+                    output_tablename_templated,
+                    splink_dataframe.physical_name,
+                    cache_hit=True,
+                    started_at=started_at,
+                    wall_time_seconds=time.time() - started_at,
                 )
+                return splink_dataframe
 
         if self.debug_mode:
             print(sql)  # noqa: T201
-            splink_dataframe = self._execute_sql_against_backend(
+            splink_dataframe = self._execution_hooks.run(
+                output_tablename_templated,
+                output_tablename_templated,
+                sql,
+                self._execute_sql_against_backend,
                 sql,
                 output_tablename_templated,
                 output_tablename_templated,
             )
 
-            self._intermediate_table_cache.executed_queries.append(splink_dataframe)
+            self._intermediate_table_cache.executed_queries.append(
+                copy(splink_dataframe)
+            )
 
             df_pd = splink_dataframe.as_pandas_dataframe()
             try:
@@ -886,11 +1278,125 @@ class Linker:
                 print(df_pd)  # noqa: T201
 
         else:
-            splink_dataframe = self._execute_sql_against_backend(
-                sql, output_tablename_templated, table_name_hash
+            splink_dataframe = self._execution_hooks.run(
+                output_tablename_templated,
+                table_name_hash,
+                sql,
+                self._execute_sql_against_backend,
+                sql,
+                output_tablename_templated,
+                table_name_hash,
             )
-            self._intermediate_table_cache.executed_queries.append(splink_dataframe)
+            with self._cache_lock:
+                self._intermediate_table_cache.executed_queries.append(
+                    copy(splink_dataframe)
+                )
+
+        self._record_in_execution_profile(
+            splink_dataframe, sql, started_at, time.time() - started_at
+        )
+
+        with self._cache_lock:
+            self._register_executed_result(splink_dataframe, sql, full_hash, use_cache)
 
+        cancellation = self._cancellation
+        if cancellation is not None:
+            cancellation.record_created_table(splink_dataframe)
+
+        return splink_dataframe
+
+    def _record_in_execution_profile(
+        self, splink_dataframe: SplinkDataFrame, sql, started_at, wall_time_seconds
+    ):
+        profile = self._execution_profile
+
+        row_count = None
+        size_bytes = None
+        if profile.collect_table_statistics:
+            row_count = splink_dataframe._row_count()
+            size_bytes = splink_dataframe._estimated_size_bytes()
+
+        explain_plan = None
+        if profile.explain_analyze:
+            explain_plan = self._explain_analyze(sql)
+
+        profile.record(
+            splink_dataframe.templated_name,
+            splink_dataframe.physical_name,
+            cache_hit=False,
+            started_at=started_at,
+            wall_time_seconds=wall_time_seconds,
+            row_count=row_count,
+            size_bytes=size_bytes,
+            explain_plan=explain_plan,
+        )
+
+    def _explain_analyze(self, sql) -> str | None:
+        """The backend's query plan for `sql`, annotated with the actual cost of
+        each operation, or None if the backend cannot produce one"""
+        return None
+
+    def _table_name_hash_for_sql(self, sql, output_tablename_templated):
+        """The physical name of the table that `sql` creates, and the full hash from
+        which it is derived"""
+        # When results persist across sessions, physical names must be reproducible
+        # so that downstream SQL (and therefore its hash) is stable between runs.
+        # The fingerprint of the input data plays the role of the cache uid.
+        if self._intermediate_table_cache.persistent_cache is not None:
+            hash_suffix = self._input_data_fingerprint
+        else:
+            hash_suffix = self._cache_uid
+
+        to_hash = (sql + hash_suffix).encode("utf-8")
+        full_hash = hashlib.sha256(to_hash).hexdigest()
+        hash = full_hash[:9]
+        # Ensure hash is valid sql table name
+        table_name_hash = f"{output_tablename_templated}_{hash}"
+        return table_name_hash, full_hash
+
+    def _retrieve_cached_result(
+        self, sql, output_tablename_templated, table_name_hash, full_hash
+    ) -> SplinkDataFrame | None:
+        # Certain tables are put in the cache using their templated_name
+        # An example is __splink__df_concat_with_tf
+        # These tables are put in the cache when they are first calculated
+        # e.g. with _initialise_df_concat_with_tf()
+        # But they can also be put in the cache manually using
+        # e.g. register_table_input_nodes_concat_with_tf()
+
+        # Look for these 'named' tables in the cache prior
+        # to looking for the hashed version
+
+        if output_tablename_templated in self._intermediate_table_cache:
+            return self._intermediate_table_cache.get_with_logging(
+                output_tablename_templated
+            )
+
+        if table_name_hash in self._intermediate_table_cache:
+            return self._intermediate_table_cache.get_with_logging(table_name_hash)
+
+        # If not in cache, fall back on checking the database
+        if self._table_exists_in_database(table_name_hash):
+            logger.debug(
+                f"Found cache for {output_tablename_templated} "
+                f"in database using table name with physical name {table_name_hash}"
+            )
+            return self._table_to_splink_dataframe(
+                output_tablename_templated, table_name_hash
+            )
+
+        # Finally, look for a result saved to disk by a previous session
+        persistent_cache = self._intermediate_table_cache.persistent_cache
+        if persistent_cache is not None and full_hash in persistent_cache:
+            return self._load_from_persistent_cache(
+                full_hash, sql, output_tablename_templated, table_name_hash
+            )
+
+        return None
+
+    def _register_executed_result(
+        self, splink_dataframe: SplinkDataFrame, sql, full_hash, use_cache=True
+    ):
         splink_dataframe.created_by_splink = True
         splink_dataframe.sql_used_to_create = sql
 
@@ -898,8 +1404,464 @@ class Linker:
 
         self._intermediate_table_cache[physical_name] = splink_dataframe
 
+        persistent_cache = self._intermediate_table_cache.persistent_cache
+        if (
+            persistent_cache is not None
+            and use_cache
+            and not self.debug_mode
+            and persistent_cache.should_store(splink_dataframe.templated_name)
+        ):
+            self._save_to_persistent_cache(full_hash, splink_dataframe)
+
+        if self._intermediate_table_cache.memory_budget_bytes is not None:
+            self._track_size_and_enforce_memory_budget(splink_dataframe)
+
+    def _track_size_and_enforce_memory_budget(self, splink_dataframe):
+        cache = self._intermediate_table_cache
+        cache.record_table_size(
+            splink_dataframe.physical_name, splink_dataframe._estimated_size_bytes()
+        )
+        # The new table, and any table read in creating it, may be about to be used
+        sql = splink_dataframe.sql_used_to_create or ""
+        protected = {
+            df.physical_name for df in cache.data.values() if df.physical_name in sql
+        }
+        protected.add(splink_dataframe.physical_name)
+        cache.drop_unreferenced_tables(protected_physical_names=protected)
+        cache.enforce_memory_budget(protected_physical_names=protected)
+
+    def set_blocking_deduplication_strategy(self, strategy: str):
+        """Set how pairs generated by more than one blocking rule are deduplicated
+        when generating predictions.
+
+        Each blocking rule excludes the pairs generated by the rules preceding it.
+        By default (`"evaluate_rules"`), this is done by evaluating every preceding
+        rule for every pair a rule generates, so the cost of deduplication grows
+        with the number of rules.
+
+        With `"hashed_match_keys"`, a hash of the equi-join keys of each rule is
+        computed once per record, and a pair is only checked against a preceding
+        rule if the hashes of that rule's keys are equal.  This is faster when there
+        are many blocking rules.  The results are identical.  Rules without
+        equi-join conditions, such as `levenshtein(l.name, r.name) < 2`, are always
+        evaluated.  Supported on DuckDB and Spark.
+
+        Examples:
+            ```py
+            linker.set_blocking_deduplication_strategy("hashed_match_keys")
+            df_predict = linker.predict()
+            ```
+
+        Args:
+            strategy (str): `"evaluate_rules"` or `"hashed_match_keys"`
+        """
+        strategies = ["evaluate_rules", "hashed_match_keys"]
+        if strategy not in strategies:
+            raise ValueError(
+                f"Blocking deduplication strategy must be one of {strategies}, "
+                f"not '{strategy}'"
+            )
+        if strategy == "hashed_match_keys" and not self._supports_hash_sql:
+            raise SplinkException(
+                "The hashed_match_keys blocking deduplication strategy is not "
+                f"supported for {type(self).__name__}"
+            )
+        self._blocking_deduplication_strategy = strategy
+
+    def set_blocking_pair_generation_strategy(self, strategy: str):
+        """Set how the pairs of records satisfying the equi-join conditions of a
+        blocking rule, such as `l.surname = r.surname`, are generated when
+        generating predictions.
+
+        By default (`"join"`), the records are joined on the join keys, and the
+        half of the pairs in which the left hand record has the greater unique id
+        is then discarded.
+
+        With `"groupwise"`, the records with each value of the join keys are
+        aggregated into a list sorted by unique id, and each record is paired with
+        the records after it in the list, so only the pairs which are kept are
+        generated.  This can be faster for blocking rules generating very large
+        blocks, but is usually slower for rules generating small ones, so is worth
+        benchmarking on your data.  The results are identical.  It applies to
+        rules whose equi-join conditions each compare the same expression of both
+        records, which are not salted, exploding or sorted neighbourhood rules.
+        Supported on DuckDB.
+
+        Examples:
+            ```py
+            linker.set_blocking_pair_generation_strategy("groupwise")
+            df_predict = linker.predict()
+            ```
+
+        Args:
+            strategy (str): `"join"` or `"groupwise"`
+        """
+        strategies = ["join", "groupwise"]
+        if strategy not in strategies:
+            raise ValueError(
+                f"Blocking pair generation strategy must be one of {strategies}, "
+                f"not '{strategy}'"
+            )
+        if strategy == "groupwise" and not self._supports_groupwise_pair_generation:
+            raise SplinkException(
+                "The groupwise blocking pair generation strategy is not supported "
+                f"for {type(self).__name__}"
+            )
+        self._blocking_pair_generation_strategy = strategy
+
+    def set_hot_key_salting(
+        self, max_block_size: int | None = 1_000_000, max_partitions: int = 16
+    ):
+        """Split the comparisons generated by the largest blocks of each blocking
+        rule into partitions, so that they are spread across threads.
+
+        A few very common values, such as a common surname or a placeholder date
+        of birth like 1900-01-01, can generate most of the comparisons of a blocking
+        rule, leaving most threads idle while the few threads processing them
+        finish.  Before generating predictions, Splink counts the comparisons
+        generated by each value of the join keys of each blocking rule.  The
+        comparisons of keys generating more than `max_block_size` comparisons are
+        split into partitions of roughly `max_block_size` comparisons.  Comparisons
+        generated by other keys are not salted, so do not incur the overhead of
+        salting.
+
+        Unlike `salting_partitions`, this does not need to be set for each rule.
+        It applies to blocking rules with equi-join conditions, such as
+        `l.surname = r.surname and l.dob = r.dob`, which are not already salted or
+        exploding.
+
+        Examples:
+            ```py
+            linker.set_hot_key_salting(max_block_size=1_000_000)
+            df_predict = linker.predict()
+            ```
+
+        Args:
+            max_block_size (int | None): Keys generating more than this number of
+                comparisons are split into partitions.  Set to None to disable hot
+                key salting.  Defaults to 1,000,000.
+            max_partitions (int): The maximum number of partitions the comparisons
+                of a single key are split into.  Defaults to 16.
+        """
+        if max_block_size is None:
+            self._hot_key_salting = None
+            return
+
+        if max_block_size < 1 or max_partitions < 1:
+            raise ValueError("max_block_size and max_partitions must be positive")
+
+        self._hot_key_salting = HotKeySalting(max_block_size, max_partitions)
+
+        cache = self._intermediate_table_cache
+        if self._salting_required and "__splink__df_concat_with_tf" in cache:
+            column_names = [
+                c.unquote().name for c in cache["__splink__df_concat_with_tf"].columns
+            ]
+            if "__splink_salt" not in column_names:
+                # The records need to be recomputed with a salt column
+                del cache["__splink__df_concat_with_tf"]
+
+    def set_singleton_key_pruning(self, enabled: bool = True):
+        """Before the records are joined by a blocking rule, remove the records whose
+        join keys are not shared with any other record, so are not part of any
+        comparison.
+
+        Where most records have a unique or null value of the join keys of a
+        blocking rule, such as `l.surname = r.surname and l.dob = r.dob`, the join
+        reads every record but only a few of them are paired.  With singleton key
+        pruning, Splink first counts the records with each value of the join keys,
+        and only the records with a value shared by at least two records are read
+        by the join.  This reduces the memory used by the join, so is faster for
+        large inputs where most join keys are unique, particularly where the
+        records have many columns or memory is limited.  For small inputs, or
+        where few keys are unique, the cost of counting the keys outweighs the
+        saving.  The results are identical.
+
+        It applies to blocking rules whose equi-join conditions each compare the
+        same expression of both records, which are not salted, exploding or sorted
+        neighbourhood rules.
+
+        Examples:
+            ```py
+            linker.set_singleton_key_pruning()
+            df_predict = linker.predict()
+            ```
+
+        Args:
+            enabled (bool): Whether to prune records before blocking joins.
+                Defaults to True.
+        """
+        self._singleton_key_pruning = enabled
+
+    def set_pipeline_materialisation(
+        self, reference_count_threshold: int = 2, cost_threshold: int = None
+    ):
+        """Materialise steps of Splink's SQL pipelines as tables of their own, rather
+        than as CTEs of a single statement, where they are referenced several times
+        by later steps or are expensive to compute.
+
+        Splink executes most of its SQL as pipelines, in which each step becomes a
+        CTE of a single statement.  Depending on the backend, a CTE referenced by
+        several later steps may be evaluated once per reference.  With
+        materialisation enabled, such steps are executed first and their results
+        read by the rest of the pipeline.  Which steps are expensive is estimated
+        from the joins, aggregations, window functions and `distinct`s in their SQL.
+        The decision for each step is logged at debug level.
+
+        Materialisation is off by default.  Steps materialised as tables fire the
+        same execution hooks, and on DuckDB use the same resource profile, as the
+        pipeline they are part of.
+
+        Examples:
+            ```py
+            linker.set_pipeline_materialisation(reference_count_threshold=2)
+            df_predict = linker.predict()
+            ```
+
+        Args:
+            reference_count_threshold (int, optional): Materialise steps containing
+                an expensive operation which are referenced at least this many times
+                by later steps.  Set to None to disable.  Defaults to 2.
+            cost_threshold (int, optional): Materialise steps containing at least
+                this many expensive operations plus one, however many times they are
+                referenced.  Defaults to None, meaning steps are not materialised
+                on the basis of their cost alone.
+        """
+        self._pipeline.reference_count_threshold = reference_count_threshold
+        self._pipeline.cost_threshold = cost_threshold
+
+    def set_memory_budget(
+        self, max_bytes: int | None, drop_unreferenced_tables: bool = True
+    ):
+        """Limit the total size of the intermediate tables Splink keeps in the
+        database.
+
+        Whenever Splink creates a table, it records its (estimated) size.  If the
+        total size of cached tables exceeds `max_bytes`, the least recently used
+        tables are dropped, provided that:
+
+        - they were created by Splink, so can be recomputed if needed again, and
+        - no `SplinkDataFrame` referring to them is still in use.
+
+        Tables that are dropped are transparently recomputed if they are needed
+        again later.
+
+        By default, intermediate tables are also dropped as soon as no
+        `SplinkDataFrame` refers to them, whatever their size, except for those
+        Splink looks up by name, such as the term frequency tables.
+
+        Size estimates are available for the DuckDB and Postgres backends.  On
+        other backends, tables are not tracked and nothing is evicted.
+
+        Examples:
+            ```py
+            linker = DuckDBLinker(df, settings)
+            linker.set_memory_budget(8 * 1024**3)
+            ```
+
+        Args:
+            max_bytes (int | None): The memory budget in bytes.  Set to None to
+                remove the budget, and stop dropping unreferenced tables.
+            drop_unreferenced_tables (bool, optional): Whether to drop intermediate
+                tables once they are no longer referenced, rather than only when
+                over budget.  Defaults to True.
+        """
+        cache = self._intermediate_table_cache
+        cache.memory_budget_bytes = max_bytes
+        cache.drop_unreferenced = max_bytes is not None and drop_unreferenced_tables
+        if max_bytes is None:
+            return
+
+        for splink_df in list(cache.data.values()):
+            if splink_df.physical_name not in cache._table_sizes:
+                cache.record_table_size(
+                    splink_df.physical_name, splink_df._estimated_size_bytes()
+                )
+            if cache.drop_unreferenced and not cache.reference_count(
+                splink_df.physical_name
+            ):
+                cache._unreferenced.add(splink_df.physical_name)
+        cache.drop_unreferenced_tables()
+        cache.enforce_memory_budget()
+
+    @property
+    def execution_profile(self) -> ExecutionProfile:
+        """A record of each table Splink has computed or retrieved from the cache,
+        with the time taken, allowing you to find which stages dominate run time.
+
+        Row counts and table sizes, and the backend's `EXPLAIN ANALYZE` plans, are
+        expensive to collect so are only recorded if requested.  Plans are
+        available for the DuckDB and Postgres backends.
+
+        Examples:
+            ```py
+            linker.execution_profile.collect_table_statistics = True
+            linker.predict()
+            profile = linker.execution_profile.as_pandas_dataframe()
+            profile.sort_values("wall_time_seconds", ascending=False)
+            ```
+            Export to json
+            ```py
+            linker.execution_profile.to_json("profile.json", overwrite=True)
+            ```
+
+        Returns:
+            ExecutionProfile: The profile, which can be exported using
+                `as_pandas_dataframe()`, `as_record_dict()` or `to_json()`, and
+                cleared using `reset()`
+        """
+        return self._execution_profile
+
+    @property
+    def execution_hooks(self) -> ExecutionHooks:
+        """Callbacks fired before and after each SQL statement Splink executes
+        against the backend, and if a statement errors.  Use these to send stage
+        timings and row counts to your own metrics system.
+
+        Callbacks are passed an `ExecutionEvent`, with the templated name (e.g.
+        `__splink__df_predict`) and physical name of the table being created, the
+        SQL, and, once the statement has completed, the wall time and resultant
+        `SplinkDataFrame`.  Results retrieved from the cache do not fire hooks.
+
+        Examples:
+            ```py
+            def alert_if_slow(event):
+                if event.templated_name == "__splink__df_predict":
+                    if event.wall_time_seconds > 600:
+                        send_alert(f"predict took {event.wall_time_seconds}s")
+
+            handle = linker.execution_hooks.register(after=alert_if_slow)
+            linker.predict()
+            linker.execution_hooks.remove(handle)
+            ```
+
+        Returns:
+            ExecutionHooks: Register callbacks using `register(before, after,
+                on_error)`, and remove them using `remove(handle)`
+        """
+        return self._execution_hooks
+
+    def _load_from_persistent_cache(
+        self, key, sql, output_tablename_templated, table_name_hash
+    ) -> SplinkDataFrame:
+        persistent_cache = self._intermediate_table_cache.persistent_cache
+        filepath = persistent_cache.get_filepath(key)
+        logger.debug(
+            f"Found cache for {output_tablename_templated} "
+            f"in persistent cache at {filepath}"
+        )
+        splink_dataframe = self._execute_sql_against_backend(
+            self._read_parquet_sql(filepath),
+            output_tablename_templated,
+            table_name_hash,
+        )
+        splink_dataframe.created_by_splink = True
+        splink_dataframe.sql_used_to_create = sql
+
+        cache = self._intermediate_table_cache
+        cache[splink_dataframe.physical_name] = splink_dataframe
+        cache.queries_retrieved_from_cache.append(copy(splink_dataframe))
         return splink_dataframe
 
+    def _save_to_persistent_cache(self, key, splink_dataframe: SplinkDataFrame):
+        persistent_cache = self._intermediate_table_cache.persistent_cache
+        splink_dataframe.to_parquet(
+            persistent_cache.filepath_for_key(key), overwrite=True
+        )
+        persistent_cache.record(
+            key, splink_dataframe.templated_name, splink_dataframe.physical_name
+        )
+
+    def _read_parquet_sql(self, filepath: str) -> str:
+        """SQL that selects all rows from the parquet file at `filepath`.
+        Used to read results back in from the persistent cache.
+        """
+        raise NotImplementedError(
+            f"Reading parquet files is not implemented for {type(self)}"
+        )
+
+    def _input_table_fingerprint_sql(self, physical_name: str) -> str:
+        """SQL returning a single row which summarises the contents of an input
+        table.  Backends which can compute a content checksum should override this.
+        """
+        return f"select count(*) as row_count from {physical_name}"
+
+    def _compute_input_data_fingerprint(self) -> str:
+        fingerprints = []
+        for alias, df in self._input_tables_dict.items():
+            sql = self._input_table_fingerprint_sql(df.physical_name)
+            summary_df = self._sql_to_splink_dataframe_checking_cache(
+                sql, "__splink__input_table_fingerprint", use_cache=False
+            )
+            summary = summary_df.as_record_dict()[0]
+            summary_df.drop_table_from_database_and_remove_from_cache()
+            fingerprints.append(
+                {
+                    "alias": str(alias),
+                    "physical_name": df.physical_name,
+                    "columns": sorted(c.name for c in df.columns),
+                    "summary": {k: str(v) for k, v in summary.items()},
+                }
+            )
+        as_json = json.dumps(fingerprints, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(as_json).hexdigest()[:16]
+
+    def enable_persistent_cache(
+        self,
+        cache_dir: str | Path,
+        max_size_bytes: int = None,
+        cache_table: Callable[[str], bool] = None,
+    ):
+        """Persist the results of Splink's SQL pipelines to disk, so they can be
+        re-used by future Python sessions rather than recomputed.
+
+        Cached results are keyed by a hash of the SQL used to create them together
+        with a fingerprint of the input data (row counts, schemas and, where the
+        backend supports it, a checksum of the contents).  Re-running a job after
+        changing the model settings will therefore only recompute the stages whose
+        SQL has changed.
+
+        By default, only the intermediate tables which are re-used by many later
+        stages are stored: the concatenated input records and the term frequency
+        tables.  Pass `cache_table` to choose which tables are stored, for instance
+        to also store the predictions.
+
+        Examples:
+            ```py
+            linker = DuckDBLinker(df, settings)
+            linker.enable_persistent_cache("splink_cache/", max_size_bytes=10e9)
+            df_predict = linker.predict()
+            ```
+            Also store the predictions, so a later session can read them back
+            ```py
+            from splink.persistent_cache import is_reusable_intermediate_table
+
+            linker.enable_persistent_cache(
+                "splink_cache/",
+                cache_table=lambda name: is_reusable_intermediate_table(name)
+                or name == "__splink__df_predict",
+            )
+            ```
+
+        Args:
+            cache_dir (str | Path): Directory in which to store cached results.
+            max_size_bytes (int, optional): Maximum total size of the cache on disk.
+                When exceeded, the least recently used results are evicted.
+                Defaults to None, meaning no limit.
+            cache_table (Callable[[str], bool], optional): A function of the
+                templated name of a table, such as `__splink__df_predict`, which
+                returns whether the table is stored.  Defaults to None, meaning
+                the concatenated input records and term frequency tables.
+        """
+        # Fail early if this backend cannot read the cache back in
+        self._read_parquet_sql(str(cache_dir))
+
+        self._intermediate_table_cache.persistent_cache = None
+        self._input_data_fingerprint = self._compute_input_data_fingerprint()
+        self._intermediate_table_cache.persistent_cache = PersistentResultCache(
+            cache_dir, max_size_bytes=max_size_bytes, should_store=cache_table
+        )
+
     def __deepcopy__(self, memo):
         """When we do EM training, we need a copy of the linker which is independent
         of the main linker e.g. setting parameters on the copy will not affect the
@@ -1409,13 +2371,21 @@ class Linker:
 
         concat_with_tf = self._initialise_df_concat_with_tf()
         exploding_br_with_id_tables = materialise_exploded_id_tables(self)
+        sorted_neighbourhood_brs = materialise_sorted_neighbourhood_id_tables(self)
+        nearest_neighbour_brs = materialise_nearest_neighbour_id_tables(self)
+        br_with_hot_keys = materialise_hot_key_tables(self)
 
         sqls = block_using_rules_sqls(self)
         for sql in sqls:
-            self._enqueue_sql(sql["sql"], sql["output_table_name"])
+            self._enqueue_sql(
+                sql["sql"], sql["output_table_name"], sql.get("materialise")
+            )
 
         deterministic_link_df = self._execute_sql_pipeline([concat_with_tf])
         [b.drop_materialised_id_pairs_dataframe() for b in exploding_br_with_id_tables]
+        [b.drop_materialised_id_pairs_dataframe() for b in sorted_neighbourhood_brs]
+        [b.drop_materialised_id_pairs_dataframe() for b in nearest_neighbour_brs]
+        [b.drop_hot_keys_table() for b in br_with_hot_keys]
         return deterministic_link_df
 
     def estimate_u_using_random_sampling(
@@ -1745,13 +2715,20 @@ class Linker:
         if nodes_with_tf:
             input_dataframes.append(nodes_with_tf)
 
-        # If exploded blocking rules exist, we need to materialise
-        # the tables of ID pairs
+        # If exploded, sorted neighbourhood or nearest neighbour blocking rules
+        # exist, we need to materialise the tables of ID pairs
         exploding_br_with_id_tables = materialise_exploded_id_tables(self)
+        sorted_neighbourhood_brs = materialise_sorted_neighbourhood_id_tables(self)
+        nearest_neighbour_brs = materialise_nearest_neighbour_id_tables(self)
+
+        # If hot key salting is enabled, find the keys whose blocks need splitting
+        br_with_hot_keys = materialise_hot_key_tables(self)
 
         sqls = block_using_rules_sqls(self)
         for sql in sqls:
-            self._enqueue_sql(sql["sql"], sql["output_table_name"])
+            self._enqueue_sql(
+                sql["sql"], sql["output_table_name"], sql.get("materialise")
+            )
 
         repartition_after_blocking = getattr(self, "repartition_after_blocking", False)
 
@@ -1776,9 +2753,45 @@ class Linker:
         self._predict_warning()
 
         [b.drop_materialised_id_pairs_dataframe() for b in exploding_br_with_id_tables]
+        [b.drop_materialised_id_pairs_dataframe() for b in sorted_neighbourhood_brs]
+        [b.drop_materialised_id_pairs_dataframe() for b in nearest_neighbour_brs]
+        [b.drop_hot_keys_table() for b in br_with_hot_keys]
 
         return predictions
 
+    async def apredict(
+        self,
+        threshold_match_probability: float = None,
+        threshold_match_weight: float = None,
+        materialise_after_computing_term_frequencies=True,
+    ) -> SplinkDataFrame:
+        """Asynchronous version of `predict()`, which runs on a worker thread so
+        does not block the event loop.
+
+        If the awaiting task is cancelled, Splink stops before executing its next
+        SQL statement and, where the backend supports it (DuckDB, SQLite and Spark),
+        interrupts the statement currently executing.  Tables created by the
+        cancelled call are dropped.
+
+        Examples:
+            ```py
+            task = asyncio.create_task(linker.apredict(threshold_match_probability=0.9))
+            ...
+            task.cancel()
+            ```
+
+        Returns:
+            SplinkDataFrame: A SplinkDataFrame of the pairwise comparisons.
+        """
+        return await self._run_in_thread(
+            self.predict,
+            threshold_match_probability=threshold_match_probability,
+            threshold_match_weight=threshold_match_weight,
+            materialise_after_computing_term_frequencies=(
+                materialise_after_computing_term_frequencies
+            ),
+        )
+
     def find_matches_to_new_records(
         self,
         records_or_tablename,
@@ -1880,7 +2893,9 @@ class Linker:
 
         sqls = block_using_rules_sqls(self)
         for sql in sqls:
-            self._enqueue_sql(sql["sql"], sql["output_table_name"])
+            self._enqueue_sql(
+                sql["sql"], sql["output_table_name"], sql.get("materialise")
+            )
 
         sql = compute_comparison_vector_values_sql(self._settings_obj)
         self._enqueue_sql(sql, "__splink__df_comparison_vectors")
@@ -1965,7 +2980,9 @@ class Linker:
 
         sqls = block_using_rules_sqls(self)
         for sql in sqls:
-            self._enqueue_sql(sql["sql"], sql["output_table_name"])
+            self._enqueue_sql(
+                sql["sql"], sql["output_table_name"], sql.get("materialise")
+            )
 
         sql = compute_comparison_vector_values_sql(self._settings_obj)
         self._enqueue_sql(sql, "__splink__df_comparison_vectors")
@@ -2022,7 +3039,9 @@ class Linker:
 
         sqls = block_using_rules_sqls(self)
         for sql in sqls:
-            self._enqueue_sql(sql["sql"], sql["output_table_name"])
+            self._enqueue_sql(
+                sql["sql"], sql["output_table_name"], sql.get("materialise")
+            )
 
         sql = compute_comparison_vector_values_sql(self._settings_obj)
 
@@ -2049,6 +3068,34 @@ class Linker:
 
         return predictions
 
+    async def afind_matches_to_new_records(
+        self,
+        records_or_tablename,
+        blocking_rules=[],
+        match_weight_threshold=-4,
+    ) -> SplinkDataFrame:
+        """Asynchronous version of `find_matches_to_new_records()`, which runs on a
+        worker thread so does not block the event loop.  Can be cancelled in the same
+        way as `apredict()`.
+
+        Examples:
+            ```py
+            record = {'unique_id': 1, 'first_name': "John", 'surname': "Smith"}
+            df = await linker.afind_matches_to_new_records(
+                [record], blocking_rules=[]
+            )
+            ```
+
+        Returns:
+            SplinkDataFrame: The pairwise comparisons.
+        """
+        return await self._run_in_thread(
+            self.find_matches_to_new_records,
+            records_or_tablename,
+            blocking_rules=blocking_rules,
+            match_weight_threshold=match_weight_threshold,
+        )
+
     def cluster_pairwise_predictions_at_threshold(
         self,
         df_predict: SplinkDataFrame,
@@ -2106,6 +3153,37 @@ class Linker:
 
         return cc
 
+    async def acluster_pairwise_predictions_at_threshold(
+        self,
+        df_predict: SplinkDataFrame,
+        threshold_match_probability: float = None,
+        pairwise_formatting: bool = False,
+        filter_pairwise_format_for_clusters: bool = True,
+    ) -> SplinkDataFrame:
+        """Asynchronous version of `cluster_pairwise_predictions_at_threshold()`,
+        which runs on a worker thread so does not block the event loop.  Can be
+        cancelled in the same way as `apredict()`.
+
+        Examples:
+            ```py
+            df_predict = await linker.apredict()
+            df_clusters = await linker.acluster_pairwise_predictions_at_threshold(
+                df_predict, threshold_match_probability=0.95
+            )
+            ```
+
+        Returns:
+            SplinkDataFrame: A SplinkDataFrame containing a list of all IDs, clustered
+                into groups based on the desired match threshold.
+        """
+        return await self._run_in_thread(
+            self.cluster_pairwise_predictions_at_threshold,
+            df_predict,
+            threshold_match_probability=threshold_match_probability,
+            pairwise_formatting=pairwise_formatting,
+            filter_pairwise_format_for_clusters=filter_pairwise_format_for_clusters,
+        )
+
     def _compute_metrics_nodes(
         self,
         df_predict: SplinkDataFrame,
@@ -3345,15 +4423,22 @@ class Linker:
             int: The number of comparisons generated by the blocking rule
         """
 
-        blocking_rule = blocking_rule_to_obj(blocking_rule).blocking_rule_sql
+        blocking_rule = blocking_rule_to_obj(blocking_rule)
 
         sql = vertically_concatenate_sql(self)
         self._enqueue_sql(sql, "__splink__df_concat")
 
-        sql = number_of_comparisons_generated_by_blocking_rule_post_filters_sql(
-            self, blocking_rule
-        )
-        self._enqueue_sql(sql, "__splink__analyse_blocking_rule")
+        if isinstance(blocking_rule, SortedNeighbourhoodBlockingRule):
+            sqls = number_of_comparisons_generated_by_sorted_neighbourhood_rule_sqls(
+                self, blocking_rule
+            )
+            for sql in sqls:
+                self._enqueue_sql(sql["sql"], sql["output_table_name"])
+        else:
+            sql = number_of_comparisons_generated_by_blocking_rule_post_filters_sql(
+                self, blocking_rule.blocking_rule_sql
+            )
+            self._enqueue_sql(sql, "__splink__analyse_blocking_rule")
         res = self._execute_sql_pipeline().as_record_dict()[0]
         return res["count_of_pairwise_comparisons_generated"]
 
@@ -3824,6 +4909,11 @@ class Linker:
         This is useful, for example, if the input data tables have changed.
         """
 
+        # The input data may have changed, so results persisted to disk can only
+        # be re-used if the fingerprint of the input data still matches
+        if self._intermediate_table_cache.persistent_cache is not None:
+            self._input_data_fingerprint = self._compute_input_data_fingerprint()
+
         # Nothing to delete
         if len(self._intermediate_table_cache) == 0:
             return
@@ -3872,8 +4962,8 @@ class Linker:
         splink_dataframe = self.register_table(
             input_data, table_name_physical, overwrite=overwrite
         )
-        self._intermediate_table_cache["__splink__df_predict"] = splink_dataframe
         splink_dataframe.templated_name = "__splink__df_predict"
+        self._intermediate_table_cache["__splink__df_predict"] = splink_dataframe
         return splink_dataframe
 
     def register_term_frequency_lookup(self, input_data, col_name, overwrite=False):
@@ -3883,8 +4973,8 @@ class Linker:
         splink_dataframe = self.register_table(
             input_data, table_name_physical, overwrite=overwrite
         )
-        self._intermediate_table_cache[table_name_templated] = splink_dataframe
         splink_dataframe.templated_name = table_name_templated
+        self._intermediate_table_cache[table_name_templated] = splink_dataframe
         return splink_dataframe
 
     def register_labels_table(self, input_data, overwrite=False):
@@ -4128,3 +5218,24 @@ class Linker:
         raise NotImplementedError(
             f"Unnesting blocking rules are not supported for {type(self)}"
         )
+
+    def _shingles_sql(self, column_sql: str, shingle_type: str, shingle_size: int):
+        """SQL computing an array of the shingles of a string, either its character
+        q-grams of length `shingle_size`, or its whitespace separated tokens"""
+        raise NotImplementedError(
+            f"MinHash blocking rules are not supported for {type(self)}"
+        )
+
+    def _minhash_band_keys_sql(self, shingles_sql: str, bands: int, rows: int):
+        """SQL computing an array of `bands` keys, each a hash of `rows` MinHash
+        values of the array of shingles"""
+        raise NotImplementedError(
+            f"MinHash blocking rules are not supported for {type(self)}"
+        )
+
+    def _deletion_neighbourhood_sql(self, column_sql: str, max_deletions: int):
+        """SQL computing an array of the distinct strings obtainable by deleting up
+        to `max_deletions` characters from a string, including the string itself"""
+        raise NotImplementedError(
+            f"Levenshtein blocking rules are not supported for {type(self)}"
+        )
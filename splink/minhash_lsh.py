@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+
+def lsh_candidate_probability(similarity: float, bands: int, rows: int) -> float:
+    """The probability that two records whose shingles have the given Jaccard
+    similarity share the MinHash signature of at least one band, and so are
+    compared"""
+    return 1 - (1 - similarity**rows) ** bands
+
+
+def _integrate(f, lower: float, upper: float, steps: int = 200) -> float:
+    # Midpoint rule.  The integrands are smooth, so this is ample
+    width = (upper - lower) / steps
+    return sum(f(lower + (i + 0.5) * width) for i in range(steps)) * width
+
+
+def lsh_expected_recall(jaccard_threshold: float, bands: int, rows: int) -> float:
+    """The mean probability of comparing pairs of records whose Jaccard similarity
+    is above the threshold, assuming similarities are uniformly distributed between
+    the threshold and one"""
+    if jaccard_threshold >= 1:
+        return lsh_candidate_probability(1.0, bands, rows)
+    recalled = _integrate(
+        lambda s: lsh_candidate_probability(s, bands, rows), jaccard_threshold, 1.0
+    )
+    return recalled / (1 - jaccard_threshold)
+
+
+@lru_cache(maxsize=None)
+def optimal_lsh_parameters(
+    jaccard_threshold: float,
+    num_perm: int,
+    false_positive_weight: float = 0.5,
+    false_negative_weight: float = 0.5,
+) -> tuple[int, int]:
+    """Choose the number of bands, and the number of rows of the signature in each
+    band, for MinHash LSH with at most `num_perm` hash functions.
+
+    The parameters minimise the weighted sum of the probability of comparing pairs
+    of records with a Jaccard similarity below the threshold (false positives) and
+    of not comparing pairs above it (false negatives), each integrated over the
+    range of similarities.
+
+    Returns:
+        tuple[int, int]: bands, rows
+    """
+    best_error, best_parameters = None, None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+
+            def probability(s, bands=bands, rows=rows):
+                return lsh_candidate_probability(s, bands, rows)
+
+            false_positives = _integrate(probability, 0.0, jaccard_threshold)
+            false_negatives = _integrate(
+                lambda s: 1 - probability(s), jaccard_threshold, 1.0
+            )
+            error = (
+                false_positive_weight * false_positives
+                + false_negative_weight * false_negatives
+            )
+            if best_error is None or error < best_error:
+                best_error, best_parameters = error, (bands, rows)
+    return best_parameters
@@ -7,8 +7,6 @@ from datetime import datetime, timedelta
 from math import ceil, inf, log2
 from typing import Iterable
 
-import numpy as np
-
 
 def dedupe_preserving_order(list_of_items):
     return list(dict.fromkeys(list_of_items))
@@ -80,6 +78,8 @@ class EverythingEncoder(json.JSONEncoder):
     # NOT natively serializable.  The 'encode' method can be used
     # for natively serializable data
     def default(self, obj):
+        import numpy as np
+
         if isinstance(obj, np.integer):
             return int(obj)
         elif isinstance(obj, np.floating):
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+
+def nearest_neighbours(embeddings, k: int, chunk_size: int = 1024, groups=None):
+    """The k nearest neighbours of each row of `embeddings` by cosine similarity.
+
+    The similarities are computed with matrix products of blocks of `chunk_size`
+    rows by `chunk_size` rows, and the k most similar rows found so far are kept
+    for each row.  Apart from the embeddings themselves, memory use is therefore
+    proportional to `chunk_size` times `chunk_size + k`, however many rows there
+    are.
+
+    Args:
+        embeddings (array-like): A 2D array with one embedding per row
+        k (int): The number of neighbours of each row
+        chunk_size (int, optional): The number of rows in each block of the
+            similarity matrix, on each side
+        groups (array-like, optional): If given, rows are only neighbours of rows
+            in a different group, e.g. records from a different dataset
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: The indices of each row and of one of
+            its neighbours
+    """
+    import numpy as np
+
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    # Zero vectors have a similarity of zero to every other vector
+    normalised = embeddings / np.where(norms == 0, 1, norms)
+    if groups is not None:
+        groups = np.asarray(groups)
+
+    num_rows = len(normalised)
+    k = min(k, num_rows - 1)
+    if k < 1:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    rows, neighbours = [], []
+    for start in range(0, num_rows, chunk_size):
+        chunk_rows = np.arange(start, min(start + chunk_size, num_rows))
+        best_similarities = np.full((len(chunk_rows), k), -np.inf, dtype=np.float32)
+        best_neighbours = np.zeros((len(chunk_rows), k), dtype=np.int64)
+
+        for column_start in range(0, num_rows, chunk_size):
+            columns = np.arange(column_start, min(column_start + chunk_size, num_rows))
+            similarities = normalised[chunk_rows] @ normalised[columns].T
+            similarities[chunk_rows[:, None] == columns[None, :]] = -np.inf
+            if groups is not None:
+                same_group = groups[chunk_rows][:, None] == groups[columns][None, :]
+                similarities[same_group] = -np.inf
+
+            # Merge the block into the k most similar rows found so far
+            candidate_similarities = np.concatenate(
+                [best_similarities, similarities], axis=1
+            )
+            candidate_neighbours = np.concatenate(
+                [best_neighbours, np.broadcast_to(columns, similarities.shape)], axis=1
+            )
+            top = np.argpartition(-candidate_similarities, k - 1, axis=1)[:, :k]
+            best_similarities = np.take_along_axis(candidate_similarities, top, axis=1)
+            best_neighbours = np.take_along_axis(candidate_neighbours, top, axis=1)
+
+        # Rows with fewer than k eligible neighbours are only paired with those
+        eligible = np.isfinite(best_similarities)
+        rows.append(np.repeat(chunk_rows, k)[eligible.ravel()])
+        neighbours.append(best_neighbours[eligible])
+
+    return np.concatenate(rows), np.concatenate(neighbours)
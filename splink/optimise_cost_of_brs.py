@@ -1,8 +1,6 @@
 import logging
 from random import randint
 
-import pandas as pd
-
 from .cost_of_blocking_rules import calculate_cost_of_combination_of_brs
 
 logger = logging.getLogger(__name__)
@@ -195,6 +193,8 @@ def suggest_blocking_rules(
         )
         results.append(cost_dict)
 
+    import pandas as pd
+
     results_df = pd.DataFrame(results)
     # easier to read if we normalise the cost so the best is 0
     min_ = results_df["field_freedom_cost"].min()
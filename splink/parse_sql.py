@@ -5,11 +5,12 @@ import sqlglot.expressions as exp
 from sqlglot.expressions import Bracket, Column, Lambda
 
 from .sql_transform import remove_quotes_from_identifiers
+from .sqlglot_cache import parse_one
 
 
 def get_columns_used_from_sql(sql, dialect=None, retain_table_prefix=False):
     column_names = set()
-    syntax_tree = sqlglot.parse_one(sql, read=dialect)
+    syntax_tree = parse_one(sql, read=dialect)
 
     for subtree in syntax_tree.find_all(exp.Column):
         # check if any parents are lambdas
@@ -58,7 +59,7 @@ def parse_columns_in_sql(
             be returned.
     """
     try:
-        syntax_tree = sqlglot.parse_one(sql, read=sql_dialect)
+        syntax_tree = parse_one(sql, read=sql_dialect)
     except Exception:  # Consider catching a more specific exception if possible
         # If we can't parse a SQL condition, it's better to just pass.
         return None
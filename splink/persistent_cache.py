@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+
+# Intermediate tables which are expensive to compute and re-used by many later
+# stages, so are worth storing on disk.  Final outputs, such as the predictions,
+# are large and rarely read back by a later session, so are not stored by default.
+REUSABLE_TABLE_PREFIXES = (
+    "__splink__df_concat",
+    "__splink__df_tf_",
+)
+
+
+def is_reusable_intermediate_table(templated_name: str) -> bool:
+    """Whether the table is one of the intermediate tables which the persistent
+    cache stores by default"""
+    return templated_name.startswith(REUSABLE_TABLE_PREFIXES)
+
+
+def _path_size_bytes(path: Path) -> int:
+    # Some backends (e.g. Spark) write parquet as a directory of part files
+    if path.is_dir():
+        return sum(
+            os.path.getsize(os.path.join(root, f))
+            for root, _, files in os.walk(path)
+            for f in files
+        )
+    return path.stat().st_size
+
+
+class PersistentResultCache:
+    """An on-disk store of the results of Splink SQL pipelines, which persists
+    across Python sessions.
+
+    Results are written as parquet files to `cache_dir`, alongside a json manifest
+    which records, for each entry, the templated name, physical table name,
+    size on disk and when it was last accessed.
+
+    Entries are keyed by a hash of the SQL used to create the table plus a
+    fingerprint of the input data, so a result is only re-used if both the
+    SQL and the data that fed it are unchanged.
+
+    When the total size of the cache exceeds `max_size_bytes`, the least recently
+    used entries are evicted.
+
+    Only tables for which `should_store(templated_name)` is true are stored, by
+    default the reusable intermediate tables such as term frequency tables.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        max_size_bytes: int = None,
+        should_store: Callable[[str], bool] = None,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_bytes
+        if should_store is None:
+            should_store = is_reusable_intermediate_table
+        self.should_store = should_store
+        self._manifest = self._read_manifest()
+
+    @property
+    def _manifest_path(self) -> Path:
+        return self.cache_dir / MANIFEST_FILENAME
+
+    def _read_manifest(self) -> dict:
+        if not self._manifest_path.exists():
+            return {}
+        try:
+            with open(self._manifest_path) as f:
+                manifest = json.load(f)
+        except json.JSONDecodeError:
+            logger.warning(
+                f"Persistent cache manifest at {self._manifest_path} is corrupt. "
+                "Starting with an empty cache."
+            )
+            return {}
+
+        # Discard entries whose files have been removed from outside Splink
+        return {
+            key: entry
+            for key, entry in manifest.items()
+            if (self.cache_dir / entry["filename"]).exists()
+        }
+
+    def _write_manifest(self):
+        tmp_path = self._manifest_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(tmp_path, self._manifest_path)
+
+    def __contains__(self, key) -> bool:
+        return key in self._manifest
+
+    def __len__(self) -> int:
+        return len(self._manifest)
+
+    @property
+    def total_size_bytes(self) -> int:
+        return sum(entry["size_bytes"] for entry in self._manifest.values())
+
+    def filepath_for_key(self, key) -> str:
+        return str(self.cache_dir / f"{key}.parquet")
+
+    def get_filepath(self, key) -> str:
+        """Return the filepath of the cached result, marking it as recently used"""
+        entry = self._manifest[key]
+        entry["last_accessed"] = time.time()
+        self._write_manifest()
+        return str(self.cache_dir / entry["filename"])
+
+    def record(self, key, templated_name, physical_name):
+        """Add an entry to the manifest for a parquet file that has been written
+        to `filepath_for_key(key)`, then evict entries if the cache is too large.
+        """
+        filename = f"{key}.parquet"
+        size_bytes = _path_size_bytes(self.cache_dir / filename)
+        now = time.time()
+        self._manifest[key] = {
+            "filename": filename,
+            "templated_name": templated_name,
+            "physical_name": physical_name,
+            "size_bytes": size_bytes,
+            "created": now,
+            "last_accessed": now,
+        }
+        logger.debug(
+            f"Stored {templated_name} ({physical_name}) in persistent cache "
+            f"using {size_bytes:,} bytes"
+        )
+        self._evict_if_needed(protected_key=key)
+        self._write_manifest()
+
+    def _remove_entry(self, key):
+        entry = self._manifest.pop(key)
+        path = self.cache_dir / entry["filename"]
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        elif path.exists():
+            path.unlink()
+
+    def _evict_if_needed(self, protected_key=None):
+        if self.max_size_bytes is None:
+            return
+
+        by_last_accessed = sorted(
+            self._manifest.items(), key=lambda kv: kv[1]["last_accessed"]
+        )
+        for key, entry in by_last_accessed:
+            if self.total_size_bytes <= self.max_size_bytes:
+                break
+            # Never evict the entry we've just written, even if it alone
+            # exceeds the budget
+            if key == protected_key:
+                continue
+            logger.debug(
+                f"Evicting {entry['templated_name']} ({entry['physical_name']}) "
+                "from persistent cache"
+            )
+            self._remove_entry(key)
+
+    def clear(self):
+        """Remove all entries from the persistent cache"""
+        for key in list(self._manifest.keys()):
+            self._remove_entry(key)
+        self._write_manifest()
@@ -1,24 +1,44 @@
 import logging
+import re
 from copy import deepcopy
 
-import sqlglot
 from sqlglot.errors import ParseError
 from sqlglot.expressions import Table
 
+from .execution_hooks import ExecutionHooks
+from .sqlglot_cache import parse_one
+
 logger = logging.getLogger(__name__)
 
 
+# Operations which make a step expensive enough that we would rather not
+# evaluate it more than once
+_COSTLY_OPERATIONS = {
+    "join": re.compile(r"\bjoin\b", re.IGNORECASE),
+    "group by": re.compile(r"\bgroup\s+by\b", re.IGNORECASE),
+    "window": re.compile(r"\bover\s*\(", re.IGNORECASE),
+    "distinct": re.compile(r"\bdistinct\b", re.IGNORECASE),
+}
+
+
 class SQLTask:
     def __init__(
-        self, sql, output_table_name, translates_physical_into_templated=False
+        self,
+        sql,
+        output_table_name,
+        translates_physical_into_templated=False,
+        materialise=None,
     ):
         self.sql = sql
         self.output_table_name = output_table_name
+        self.translates_physical_into_templated = translates_physical_into_templated
+        # None means 'let the pipeline decide'
+        self.materialise = materialise
 
     @property
     def _uses_tables(self):
         try:
-            tree = sqlglot.parse_one(self.sql, read=None)
+            tree = parse_one(self.sql, read=None)
         except ParseError:
             return ["Failure to parse SQL - tablenames not known"]
 
@@ -34,13 +54,52 @@ class SQLTask:
             f" and has output table name: {self.output_table_name}"
         )
 
+    def _count_references_to(self, table_name):
+        # Splink table names consist of word characters, so a word boundary
+        # distinguishes e.g. __splink__df_concat from __splink__df_concat_with_tf
+        return len(re.findall(rf"\b{re.escape(table_name)}\b", self.sql))
+
+    @property
+    def _estimated_cost(self):
+        """A crude estimate of the cost of evaluating this step, being one plus
+        the number of expensive operations it contains"""
+        return 1 + sum(len(r.findall(self.sql)) for r in _COSTLY_OPERATIONS.values())
+
 
 class SQLPipeline:
-    def __init__(self):
+    def __init__(
+        self, reference_count_threshold=None, cost_threshold=None, execution_hooks=None
+    ):
+        """A queue of SQL steps that are executed as a single statement, with
+        each step but the last becoming a CTE.
+
+        Args:
+            reference_count_threshold (int, optional): Steps referenced at least
+                this many times by later steps are materialised as a table,
+                rather than potentially being evaluated several times by the
+                database.  Steps without any expensive operations (joins,
+                aggregations etc.) are cheap to re-evaluate, so are excluded.
+                Defaults to None, meaning steps are not materialised on the basis
+                of how often they are referenced.
+            cost_threshold (int, optional): Steps whose `_estimated_cost` is at
+                least this value are materialised regardless of how many times
+                they are referenced.  Defaults to None, meaning steps are never
+                materialised on the basis of their cost alone.
+            execution_hooks (ExecutionHooks, optional): The hooks to fire around the
+                pipeline's final statement, so that several pipelines can share
+                them.  Defaults to a new, empty set of hooks.
+        """
         self.queue = []
-
-    def enqueue_sql(self, sql, output_table_name):
-        sql_task = SQLTask(sql, output_table_name)
+        self.reference_count_threshold = reference_count_threshold
+        self.cost_threshold = cost_threshold
+        # Callbacks fired around the pipeline's final statement, including when its
+        # result is retrieved from the cache
+        if execution_hooks is None:
+            execution_hooks = ExecutionHooks()
+        self.execution_hooks = execution_hooks
+
+    def enqueue_sql(self, sql, output_table_name, materialise=None):
+        sql_task = SQLTask(sql, output_table_name, materialise=materialise)
         self.queue.append(sql_task)
 
     def _generate_pipeline_parts(self, input_dataframes):
@@ -83,6 +142,94 @@ class SQLPipeline:
 
         return final_sql
 
+    def _dependency_graph(self):
+        """For each step in the queue, the names of the earlier steps it reads from,
+        along with the number of times each is referenced
+
+        Returns:
+            dict: e.g. {"c": {"a": 1, "b": 2}} means step c refers to a once, b twice
+        """
+        graph = {}
+        for i, task in enumerate(self.queue):
+            upstream = {}
+            for earlier_task in self.queue[:i]:
+                name = earlier_task.output_table_name
+                n = task._count_references_to(name)
+                if n:
+                    upstream[name] = n
+            graph[task.output_table_name] = upstream
+        return graph
+
+    def _reference_counts(self):
+        """The total number of references to each step from later steps"""
+        counts = {task.output_table_name: 0 for task in self.queue}
+        for upstream in self._dependency_graph().values():
+            for name, n in upstream.items():
+                counts[name] += n
+        return counts
+
+    def _ancestors(self, output_table_name):
+        graph = self._dependency_graph()
+        ancestors = set()
+        to_visit = list(graph[output_table_name])
+        while to_visit:
+            name = to_visit.pop()
+            if name not in ancestors:
+                ancestors.add(name)
+                to_visit.extend(graph[name])
+        return ancestors
+
+    def _next_task_to_materialise(self):
+        """Return the earliest step (other than the final step) which should be
+        materialised as a table, or None"""
+        reference_counts = self._reference_counts()
+
+        for task in self.queue[:-1]:
+            name = task.output_table_name
+            if task.materialise is not None:
+                decision = task.materialise
+                reason = "as requested"
+            elif (
+                self.reference_count_threshold is not None
+                and reference_counts[name] >= self.reference_count_threshold
+                and task._estimated_cost > 1
+            ):
+                decision = True
+                reason = f"as it is referenced {reference_counts[name]} times"
+            elif (
+                self.cost_threshold is not None
+                and task._estimated_cost >= self.cost_threshold
+            ):
+                decision = True
+                reason = f"as its estimated cost is {task._estimated_cost}"
+            else:
+                decision = False
+
+            if decision and reference_counts[name] > 0:
+                logger.debug(f"Materialising pipeline step {name} {reason}")
+                return task
+        return None
+
+    def _split_off_task(self, task):
+        """Remove `task` and the steps needed only to compute it from the queue,
+        returning a new pipeline which computes `task`"""
+        name = task.output_table_name
+        ancestors = self._ancestors(name)
+
+        split_pipeline = SQLPipeline(execution_hooks=self.execution_hooks)
+        split_pipeline.queue = [
+            t for t in self.queue if t.output_table_name in ancestors
+        ] + [task]
+
+        self.queue = [t for t in self.queue if t is not task]
+
+        # Steps that fed `task` may still be needed by later steps
+        final_name = self.queue[-1].output_table_name
+        still_needed = self._ancestors(final_name) | {final_name}
+        self.queue = [t for t in self.queue if t.output_table_name in still_needed]
+
+        return split_pipeline
+
     def _scan_pipeline_for_tables(self, table):
         queued_tables = [pipe.output_table_name for pipe in self._pipeline.queue]
         return table in queued_tables
@@ -63,6 +63,16 @@ class PostgresDataFrame(SplinkDataFrame):
         self._check_drop_table_created_by_splink(force_non_splink_table)
         self.linker._delete_table_from_database(self.physical_name)
 
+    def _row_count(self):
+        sql = f"SELECT COUNT(*) AS row_count FROM {self.physical_name};"
+        res = self.linker._run_sql_execution(sql).mappings().all()
+        return res[0]["row_count"]
+
+    def _estimated_size_bytes(self):
+        sql = f"SELECT pg_total_relation_size('{self.physical_name}') AS size_bytes;"
+        res = self.linker._run_sql_execution(sql).mappings().all()
+        return res[0]["size_bytes"]
+
     def as_record_dict(self, limit=None):
         sql = f"""
         SELECT *
@@ -74,6 +84,15 @@ class PostgresDataFrame(SplinkDataFrame):
         res = self.linker._run_sql_execution(sql).mappings().all()
         return [dict(r) for r in res]
 
+    def _iter_record_chunks(self, batch_size):
+        # stream_results uses a server-side cursor, so rows are fetched from the
+        # database in batches rather than all at once
+        sql = f"SELECT * FROM {self.physical_name}"
+        with self.linker._engine.connect() as con:
+            res = con.execution_options(stream_results=True).execute(text(sql))
+            for partition in res.mappings().partitions(batch_size):
+                yield [dict(r) for r in partition]
+
 
 class PostgresLinker(Linker):
     def __init__(
@@ -203,6 +222,15 @@ class PostgresLinker(Linker):
     def _infinity_expression(self):
         return "'infinity'"
 
+    @property
+    def _supports_concurrent_execution(self):
+        # Each statement is executed on its own connection from the engine's pool
+        return True
+
+    def _explain_analyze(self, sql):
+        res = self._run_sql_execution(f"EXPLAIN ANALYZE {sql}").fetchall()
+        return "\n".join(r[0] for r in res)
+
     def _table_exists_in_database(self, table_name):
         sql = f"""
         SELECT table_name
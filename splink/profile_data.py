@@ -250,21 +250,26 @@ def profile_columns(linker, column_expressions=None, top_n=10, bottom_n=10):
     linker._enqueue_sql(sql, "__splink__df_all_column_value_frequencies")
     df_raw = linker._execute_sql_pipeline(input_dataframes)
 
+    # The percentiles, top n and bottom n are each computed from df_raw
+    # independently, so can be executed concurrently
+    percentiles_pipeline = linker._new_pipeline()
     sqls = _get_df_percentiles()
     for sql in sqls:
-        linker._enqueue_sql(sql["sql"], sql["output_table_name"])
-
-    df_percentiles = linker._execute_sql_pipeline([df_raw])
-    percentile_rows_all = df_percentiles.as_record_dict()
+        percentiles_pipeline.enqueue_sql(sql["sql"], sql["output_table_name"])
 
+    top_n_pipeline = linker._new_pipeline()
     sql = _get_df_top_bottom_n(column_expressions, top_n, "desc")
-    linker._enqueue_sql(sql, "__splink__df_top_n")
-    df_top_n = linker._execute_sql_pipeline([df_raw])
-    top_n_rows_all = df_top_n.as_record_dict()
+    top_n_pipeline.enqueue_sql(sql, "__splink__df_top_n")
 
+    bottom_n_pipeline = linker._new_pipeline()
     sql = _get_df_top_bottom_n(column_expressions, bottom_n, "asc")
-    linker._enqueue_sql(sql, "__splink__df_bottom_n")
-    df_bottom_n = linker._execute_sql_pipeline([df_raw])
+    bottom_n_pipeline.enqueue_sql(sql, "__splink__df_bottom_n")
+
+    df_percentiles, df_top_n, df_bottom_n = linker._execute_sql_pipelines_concurrently(
+        [percentiles_pipeline, top_n_pipeline, bottom_n_pipeline], [df_raw]
+    )
+    percentile_rows_all = df_percentiles.as_record_dict()
+    top_n_rows_all = df_top_n.as_record_dict()
     bottom_n_rows_all = df_bottom_n.as_record_dict()
 
     inner_charts = []
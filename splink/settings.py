@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 from copy import deepcopy
+from functools import wraps
 from typing import List
 
 from .blocking import BlockingRule, SaltedBlockingRule, blocking_rule_to_obj
@@ -17,12 +18,31 @@ from .validate_jsonschema import validate_settings_against_schema
 logger = logging.getLogger(__name__)
 
 
+def _memoise_on_settings_state(method):
+    """Memoise a property of Settings which generates SQL fragments, recomputing it
+    only when the settings or model parameters it depends upon have changed"""
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self):
+        state = self._sql_fragment_state_key()
+        memoised = self._memoised_sql_fragments.get(name)
+        if memoised is None or memoised[0] != state:
+            memoised = (state, method(self))
+            self._memoised_sql_fragments[name] = memoised
+        # Return a new list so callers can't modify the memoised value
+        return list(memoised[1])
+
+    return wrapper
+
+
 class Settings:
     """The settings object contains the configuration and parameters of the data
     linking model"""
 
     def __init__(self, settings_dict):
         settings_dict = deepcopy(settings_dict)
+        self._memoised_sql_fragments = {}
 
         # If incoming comparisons are of type Comparison not dict, turn back into dict
         if "comparisons" in settings_dict:
@@ -190,6 +210,16 @@ class Settings:
             cols.update(cc._tf_adjustment_input_col_names)
         return [InputColumn(c, settings_obj=self) for c in list(cols)]
 
+    @property
+    def _precomputed_columns(self) -> dict:
+        """The columns computed once per record for the comparison levels, as a
+        dict of column name to SQL"""
+        cols = {}
+        for cc in self.comparisons:
+            for cl in cc.comparison_levels:
+                cols.update(cl._precomputed_columns)
+        return cols
+
     @property
     def _needs_matchkey_column(self) -> bool:
         """Where multiple `blocking_rules_to_generate_predictions` are specified,
@@ -201,6 +231,43 @@ class Settings:
 
         return len(self._blocking_rules_to_generate_predictions) > 1
 
+    def _sql_fragment_state_key(self):
+        """A key which changes whenever anything used to generate the SQL fragments
+        in `_columns_to_select_*` changes, including the model parameters"""
+        return (
+            self._sql_dialect,
+            self._link_type,
+            self._unique_id_column_name,
+            self._source_dataset_column_name,
+            self._retain_matching_columns,
+            self._retain_intermediate_calculation_columns,
+            self._training_mode,
+            self._needs_matchkey_column,
+            tuple(self._additional_columns_to_retain_list or ()),
+            self._gamma_prefix,
+            self._bf_prefix,
+            self._tf_prefix,
+            tuple(
+                (
+                    cc,
+                    cc._output_column_name,
+                    tuple(
+                        (
+                            cl,
+                            cl._sql_condition,
+                            cl._comparison_vector_value,
+                            cl._m_probability,
+                            cl._u_probability,
+                            cl._tf_adjustment_weight,
+                            cl._tf_minimum_u_value,
+                        )
+                        for cl in cc.comparison_levels
+                    ),
+                )
+                for cc in self.comparisons
+            ),
+        )
+
     @property
     def _columns_used_by_comparisons(self):
         cols_used = []
@@ -215,6 +282,7 @@ class Settings:
         return dedupe_preserving_order(cols_used)
 
     @property
+    @_memoise_on_settings_state
     def _columns_to_select_for_blocking(self):
         cols = []
 
@@ -231,6 +299,7 @@ class Settings:
         return dedupe_preserving_order(cols)
 
     @property
+    @_memoise_on_settings_state
     def _columns_to_select_for_comparison_vector_values(self):
         cols = []
 
@@ -251,6 +320,7 @@ class Settings:
         return cols
 
     @property
+    @_memoise_on_settings_state
     def _columns_to_select_for_bayes_factor_parts(self):
         cols = []
 
@@ -271,6 +341,7 @@ class Settings:
         return cols
 
     @property
+    @_memoise_on_settings_state
     def _columns_to_select_for_predict(self):
         cols = []
 
@@ -366,17 +437,25 @@ class Settings:
                 r["comparison_sort_order"] = i
             output.extend(records)
 
+        # Finally add a record for probability_two_random_records_match
+        prop_record = self._prior_as_detailed_record(
+            self._probability_two_random_records_match
+        )
+        output.insert(0, prop_record)
+        return output
+
+    def _prior_as_detailed_record(self, rr_match):
+        """The record for probability_two_random_records_match in
+        `_parameters_as_detailed_records`, evaluated at the given probability"""
         prior_description = (
             "The probability that two random records drawn at random match is "
-            f"{self._probability_two_random_records_match:.3f} or one in "
-            f" {1/self._probability_two_random_records_match:,.1f} records."
+            f"{rr_match:.3f} or one in "
+            f" {1/rr_match:,.1f} records."
             "This is equivalent to a starting match weight of "
-            f"{prob_to_match_weight(self._probability_two_random_records_match):.3f}."
+            f"{prob_to_match_weight(rr_match):.3f}."
         )
 
-        # Finally add a record for probability_two_random_records_match
-        rr_match = self._probability_two_random_records_match
-        prop_record = {
+        return {
             "comparison_name": "probability_two_random_records_match",
             "sql_condition": None,
             "label_for_charts": "",
@@ -388,20 +467,14 @@ class Settings:
             "tf_adjustment_column": None,
             "tf_adjustment_weight": None,
             "is_null_level": False,
-            "bayes_factor": prob_to_bayes_factor(
-                self._probability_two_random_records_match
-            ),
-            "log2_bayes_factor": prob_to_match_weight(
-                self._probability_two_random_records_match
-            ),
+            "bayes_factor": prob_to_bayes_factor(rr_match),
+            "log2_bayes_factor": prob_to_match_weight(rr_match),
             "comparison_vector_value": 0,
             "max_comparison_vector_value": 0,
             "bayes_factor_description": prior_description,
             "probability_two_random_records_match": rr_match,
             "comparison_sort_order": -1,
         }
-        output.insert(0, prop_record)
-        return output
 
     @property
     def _parameter_estimates_as_records(self):
@@ -150,8 +150,10 @@ def check_comparison_for_missing_or_invalid_sql_strings(
     invalid_column_tracker = []
     for comparison in comparisons_to_check:
         comp_dict = comparison.as_dict()
+        # Columns precomputed from the input columns are checked as the
+        # expressions which compute them
         comparison_level_sql_strings = [
-            cl["sql_condition"] for cl in comp_dict["comparison_levels"]
+            cl._sql_condition_of_input_columns for cl in comparison.comparison_levels
         ]
 
         invalid_comparison_levels = check_for_missing_or_invalid_columns_in_sql_strings(
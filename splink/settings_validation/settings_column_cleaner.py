@@ -9,6 +9,7 @@ from typing import TYPE_CHECKING, List
 
 import sqlglot
 
+from ..blocking import DerivedKeysBlockingRule, EmbeddingNearestNeighbourBlockingRule
 from ..input_column import InputColumn
 
 logger = logging.getLogger(__name__)
@@ -123,7 +124,20 @@ class SettingsColumnCleaner:
     @property
     def blocking_rules(self):
         brs = self._settings_obj._blocking_rules_to_generate_predictions
-        return [br.blocking_rule_sql for br in brs]
+        # Some blocking rules join on a column of keys Splink computes from an
+        # input column, so it is the input column which must exist
+        blocking_rules = []
+        for br in brs:
+            if isinstance(br, DerivedKeysBlockingRule):
+                column = InputColumn(br.source_column).name
+                blocking_rules.append(f"l.{column} = r.{column}")
+            elif isinstance(br, EmbeddingNearestNeighbourBlockingRule):
+                column = InputColumn(br.embedding_column).name
+                blocking_rules.append(f"l.{column} = r.{column}")
+                blocking_rules.append(br.blocking_rule_sql)
+            else:
+                blocking_rules.append(br.blocking_rule_sql)
+        return blocking_rules
 
     @property
     def comparisons(self):
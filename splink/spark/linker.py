@@ -4,10 +4,11 @@ import logging
 import math
 import os
 import re
-from itertools import compress
+import uuid
+from contextlib import contextmanager
+from itertools import compress, islice
 
 import pandas as pd
-import sqlglot
 from numpy import nan
 from pyspark.sql.dataframe import DataFrame as spark_df
 from pyspark.sql.utils import AnalysisException
@@ -16,7 +17,8 @@ from ..databricks.enable_splink import enable_splink
 from ..input_column import InputColumn
 from ..linker import Linker
 from ..misc import ensure_is_list, major_minor_version_greater_equal_than
-from ..splink_dataframe import SplinkDataFrame
+from ..splink_dataframe import SplinkDataFrame, _import_pyarrow
+from ..sqlglot_cache import transpile
 from ..term_frequencies import colname_to_tf_tablename
 from .jar_location import get_scala_udfs
 from .spark_helpers.custom_spark_dialect import Dialect
@@ -26,6 +28,16 @@ logger = logging.getLogger(__name__)
 Dialect["customspark"]
 
 
+def _clear_job_group(spark_context):
+    """Undo `setJobGroup` for the current thread"""
+    for key in [
+        "spark.jobGroup.id",
+        "spark.job.description",
+        "spark.job.interruptOnCancel",
+    ]:
+        spark_context.setLocalProperty(key, None)
+
+
 class SparkDataFrame(SplinkDataFrame):
     linker: SparkLinker
 
@@ -40,6 +52,9 @@ class SparkDataFrame(SplinkDataFrame):
     def validate(self):
         pass
 
+    def _row_count(self):
+        return self.linker.spark.table(self.physical_name).count()
+
     def as_record_dict(self, limit=None):
         sql = f"select * from {self.physical_name}"
         if limit:
@@ -64,6 +79,38 @@ class SparkDataFrame(SplinkDataFrame):
     def as_spark_dataframe(self):
         return self.linker.spark.table(self.physical_name)
 
+    def iter_batches(self, batch_size=100_000):
+        pa = _import_pyarrow()
+        from pyspark.sql.pandas.types import to_arrow_schema
+
+        try:
+            schema = to_arrow_schema(self.as_spark_dataframe().schema)
+        except TypeError:
+            # Types without an Arrow equivalent are inferred from the values instead
+            yield from super().iter_batches(batch_size)
+            return
+
+        # Rows hold timestamps as naive datetimes in the session's local time, as
+        # returned by as_pandas_dataframe(), rather than in UTC
+        schema = pa.schema(
+            [
+                field.with_type(pa.timestamp(field.type.unit))
+                if pa.types.is_timestamp(field.type)
+                else field
+                for field in schema
+            ]
+        )
+        for records in self._iter_record_chunks(batch_size):
+            yield pa.RecordBatch.from_pylist(records, schema=schema)
+
+    def _iter_record_chunks(self, batch_size):
+        # toLocalIterator retrieves a single partition at a time to the driver
+        rows = self.as_spark_dataframe().toLocalIterator(prefetchPartitions=True)
+        chunk = list(islice(rows, batch_size))
+        while chunk:
+            yield [row.asDict(recursive=True) for row in chunk]
+            chunk = list(islice(rows, batch_size))
+
     def to_parquet(self, filepath, overwrite=False):
         if not overwrite:
             self.check_file_exists(filepath)
@@ -144,6 +191,9 @@ class SparkLinker(Linker):
 
         self.repartition_after_blocking = repartition_after_blocking
 
+        # The job group of the cancellable operation currently running, if any
+        self._spark_job_group = None
+
         input_tables = ensure_is_list(input_table_or_tables)
 
         input_aliases = self._ensure_aliases_populated_and_is_list(
@@ -396,7 +446,7 @@ class SparkLinker(Linker):
         return spark_df
 
     def _execute_sql_against_backend(self, sql, templated_name, physical_name):
-        sql = sqlglot.transpile(sql, read="spark", write="customspark", pretty=True)[0]
+        sql = transpile(sql, read="spark", write="customspark", pretty=True)
         spark_df = self._log_and_run_sql_execution(sql, templated_name, physical_name)
         spark_df = self._break_lineage_and_repartition(
             spark_df, templated_name, physical_name
@@ -412,10 +462,63 @@ class SparkLinker(Linker):
     def _run_sql_execution(self, final_sql, templated_name, physical_name):
         return self.spark.sql(final_sql)
 
+    def _hash_sql(self, sql_expressions):
+        return f"xxhash64({', '.join(sql_expressions)})"
+
     @property
     def _infinity_expression(self):
         return "'infinity'"
 
+    @property
+    def _supports_concurrent_execution(self):
+        # The SparkSession is thread safe, and jobs submitted from separate
+        # threads are scheduled concurrently
+        return True
+
+    @contextmanager
+    def _worker_thread_context(self):
+        # Job groups are set per thread, so jobs submitted by worker threads must be
+        # tagged with the job group of the operation explicitly.  Worker threads are
+        # reused, so the job group is cleared afterwards
+        job_group = self._spark_job_group
+        if job_group is None:
+            yield
+            return
+        spark_context = self.spark.sparkContext
+        spark_context.setJobGroup(job_group, "Splink", interruptOnCancel=True)
+        try:
+            yield
+        finally:
+            _clear_job_group(spark_context)
+
+    @contextmanager
+    def _cancellable_execution_context(self):
+        # Tag the jobs submitted by the operation, so they can be cancelled together
+        job_group = f"splink_{uuid.uuid4().hex}"
+        spark_context = self.spark.sparkContext
+        spark_context.setJobGroup(job_group, "Splink", interruptOnCancel=True)
+        self._spark_job_group = job_group
+        try:
+            yield
+        finally:
+            self._spark_job_group = None
+            _clear_job_group(spark_context)
+
+    def _interrupt_execution(self):
+        job_group = self._spark_job_group
+        if job_group is not None:
+            self.spark.sparkContext.cancelJobGroup(job_group)
+
+    def _read_parquet_sql(self, filepath):
+        return f"select * from parquet.`{filepath}`"
+
+    def _input_table_fingerprint_sql(self, physical_name):
+        return f"""
+        select count(*) as row_count,
+        sum(cast(xxhash64(*) as decimal(38, 0))) as checksum
+        from {physical_name}
+        """
+
     def register_table(self, input, table_name, overwrite=False):
         """
         Register a table to your backend database, to be used in one of the
@@ -541,6 +644,47 @@ class SparkLinker(Linker):
                         are cleaned to remove bad dates \n"""
                     )
 
+    def _shingles_sql(self, column_sql, shingle_type, shingle_size):
+        if shingle_type == "token":
+            return f"filter(split({column_sql}, '\\\\s+'), t -> t != '')"
+        q = shingle_size
+        # Strings shorter than q have a single shingle, the string itself
+        return (
+            f"transform(sequence(1, greatest(length({column_sql}) - {q} + 1, 1)), "
+            f"i -> substring({column_sql}, i, {q}))"
+        )
+
+    def _minhash_band_keys_sql(self, shingles_sql, bands, rows):
+        # The shingles and the signature are each bound to a lambda parameter by an
+        # array of one element, so are computed once per record
+        signature = (
+            f"transform(sequence(0, {bands * rows - 1}), "
+            "p -> array_min(transform(sh, s -> xxhash64(s, p))))"
+        )
+        band_key = self._hash_sql(
+            ["b"] + [f"sig[b * {rows} + {row}]" for row in range(rows)]
+        )
+        band_keys = f"transform(sequence(0, {bands - 1}), b -> {band_key})"
+        return (
+            f"transform(array({shingles_sql}), sh -> "
+            f"transform(array({signature}), sig -> {band_keys})[0])[0]"
+        )
+
+    def _deletion_neighbourhood_sql(self, column_sql, max_deletions):
+        neighbourhood = f"array({column_sql})"
+        for d in range(max_deletions):
+            # Each string, and each string with one character deleted
+            deletions = (
+                f"transform(sequence(1, greatest(length(v{d}), 1)), "
+                f"i{d} -> concat(substring(v{d}, 1, i{d} - 1), "
+                f"substring(v{d}, i{d} + 1)))"
+            )
+            neighbourhood = (
+                f"array_distinct(flatten(transform({neighbourhood}, "
+                f"v{d} -> concat(array(v{d}), {deletions}))))"
+            )
+        return neighbourhood
+
     def _explode_arrays_sql(
         self, tbl_name, columns_to_explode, other_columns_to_retain
     ):
@@ -2,15 +2,36 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterator
+
+from .exceptions import MissingDependencyException
 
 logger = logging.getLogger(__name__)
 
 # https://stackoverflow.com/questions/39740632/python-type-hinting-without-cyclic-imports
 if TYPE_CHECKING:
+    import pyarrow as pa
+
     from .linker import Linker
 
 
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise MissingDependencyException(
+            "You need to install the 'pyarrow' package to retrieve results as Arrow "
+            "record batches."
+        ) from None
+    return pa
+
+
+def _cast_record_batch(batch: pa.RecordBatch, schema: pa.Schema) -> pa.RecordBatch:
+    pa = _import_pyarrow()
+    columns = [batch.column(field.name).cast(field.type) for field in schema]
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
 class SplinkDataFrame:
     """Abstraction over dataframe to handle basic operations like retrieving data and
     retrieving column names, which need different implementations depending on whether
@@ -45,6 +66,16 @@ class SplinkDataFrame:
     def validate(self):
         pass
 
+    def _row_count(self) -> int | None:
+        """The number of rows in the table, or None if the backend cannot cheaply
+        report it"""
+        return None
+
+    def _estimated_size_bytes(self) -> int | None:
+        """An estimate of the memory or storage used by the table, or None if the
+        backend cannot report it"""
+        return None
+
     @property
     def physical_and_template_names_equal(self):
         return self.templated_name == self.physical_name
@@ -132,6 +163,60 @@ class SplinkDataFrame:
 
         return pd.DataFrame(self.as_record_dict(limit=limit))
 
+    def iter_batches(self, batch_size: int = 100_000) -> Iterator[pa.RecordBatch]:
+        """Iterate over the rows of the dataframe as Arrow record batches, streaming
+        them from the database rather than retrieving the whole table at once.
+
+        Use this to process results, such as the output of `linker.predict()`, which
+        are too large to fit in memory.  Requires `pyarrow`.
+
+        All the batches have the same schema.  On backends which return rows as
+        Python values, the Arrow types are inferred from the values, so batches are
+        held back until every column has had a non-null value.
+
+        Examples:
+            ```py
+            df_predict = linker.predict()
+            for batch in df_predict.iter_batches(batch_size=50_000):
+                sink.write(batch)
+            ```
+        Args:
+            batch_size (int, optional): The maximum number of rows in each batch.
+                Defaults to 100,000.
+
+        Yields:
+            pyarrow.RecordBatch: The next batch of rows
+        """
+        pa = _import_pyarrow()
+
+        # The Arrow types are inferred from the values, so batches are held back
+        # until every column has a non-null value.  All the batches then share the
+        # schema of the first, rather than a column of nulls having the null type
+        schema = None
+        pending = []
+        for records in self._iter_record_chunks(batch_size):
+            if schema is not None:
+                yield pa.RecordBatch.from_pylist(records, schema=schema)
+                continue
+
+            pending.append(pa.RecordBatch.from_pylist(records))
+            inferred = pa.unify_schemas([batch.schema for batch in pending])
+            if not any(pa.types.is_null(field.type) for field in inferred):
+                schema = inferred
+                yield from (_cast_record_batch(b, schema) for b in pending)
+                pending = []
+
+        if pending:
+            inferred = pa.unify_schemas([batch.schema for batch in pending])
+            yield from (_cast_record_batch(b, inferred) for b in pending)
+
+    def _iter_record_chunks(self, batch_size: int) -> Iterator[list[dict]]:
+        """Iterate over the rows of the dataframe as lists of at most `batch_size`
+        record dictionaries.  Used by `iter_batches()` for backends which cannot
+        stream Arrow data directly, in which case the Arrow types are inferred from
+        the values."""
+        raise NotImplementedError("iter_batches not implemented for this linker")
+
     def _repr_pretty_(self, p, cycle):
         msg = (
             f"Table name in database: `{self.physical_name}`\n"
@@ -1,9 +1,10 @@
-import sqlglot
 import sqlglot.expressions as exp
 
+from .sqlglot_cache import parse_one
+
 
 def sqlglot_transform_sql(sql, func, dialect=None):
-    syntax_tree = sqlglot.parse_one(sql, read=dialect)
+    syntax_tree = parse_one(sql, read=dialect)
     transformed_tree = syntax_tree.transform(func)
     return transformed_tree.sql(dialect)
 
@@ -30,12 +31,12 @@ def _add_l_or_r_to_identifier(node: exp.Expression):
 def _remove_table_prefix(node):
     if isinstance(node, exp.Column):
         n = node.sql().replace(f"{node.table}.", "")
-        return sqlglot.parse_one(n)
+        return parse_one(n)
     return node
 
 
 def move_l_r_table_prefix_to_column_suffix(blocking_rule):
-    expression_tree = sqlglot.parse_one(blocking_rule, read=None)
+    expression_tree = parse_one(blocking_rule, read=None)
     transformed_tree = expression_tree.transform(_add_l_or_r_to_identifier)
     transformed_tree = transformed_tree.transform(_remove_table_prefix)
     return transformed_tree.sql()
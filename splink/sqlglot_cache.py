@@ -0,0 +1,66 @@
+"""Memoised wrappers around sqlglot parsing and transpilation.
+
+Splink parses the same small SQL snippets (comparison level conditions, blocking
+rules, column names) many times, for instance whenever a settings object is
+constructed or SQL is generated.  Parsing is comparatively slow, so results are
+kept in bounded LRU caches keyed by the SQL and dialect.
+
+sqlglot syntax trees are mutable, and callers frequently transform them in
+place, so a copy of the cached tree is returned on every call.  Copying a tree
+is an order of magnitude faster than parsing it.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache, wraps
+
+import sqlglot
+from sqlglot.expressions import Join
+
+SQLGLOT_PARSE_CACHE_SIZE = 4096
+SQLGLOT_TRANSPILE_CACHE_SIZE = 256
+
+
+def _memoise_expression(func):
+    cached_func = lru_cache(maxsize=SQLGLOT_PARSE_CACHE_SIZE)(func)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return cached_func(*args, **kwargs).copy()
+
+    wrapper.cache_info = cached_func.cache_info
+    wrapper.cache_clear = cached_func.cache_clear
+    return wrapper
+
+
+@_memoise_expression
+def parse_one(sql: str, read=None) -> sqlglot.Expression:
+    """Equivalent to `sqlglot.parse_one(sql, read=read)`"""
+    return sqlglot.parse_one(sql, read=read)
+
+
+@_memoise_expression
+def parse_join_condition(condition: str, dialect=None) -> Join:
+    """Parse `condition` as the condition of an `INNER JOIN r` clause"""
+    return sqlglot.parse_one("INNER JOIN r", into=Join).on(condition, dialect=dialect)
+
+
+@lru_cache(maxsize=SQLGLOT_TRANSPILE_CACHE_SIZE)
+def transpile(sql: str, read=None, write=None, pretty=False) -> str:
+    """Equivalent to `sqlglot.transpile(sql, read, write, pretty)[0]`"""
+    return sqlglot.transpile(sql, read=read, write=write, pretty=pretty)[0]
+
+
+def sqlglot_cache_info() -> dict:
+    """Hit and miss statistics for each of the caches"""
+    return {
+        "parse_one": parse_one.cache_info(),
+        "parse_join_condition": parse_join_condition.cache_info(),
+        "transpile": transpile.cache_info(),
+    }
+
+
+def clear_sqlglot_caches():
+    parse_one.cache_clear()
+    parse_join_condition.cache_clear()
+    transpile.cache_clear()
@@ -69,6 +69,11 @@ class SQLiteDataFrame(SplinkDataFrame):
         cur = self.linker.con.cursor()
         cur.execute(drop_sql)
 
+    def _row_count(self):
+        sql = f"select count(*) as row_count from {self.physical_name};"
+        cur = self.linker.con.cursor()
+        return cur.execute(sql).fetchone()["row_count"]
+
     def as_record_dict(self, limit=None):
         sql = f"""
         select *
@@ -80,6 +85,17 @@ class SQLiteDataFrame(SplinkDataFrame):
         cur = self.linker.con.cursor()
         return cur.execute(sql).fetchall()
 
+    def _iter_record_chunks(self, batch_size):
+        cur = self.linker.con.cursor()
+        cur.execute(f"select * from {self.physical_name};")
+        try:
+            records = cur.fetchmany(batch_size)
+            while records:
+                yield records
+                records = cur.fetchmany(batch_size)
+        finally:
+            cur.close()
+
 
 class SQLiteLinker(Linker):
     def __init__(
@@ -120,6 +136,9 @@ class SQLiteLinker(Linker):
             validate_settings=validate_settings,
         )
 
+    def _interrupt_execution(self):
+        self.con.interrupt()
+
     def _table_to_splink_dataframe(self, templated_name, physical_name):
         return SQLiteDataFrame(templated_name, physical_name, self)
 
@@ -206,6 +225,11 @@ class SQLiteLinker(Linker):
     def _infinity_expression(self):
         return "'infinity'"
 
+    @property
+    def _random_salt_expression(self):
+        # SQLite's random() returns a signed 64 bit integer
+        return "(random() / 18446744073709551616.0 + 0.5)"
+
     def _table_exists_in_database(self, table_name):
         sql = f"PRAGMA table_info('{table_name}');"
 
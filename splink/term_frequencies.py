@@ -6,11 +6,11 @@ import logging
 import warnings
 from typing import TYPE_CHECKING
 
-from numpy import arange, ceil, floor, log2
-from pandas import concat, cut
+from sqlglot.expressions import Column, Identifier
 
 from .charts import altair_or_json, load_chart_definition
 from .input_column import InputColumn
+from .sqlglot_cache import parse_one
 
 # https://stackoverflow.com/questions/39740632/python-type-hinting-without-cyclic-imports
 if TYPE_CHECKING:
@@ -56,6 +56,18 @@ def _join_tf_to_input_df_sql(linker: Linker):
         select_cols.append(f"{tbl}.{tf_col}")
 
     select_cols.insert(0, "__splink__df_concat.*")
+
+    # Columns used by comparison levels which are computed once per record,
+    # qualified with the table name, since term frequency tables share column
+    # names with __splink__df_concat
+    for name, sql in settings_obj._precomputed_columns.items():
+        expression = parse_one(sql, read=linker._sql_dialect)
+        for column in expression.find_all(Column):
+            column.set("table", Identifier(this="__splink__df_concat"))
+        col = InputColumn(name, sql_dialect=linker._sql_dialect)
+        select_cols.append(
+            f"{expression.sql(dialect=linker._sql_dialect)} as {col.name}"
+        )
     select_cols_str = ", ".join(select_cols)
 
     templ = "left join {tbl} on __splink__df_concat.{col} = {tbl}.{col}"
@@ -101,7 +113,7 @@ def compute_all_term_frequencies_sqls(linker: Linker) -> list[dict]:
     if not tf_cols:
         return [
             {
-                "sql": "select * from __splink__df_concat",
+                "sql": _join_tf_to_input_df_sql(linker),
                 "output_table_name": "__splink__df_concat_with_tf",
             }
         ]
@@ -164,6 +176,8 @@ def comparison_level_to_tf_chart_data(cl: dict):
     del cl["df_tf"]
     df = df.assign(**cl)
 
+    from numpy import log2
+
     # TF match weight scaled by tf_adjustment_weight
     df.loc[:, "log2_bf_tf"] = (
         log2(df.loc[:, "u_probability"] / df.loc[:, "tf"])
@@ -229,6 +243,9 @@ def tf_adjustment_chart(
         for cl in c
     ]
 
+    from numpy import arange, ceil, floor
+    from pandas import concat, cut
+
     c = [comparison_level_to_tf_chart_data(cl) for cl in c]
     df = concat([cl["df_out"] for cl in c])
     # Filter values
@@ -2,8 +2,6 @@ import json
 import operator
 from functools import lru_cache, reduce
 
-from jsonschema import Draft7Validator
-
 from .misc import read_resource
 
 
@@ -13,6 +11,14 @@ def get_schema():
     return json.loads(read_resource(path))
 
 
+@lru_cache()
+def _settings_validator():
+    # jsonschema is slow to import, so is only imported when settings are validated
+    from jsonschema import Draft7Validator
+
+    return Draft7Validator(get_schema())
+
+
 def get_from_dict(dataDict, mapList):
     return reduce(operator.getitem, mapList, dataDict)
 
@@ -47,9 +53,7 @@ def get_comparison(e, settings_dict):
 def validate_settings_against_schema(settings_dict: dict):
     """Validate a splink settings object against its jsonschema"""
 
-    schema = get_schema()
-
-    v = Draft7Validator(schema)
+    v = _settings_validator()
 
     e = next(v.iter_errors(settings_dict), None)
 
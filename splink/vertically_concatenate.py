@@ -3,6 +3,8 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
+from .blocking import derived_blocking_keys_select_sql
+
 logger = logging.getLogger(__name__)
 
 # https://stackoverflow.com/questions/39740632/python-type-hinting-without-cyclic-imports
@@ -42,7 +44,7 @@ def vertically_concatenate_sql(linker: Linker) -> str:
             linker._settings_obj._source_dataset_column_name_is_required
         )
 
-        salting_reqiured = linker._settings_obj.salting_required
+        salting_reqiured = linker._salting_required
 
     # see https://github.com/duckdb/duckdb/discussions/9710
     # in duckdb to parallelise we need salting
@@ -50,10 +52,14 @@ def vertically_concatenate_sql(linker: Linker) -> str:
         salting_reqiured = True
 
     if salting_reqiured:
-        salt_sql = ", random() as __splink_salt"
+        salt_sql = f", {linker._random_salt_expression} as __splink_salt"
     else:
         salt_sql = ""
 
+    # Keys derived from the records by blocking rules, such as MinHash signatures,
+    # are computed once per record, here, rather than when blocking
+    salt_sql += derived_blocking_keys_select_sql(linker)
+
     if source_dataset_col_req:
         sqls_to_union = []
 
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from splink.duckdb.linker import DuckDBLinker
+
+from .basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+
+def _duckdb_tables(linker):
+    sql = "select table_name from duckdb_tables()"
+    return {r[0] for r in linker._connection.execute(sql).fetchall()}
+
+
+def test_async_methods_match_sync_methods():
+    linker = DuckDBLinker(df, get_settings_dict())
+    expected = linker.predict(threshold_match_probability=0.5).as_pandas_dataframe()
+
+    async def run():
+        linker = DuckDBLinker(df, get_settings_dict())
+        df_predict = await linker.apredict(threshold_match_probability=0.5)
+        df_clusters = await linker.acluster_pairwise_predictions_at_threshold(
+            df_predict, 0.9
+        )
+        return df_predict.as_pandas_dataframe(), df_clusters.as_pandas_dataframe()
+
+    df_predict, df_clusters = asyncio.run(run())
+
+    assert len(df_predict) == len(expected)
+    assert len(df_clusters) == len(df)
+
+
+def test_cancelled_operation_stops_and_drops_its_tables():
+    linker = DuckDBLinker(df, get_settings_dict())
+    tables_before = _duckdb_tables(linker)
+    executed = []
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        task = None
+
+        def cancel_on_second_statement(event):
+            executed.append(event.templated_name)
+            if len(executed) == 2:
+                loop.call_soon_threadsafe(task.cancel)
+                # Wait for the cancellation to be requested before executing
+                deadline = time.time() + 10
+                while not linker._cancellation.cancelled and time.time() < deadline:
+                    time.sleep(0.01)
+
+        linker.execution_hooks.register(before=cancel_on_second_statement)
+        task = asyncio.create_task(linker.apredict())
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    # predict() executes more than two statements when not cancelled
+    assert len(executed) == 2
+    assert _duckdb_tables(linker) == tables_before
+    assert len(linker._intermediate_table_cache) == 0
+    assert linker._cancellation is None
+
+    # The linker can still be used after the cancellation
+    df_predict = linker.predict()
+    assert len(df_predict.as_pandas_dataframe()) > 0
+
+
+def test_cancelling_waiting_operation_does_not_interrupt_running_one():
+    linker = DuckDBLinker(df, get_settings_dict())
+    expected = linker.predict().as_pandas_dataframe()
+
+    linker = DuckDBLinker(df, get_settings_dict())
+    interrupts = []
+    interrupt_execution = linker._interrupt_execution
+
+    def record_interrupt():
+        interrupts.append(linker._cancellation)
+        interrupt_execution()
+
+    linker._interrupt_execution = record_interrupt
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        first_statement_started = asyncio.Event()
+        proceed = threading.Event()
+
+        def pause_first_statement(event):
+            if not first_statement_started.is_set():
+                loop.call_soon_threadsafe(first_statement_started.set)
+                proceed.wait(10)
+
+        linker.execution_hooks.register(before=pause_first_statement)
+        running = asyncio.create_task(linker.apredict())
+        await first_statement_started.wait()
+
+        # The second operation waits for the first to finish, and is cancelled
+        # while waiting
+        waiting = asyncio.create_task(linker.apredict())
+        await asyncio.sleep(0.1)
+        waiting.cancel()
+        await asyncio.sleep(0.1)
+        proceed.set()
+
+        df_predict = await running
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        return df_predict.as_pandas_dataframe()
+
+    df_predict = asyncio.run(run())
+
+    assert interrupts == []
+    assert len(df_predict) == len(expected)
+    assert linker._cancellation is None
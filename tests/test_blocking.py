@@ -1,9 +1,34 @@
-from splink.blocking import BlockingRule, blocking_rule_to_obj
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from splink.blocking import (
+    BlockingRule,
+    EmbeddingNearestNeighbourBlockingRule,
+    GeoGridBlockingRule,
+    LevenshteinBlockingRule,
+    MatchKeyHashes,
+    MinHashLSHBlockingRule,
+    QGramBlockingRule,
+    SortedNeighbourhoodBlockingRule,
+    block_using_rules_sqls,
+    blocking_rule_to_obj,
+    materialise_hot_key_tables,
+)
+from splink.comparison_level_sql import great_circle_distance_km_sql
+from splink.duckdb.linker import DuckDBLinker
+from splink.exceptions import SplinkException
 from splink.input_column import _get_dialect_quotes
+from splink.minhash_lsh import lsh_candidate_probability
+from splink.nearest_neighbours import nearest_neighbours
 from splink.settings import Settings
+from splink.sqlite.linker import SQLiteLinker
 
 from .basic_settings import get_settings_dict
-from .decorator import mark_with_dialects_excluding
+from .decorator import mark_with_dialects_excluding, mark_with_dialects_including
+from .helpers import DuckDBTestHelper
 
 
 @mark_with_dialects_excluding()
@@ -76,3 +101,727 @@ def test_simple_end_to_end(test_helpers, dialect):
     )
 
     linker.predict()
+
+
+def _predict(
+    helper, df, blocking_rules, configure=None, settings=None, deterministic=False
+):
+    """Link `df` using `blocking_rules`, returning the linker and its predictions
+    sorted by pair.  `configure` is called with the linker before predicting"""
+    settings = {
+        **(get_settings_dict() if settings is None else settings),
+        "blocking_rules_to_generate_predictions": blocking_rules,
+    }
+    linker = helper.Linker(
+        helper.convert_frame(df), settings, **helper.extra_linker_args()
+    )
+    if configure is not None:
+        configure(linker)
+    df_predict = linker.deterministic_link() if deterministic else linker.predict()
+    df_predict = df_predict.as_pandas_dataframe()
+    id_columns = [
+        c for c in df_predict.columns if c.startswith(("source_dataset_", "unique_id_"))
+    ]
+    return linker, df_predict.sort_values(id_columns).reset_index(drop=True)
+
+
+def _pairs(df_predict, with_match_key=False):
+    columns = ["unique_id_l", "unique_id_r"] + (["match_key"] if with_match_key else [])
+    pairs = set(zip(*(df_predict[c] for c in columns)))
+    assert len(pairs) == len(df_predict)
+    return pairs
+
+
+def _predicted_pairs(helper, df, blocking_rules, with_match_key=False, **kwargs):
+    _, df_predict = _predict(helper, df, blocking_rules, **kwargs)
+    return _pairs(df_predict, with_match_key)
+
+
+@mark_with_dialects_including("duckdb", "spark", pass_dialect=True)
+def test_hashed_match_keys_deduplication(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    blocking_rules = [
+        "l.first_name = r.surname",
+        "l.surname = r.surname",
+        "substr(l.dob, 1, 4) = substr(r.dob, 1, 4) and l.city = r.city",
+        "levenshtein(l.first_name, r.first_name) < 2",
+        "l.email = r.email",
+    ]
+
+    def predictions(strategy):
+        def configure(linker):
+            linker.set_blocking_deduplication_strategy(strategy)
+
+        return _predict(helper, df, blocking_rules, configure)[1]
+
+    df_evaluate_rules = predictions("evaluate_rules")
+    df_hashed_match_keys = predictions("hashed_match_keys")
+
+    assert not df_evaluate_rules.duplicated(["unique_id_l", "unique_id_r"]).any()
+    pd.testing.assert_frame_equal(df_evaluate_rules, df_hashed_match_keys)
+
+
+def test_hashed_match_keys_sql():
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.first_name = r.surname",
+        "levenshtein(l.first_name, r.first_name) < 2",
+        "l.email = r.email",
+    ]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    linker = DuckDBLinker(df, settings)
+    linker.set_blocking_deduplication_strategy("hashed_match_keys")
+
+    sqls = block_using_rules_sqls(linker)
+    hashes_sql = sqls[0]["sql"]
+    assert sqls[0]["materialise"]
+    assert "__splink__match_key_hash_0_l" in hashes_sql
+    assert "__splink__match_key_hash_0_r" in hashes_sql
+    # Rules without equi-join conditions cannot be hashed, and the final rule is
+    # never a preceding rule
+    assert "__splink__match_key_hash_1" not in hashes_sql
+    assert "__splink__match_key_hash_2" not in hashes_sql
+
+    blocked_sql = sqls[-1]["sql"]
+    assert "l.__splink__match_key_hash_0_l = r.__splink__match_key_hash_0_r" in (
+        blocked_sql
+    )
+
+
+def test_hashed_match_keys_exclude_rules_not_generated_by_their_join():
+    # Each rule has an equi-join condition, but only the first generates its pairs
+    # by the join, so only its join keys can be hashed
+    blocking_rules = [
+        "l.surname = r.surname",
+        {"blocking_rule": "l.city = r.city", "arrays_to_explode": ["postcodes"]},
+        {"sort_key": "dob", "window_size": 3, "blocking_rule": "l.city = r.city"},
+        {"embedding_column": "embedding", "blocking_rule": "l.city = r.city"},
+        {"lat_col": "lat", "long_col": "long", "km_threshold": 5},
+        "l.email = r.email",
+    ]
+    blocking_rules = [blocking_rule_to_obj(br) for br in blocking_rules]
+    match_key_hashes = MatchKeyHashes(None, blocking_rules)
+    assert match_key_hashes.hashed_rules == blocking_rules[:1]
+
+
+def test_hashed_match_keys_not_supported():
+    con = sqlite3.connect(":memory:")
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    df.to_sql("input_df", con)
+    linker = SQLiteLinker("input_df", get_settings_dict(), connection=con)
+    with pytest.raises(SplinkException):
+        linker.set_blocking_deduplication_strategy("hashed_match_keys")
+    with pytest.raises(ValueError):
+        linker.set_blocking_deduplication_strategy("unknown")
+
+
+@pytest.mark.parametrize("link_type", ["dedupe_only", "link_and_dedupe", "link_only"])
+@pytest.mark.parametrize(
+    "deduplication_strategy", ["evaluate_rules", "hashed_match_keys"]
+)
+def test_groupwise_pair_generation(link_type, deduplication_strategy):
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    input_tables = df if link_type == "dedupe_only" else [df[:400], df[400:700], df]
+    settings = {**get_settings_dict(), "link_type": link_type}
+    blocking_rules = [
+        "l.first_name = r.surname",
+        "l.surname = r.surname",
+        "substr(l.dob, 1, 4) = substr(r.dob, 1, 4) and l.city = r.city",
+        "l.email = r.email and levenshtein(l.first_name, r.first_name) < 3",
+    ]
+
+    def predictions(pair_generation_strategy):
+        def configure(linker):
+            linker.set_blocking_deduplication_strategy(deduplication_strategy)
+            linker.set_blocking_pair_generation_strategy(pair_generation_strategy)
+
+        return _predict(
+            DuckDBTestHelper(), input_tables, blocking_rules, configure, settings
+        )[1]
+
+    df_join = predictions("join")
+    df_groupwise = predictions("groupwise")
+    assert len(df_join) > 0
+    pd.testing.assert_frame_equal(df_join, df_groupwise)
+
+
+def test_groupwise_pair_generation_sql():
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.first_name = r.surname",
+        "l.surname = r.surname",
+    ]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    linker = DuckDBLinker(df, settings)
+    linker.set_blocking_pair_generation_strategy("groupwise")
+    blocked_sql = block_using_rules_sqls(linker)[-1]["sql"]
+    # Rules comparing different columns of the two records are joined as usual
+    assert blocked_sql.count("unnest(records[i + 1:])") == 1
+    assert "TRUE" not in blocked_sql
+    assert BlockingRule("l.first_name = r.surname")._block_keys == []
+    assert BlockingRule(
+        "substr(l.dob, 1, 4) = substr(r.dob, 1, 4) and l.city = r.city"
+    )._block_keys == ["SUBSTR(dob, 1, 4)", "city"]
+
+    con = sqlite3.connect(":memory:")
+    df.to_sql("input_df", con)
+    linker = SQLiteLinker("input_df", get_settings_dict(), connection=con)
+    with pytest.raises(SplinkException):
+        linker.set_blocking_pair_generation_strategy("groupwise")
+    with pytest.raises(ValueError):
+        linker.set_blocking_pair_generation_strategy("unknown")
+
+
+@mark_with_dialects_excluding()
+def test_singleton_key_pruning(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    blocking_rules = [
+        "l.first_name = r.surname",
+        "l.surname = r.surname and l.dob = r.dob",
+        "substr(l.dob, 1, 4) = substr(r.dob, 1, 4) and l.city = r.city",
+        "l.email = r.email and levenshtein(l.first_name, r.first_name) < 3",
+    ]
+
+    def predictions(singleton_key_pruning):
+        def configure(linker):
+            linker.set_singleton_key_pruning(singleton_key_pruning)
+
+        return _predict(helper, df, blocking_rules, configure)[1]
+
+    df_unpruned = predictions(False)
+    df_pruned = predictions(True)
+    assert len(df_unpruned) > 0
+    pd.testing.assert_frame_equal(df_unpruned, df_pruned)
+
+
+def test_singleton_key_pruning_sql():
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.first_name = r.surname",
+        "l.surname = r.surname and l.dob = r.dob",
+    ]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    linker = DuckDBLinker(df, settings)
+    linker.set_singleton_key_pruning()
+    sqls = block_using_rules_sqls(linker)
+
+    # Rules comparing different columns of the two records are not pruned
+    pruned_tablename = "__splink__df_concat_with_tf_pruned_1"
+    assert [sql["output_table_name"] for sql in sqls] == [
+        pruned_tablename,
+        "__splink__df_blocked",
+    ]
+    assert "having count(*) > 1" in sqls[0]["sql"]
+    blocked_sql = sqls[-1]["sql"]
+    assert f"from {pruned_tablename} as l" in blocked_sql
+    assert f"inner join {pruned_tablename} as r" in blocked_sql
+    assert "from __splink__df_concat_with_tf as l" in blocked_sql
+
+
+@mark_with_dialects_including("duckdb", "spark", pass_dialect=True)
+def test_hot_key_salting(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    blocking_rules = [
+        "l.surname = r.surname",
+        "l.first_name = r.first_name and substr(l.dob, 1, 4) = substr(r.dob, 1, 4)",
+        "levenshtein(l.email, r.email) < 2",
+    ]
+
+    def predictions(max_block_size):
+        def configure(linker):
+            linker.set_hot_key_salting(max_block_size=max_block_size, max_partitions=4)
+
+        return _predict(helper, df, blocking_rules, configure)[1]
+
+    df_unsalted = predictions(None)
+    df_salted = predictions(5)
+
+    assert not df_salted.duplicated(["unique_id_l", "unique_id_r"]).any()
+    pd.testing.assert_frame_equal(df_unsalted, df_salted)
+
+
+def test_hot_key_salting_sql():
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.surname = r.surname",
+        "levenshtein(l.email, r.email) < 2",
+    ]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    linker = DuckDBLinker(df, settings)
+    linker.set_hot_key_salting(max_block_size=5, max_partitions=4)
+    linker._initialise_df_concat_with_tf()
+
+    hot_key_rules = materialise_hot_key_tables(linker)
+    (
+        surname_rule,
+        email_rule,
+    ) = linker._settings_obj._blocking_rules_to_generate_predictions
+    assert hot_key_rules == [surname_rule]
+    assert surname_rule.hot_key_partitions == 4
+    # Rules without equi-join conditions have no keys to salt
+    assert email_rule.hot_keys_table is None
+
+    blocked_sql = block_using_rules_sqls(linker)[-1]["sql"]
+    hot_keys_name = surname_rule.hot_keys_table.physical_name
+    assert f"left join {hot_keys_name}" in blocked_sql
+    assert "__splink__salting_partitions is null" in blocked_sql
+    salt_sql = "% hot_keys.__splink__salting_partitions) = 3"
+    assert salt_sql in blocked_sql
+
+    [b.drop_hot_keys_table() for b in hot_key_rules]
+    assert surname_rule.hot_keys_table is None
+
+    with pytest.raises(ValueError):
+        linker.set_hot_key_salting(max_block_size=0)
+
+
+@mark_with_dialects_excluding()
+def test_salted_blocking_rules(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+    _, df_unsalted = _predict(helper, df, ["l.surname = r.surname", "l.dob = r.dob"])
+    _, df_salted = _predict(
+        helper,
+        df,
+        [
+            {"blocking_rule": "l.surname = r.surname", "salting_partitions": 3},
+            {"blocking_rule": "l.dob = r.dob", "salting_partitions": 7},
+        ],
+    )
+    pd.testing.assert_frame_equal(df_unsalted, df_salted)
+
+
+def test_salted_blocking_rule_sql():
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        {"blocking_rule": "l.surname = r.surname", "salting_partitions": 3},
+    ]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    linker = DuckDBLinker(df, settings)
+
+    # The salt is derived from the unique id, so records do not need a random salt
+    # and the input to blocking need not be materialised
+    assert not linker._salting_required
+
+    blocked_sql = block_using_rules_sqls(linker)[-1]["sql"]
+    assert "UNION ALL" not in blocked_sql
+    assert 'abs(hash(l."unique_id") % 3) = r.__splink_salt_bucket' in blocked_sql
+
+
+def _sorted_neighbourhood_pairs(df, sort_key, window_size):
+    df = df[df[sort_key].notnull()].sort_values([sort_key, "unique_id"])
+    ids = list(df["unique_id"])
+    return {
+        (min(id_l, id_r), max(id_l, id_r))
+        for i, id_l in enumerate(ids)
+        for id_r in ids[i + 1 : i + 1 + window_size]
+    }
+
+
+@mark_with_dialects_excluding()
+def test_sorted_neighbourhood_blocking_rule(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+    sorted_neighbourhood_rule = {"sort_key": "surname", "window_size": 3}
+    linker, df_predict = _predict(
+        helper, df, ["l.dob = r.dob", sorted_neighbourhood_rule]
+    )
+
+    neighbour_pairs = _sorted_neighbourhood_pairs(df, "surname", 3)
+    dob_pairs = {
+        (min(id_l, id_r), max(id_l, id_r))
+        for _, group in df.groupby("dob")
+        for id_l in group["unique_id"]
+        for id_r in group["unique_id"]
+        if id_l != id_r
+    }
+
+    assert _pairs(df_predict) == dob_pairs | neighbour_pairs
+
+    match_key_1 = df_predict[df_predict["match_key"] == "1"]
+    assert len(match_key_1) == len(neighbour_pairs - dob_pairs)
+
+    assert linker.count_num_comparisons_from_blocking_rule(
+        sorted_neighbourhood_rule
+    ) == len(neighbour_pairs)
+    records = linker.cumulative_comparisons_from_blocking_rules_records()
+    assert [r["row_count"] for r in records] == [
+        len(dob_pairs),
+        len(neighbour_pairs - dob_pairs),
+    ]
+
+
+def _qgrams(value, q=3):
+    value = value.strip()
+    return {value[i : i + q] for i in range(max(len(value) - q + 1, 1))}
+
+
+@mark_with_dialects_including("duckdb", "spark", pass_dialect=True)
+def test_minhash_blocking_rule(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    df["full_name"] = df["first_name"].fillna("") + " " + df["surname"].fillna("")
+
+    linker, df_predict = _predict(
+        helper,
+        df,
+        ["l.dob = r.dob", {"minhash_column": "full_name", "jaccard_threshold": 0.5}],
+    )
+    predicted_pairs = _pairs(df_predict)
+
+    shingles = {
+        r.unique_id: _qgrams(r.full_name)
+        for r in df.itertuples()
+        if r.full_name.strip()
+    }
+    ids = sorted(shingles)
+    similar_pairs = {
+        (id_l, id_r)
+        for i, id_l in enumerate(ids)
+        for id_r in ids[i + 1 :]
+        if len(shingles[id_l] & shingles[id_r]) / len(shingles[id_l] | shingles[id_r])
+        >= 0.5
+    }
+    br = linker._settings_obj._blocking_rules_to_generate_predictions[1]
+    recall = len(similar_pairs & predicted_pairs) / len(similar_pairs)
+    assert recall > br.expected_recall - 0.1
+
+    # Pairs below the threshold are unlikely to be compared, so the rule generates
+    # far fewer comparisons than blocking on either name would
+    minhash_pairs = df_predict[df_predict["match_key"] == "1"]
+    assert len(minhash_pairs) < 2 * len(similar_pairs)
+
+
+def test_minhash_blocking_rule_parameters():
+    br = blocking_rule_to_obj(
+        {"minhash_column": "address", "jaccard_threshold": 0.7, "num_perm": 64}
+    )
+    assert isinstance(br, MinHashLSHBlockingRule)
+    assert br.bands * br.rows <= 64
+    # The probability of comparing a pair rises steeply around the threshold
+    assert lsh_candidate_probability(0.4, br.bands, br.rows) < 0.1
+    assert lsh_candidate_probability(0.9, br.bands, br.rows) > 0.9
+
+    # The shingles are computed once per record, not once per hash function
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    linker = DuckDBLinker(df, get_settings_dict())
+    keys_sql = br.keys_sql(linker)
+    assert keys_sql.count("list_transform(range(1,") == 1
+
+
+@mark_with_dialects_including("duckdb", "spark", pass_dialect=True)
+def test_levenshtein_blocking_rule(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+    for max_distance in [1, 2]:
+        rule = {"levenshtein_column": "surname", "max_distance": max_distance}
+        rule_sql = f"levenshtein(l.surname, r.surname) <= {max_distance}"
+        assert _predicted_pairs(helper, df, ["l.dob = r.dob", rule]) == (
+            _predicted_pairs(helper, df, ["l.dob = r.dob", rule_sql])
+        )
+
+
+@mark_with_dialects_including("duckdb", "spark", pass_dialect=True)
+def test_qgram_blocking_rule(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+    qgram_rule = {
+        "qgram_column": "surname",
+        "min_shared_tokens": 2,
+        "max_token_frequency": 20,
+    }
+    events = []
+
+    def configure(linker):
+        linker.execution_hooks.register(after=events.append)
+
+    _, df_predict = _predict(helper, df, ["l.dob = r.dob", qgram_rule], configure)
+    predicted_pairs = _pairs(df_predict[df_predict["match_key"] == "1"])
+
+    # The pruned index is a single step of the pipeline, joined to itself
+    (id_pairs_sql,) = [
+        e.sql
+        for e in events
+        if e.templated_name.startswith("__splink__marginal_exploded_ids")
+    ]
+    assert id_pairs_sql.count("__splink__df_concat_with_tf_unnested_pruned as (") == 1
+
+    shingles = {
+        r.unique_id: _qgrams(r.surname)
+        for r in df.itertuples()
+        if isinstance(r.surname, str) and r.surname.strip()
+    }
+    frequency = {}
+    for qgrams in shingles.values():
+        for qgram in qgrams:
+            frequency[qgram] = frequency.get(qgram, 0) + 1
+    dob = dict(zip(df["unique_id"], df["dob"]))
+    ids = sorted(shingles)
+    expected_pairs = {
+        (id_l, id_r)
+        for i, id_l in enumerate(ids)
+        for id_r in ids[i + 1 :]
+        if dob[id_l] != dob[id_r]
+        and len({q for q in shingles[id_l] & shingles[id_r] if frequency[q] <= 20}) >= 2
+    }
+    assert predicted_pairs == expected_pairs
+
+
+@mark_with_dialects_including("duckdb", "spark", pass_dialect=True)
+@pytest.mark.parametrize(
+    "blocking_rule",
+    [
+        {"minhash_column": "surname", "jaccard_threshold": 0.5},
+        {"qgram_column": "surname", "min_shared_tokens": 1},
+    ],
+)
+def test_shingle_blocking_rules_ignore_blank_values(
+    test_helpers, dialect, blocking_rule
+):
+    helper = test_helpers[dialect]
+    df = pd.DataFrame(
+        {
+            "unique_id": [1, 2, 3, 4, 5, 6],
+            "surname": ["  ", "  ", "", None, "Li ", " Li"],
+        }
+    )
+    pairs = _predicted_pairs(
+        helper,
+        df,
+        [blocking_rule],
+        settings={"link_type": "dedupe_only"},
+        deterministic=True,
+    )
+    # Blank values have no shingles, and values are compared once trimmed
+    assert pairs == {(5, 6)}
+
+
+def test_nearest_neighbours():
+    rng = np.random.default_rng(1)
+    embeddings = rng.normal(size=(50, 4))
+    groups = np.arange(50) % 3
+    normalised = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    similarities = normalised @ normalised.T
+
+    # Including blocks smaller than k
+    for chunk_size in [3, 7, 1024]:
+        rows, neighbours = nearest_neighbours(embeddings, 5, chunk_size)
+        assert len(rows) == 50 * 5
+        for i in range(50):
+            expected = [j for j in np.argsort(-similarities[i]) if j != i][:5]
+            assert set(neighbours[rows == i]) == set(expected)
+
+        rows, neighbours = nearest_neighbours(embeddings, 5, chunk_size, groups)
+        assert (groups[rows] != groups[neighbours]).all()
+        for i in range(50):
+            expected = [
+                j for j in np.argsort(-similarities[i]) if groups[j] != groups[i]
+            ][:5]
+            assert set(neighbours[rows == i]) == set(expected)
+
+    # Records with fewer than k candidate neighbours are paired with all of them
+    rows, neighbours = nearest_neighbours(embeddings[:3], 5)
+    assert len(rows) == 6
+
+
+@mark_with_dialects_including("duckdb", "spark", pass_dialect=True)
+def test_nearest_neighbour_blocking_rule(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    # Records in the same cluster have similar embeddings
+    rng = np.random.default_rng(0)
+    centres = {c: rng.normal(size=8) for c in df["cluster"].unique()}
+    embeddings = [centres[c] + rng.normal(scale=0.3, size=8) for c in df["cluster"]]
+    df["embedding"] = [list(e) for e in embeddings]
+
+    linker, df_predict = _predict(
+        helper, df, ["l.dob = r.dob", {"embedding_column": "embedding", "k": 3}]
+    )
+    _pairs(df_predict)
+    # The neighbours found in memory are dropped once the pairs are generated
+    assert not linker._table_exists_in_database("__splink__nearest_neighbours_mk_1")
+
+    ids = df["unique_id"].tolist()
+    dob = dict(zip(ids, df["dob"]))
+    rows, neighbours = nearest_neighbours(embeddings, 3)
+    expected_pairs = {
+        (min(ids[i], ids[j]), max(ids[i], ids[j])) for i, j in zip(rows, neighbours)
+    }
+    expected_pairs = {p for p in expected_pairs if dob[p[0]] != dob[p[1]]}
+    assert _pairs(df_predict[df_predict["match_key"] == "1"]) == expected_pairs
+
+    # Records without an embedding have no neighbours, so neither does the only
+    # record with one
+    df["embedding"] = [e if i == 0 else None for i, e in enumerate(df["embedding"])]
+    _, df_predict = _predict(
+        helper, df, ["l.dob = r.dob", {"embedding_column": "embedding", "k": 3}]
+    )
+    assert (df_predict["match_key"] == "0").all()
+
+
+@mark_with_dialects_including("duckdb", "spark", pass_dialect=True)
+def test_geo_grid_blocking_rule(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    rng = np.random.default_rng(0)
+    # Clusters of points, including at a pole and either side of the antimeridian
+    centres = np.vstack(
+        [
+            rng.uniform([-60, -180], [60, 180], size=(20, 2)),
+            [[89.99, 0], [10, 179.99], [10, -179.99]],
+        ]
+    )
+    cluster = rng.integers(0, len(centres), 1000)
+    df = pd.DataFrame(
+        {
+            "unique_id": range(1000),
+            "lat": np.clip(centres[cluster, 0] + rng.normal(0, 0.05, 1000), -90, 90),
+            "long": (centres[cluster, 1] + rng.normal(0, 0.05, 1000) + 180) % 360 - 180,
+            "first_name": rng.choice(list("abcdef"), 1000),
+        }
+    )
+    df.loc[0, "lat"] = None
+
+    def predicted_pairs(blocking_rule):
+        return _predicted_pairs(
+            helper,
+            df,
+            ["l.first_name = r.first_name", blocking_rule],
+            with_match_key=True,
+            settings={"link_type": "dedupe_only"},
+            deterministic=True,
+        )
+
+    distance_sql = great_circle_distance_km_sql("l.lat", "r.lat", "l.long", "r.long")
+    pairs = predicted_pairs({"lat_col": "lat", "long_col": "long", "km_threshold": 5})
+    assert any(match_key == "1" for _, _, match_key in pairs)
+    assert pairs == predicted_pairs(f"{distance_sql} <= 5")
+
+
+@pytest.mark.parametrize(
+    "blocking_rule, blocking_rule_class",
+    [
+        (
+            {"sort_key": "surname", "window_size": 4, "blocking_rule": "l.dob = r.dob"},
+            SortedNeighbourhoodBlockingRule,
+        ),
+        (
+            {"minhash_column": "address", "jaccard_threshold": 0.7, "num_perm": 64},
+            MinHashLSHBlockingRule,
+        ),
+        (
+            {"levenshtein_column": "surname", "max_distance": 2},
+            LevenshteinBlockingRule,
+        ),
+        (
+            {
+                "qgram_column": "address",
+                "shingle_type": "token",
+                "min_shared_tokens": 2,
+            },
+            QGramBlockingRule,
+        ),
+        (
+            {
+                "embedding_column": "embedding",
+                "k": 5,
+                "blocking_rule": "l.city = r.city",
+            },
+            EmbeddingNearestNeighbourBlockingRule,
+        ),
+        (
+            {"lat_col": "lat", "long_col": "long", "km_threshold": 2},
+            GeoGridBlockingRule,
+        ),
+    ],
+)
+def test_blocking_rule_from_dict(blocking_rule, blocking_rule_class):
+    br = blocking_rule_to_obj(blocking_rule)
+    assert isinstance(br, blocking_rule_class)
+    assert blocking_rule_to_obj(br.as_dict()).as_dict() == br.as_dict()
+
+
+@pytest.mark.parametrize(
+    "blocking_rule",
+    [
+        {"sort_key": "surname", "window_size": 0},
+        {"sort_key": "surname", "salting_partitions": 2},
+        {"minhash_column": "address", "jaccard_threshold": 0},
+        {"minhash_column": "address", "shingle_type": "word"},
+        {"levenshtein_column": "surname", "max_distance": 0},
+        {"qgram_column": "address", "min_shared_tokens": 0},
+        {"qgram_column": "address", "max_token_frequency": 1},
+        {"embedding_column": "embedding", "k": 0},
+        {"lat_col": "lat", "long_col": "long", "km_threshold": 0},
+        {"lat_col": "lat", "km_threshold": 2},
+    ],
+)
+def test_invalid_blocking_rule_dict(blocking_rule):
+    with pytest.raises(ValueError):
+        blocking_rule_to_obj(blocking_rule)
+
+
+def test_blocking_rule_from_dict_attributes():
+    br = blocking_rule_to_obj({"levenshtein_column": "surname", "max_distance": 2})
+    assert br._equi_join_conditions == [(br.keys_column, br.keys_column)]
+    assert "levenshtein(l.surname, r.surname) <= 2" in br.blocking_rule_sql
+
+    br = blocking_rule_to_obj({"qgram_column": "address"})
+    assert br.max_token_frequency == 1000
+
+    br = blocking_rule_to_obj(
+        {"embedding_column": "embedding", "k": 5, "blocking_rule": "l.city = r.city"}
+    )
+    assert br.blocking_rule_sql == "l.city = r.city"
+
+    br = blocking_rule_to_obj({"lat_col": "lat", "long_col": "long", "km_threshold": 2})
+    assert len(set(br.cell_columns.values())) == 3
+
+
+@mark_with_dialects_excluding()
+def test_or_of_equi_joins_blocking_rule(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+    def predicted_pairs(blocking_rule):
+        return _predicted_pairs(
+            helper, df, ["l.city = r.city", blocking_rule], with_match_key=True
+        )
+
+    rule = (
+        "(l.first_name = r.first_name and l.surname = r.surname) "
+        "or substr(l.dob, 1, 4) = substr(r.dob, 1, 4) or l.email = r.email"
+    )
+    # A condition without an equi-join means the rule is evaluated as it is
+    assert predicted_pairs(rule) == predicted_pairs(f"{rule} or 1 = 2")
+
+
+def test_or_of_equi_joins_blocking_rule_sql():
+    br = BlockingRule("l.first_name = r.first_name or (l.dob = r.dob)")
+    assert [d.sql() for d in br._equi_join_disjuncts] == [
+        "l.first_name = r.first_name",
+        "l.dob = r.dob",
+    ]
+    for rule in [
+        "l.first_name = r.first_name or levenshtein(l.dob, r.dob) < 2",
+        "(l.first_name = r.first_name or l.dob = r.dob) and l.city = r.city",
+        "l.first_name = r.first_name",
+    ]:
+        assert BlockingRule(rule)._equi_join_disjuncts == []
+
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.first_name = r.first_name or l.dob = r.dob"
+    ]
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    linker = DuckDBLinker(df, settings)
+    blocked_sql = block_using_rules_sqls(linker)[-1]["sql"]
+    assert blocked_sql.count("UNION ALL") == 1
+    assert "(l.first_name = r.first_name)" in blocked_sql
+    assert "AND NOT coalesce((l.first_name = r.first_name), false)" in blocked_sql
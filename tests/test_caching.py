@@ -269,3 +269,121 @@ def test_cache_register_compute_tf_table(debug_mode):
         # now this should be cached, as I have manually registered
         linker.compute_tf_table("first_name")
         mock_execute_sql_pipeline.assert_not_called()
+
+
+def test_persistent_cache_reused_across_linkers(tmp_path):
+    settings = get_settings_dict()
+    cache_dir = os.path.join(tmp_path, "splink_cache")
+
+    linker = DuckDBLinker(df, settings)
+    linker.enable_persistent_cache(cache_dir)
+    df_predict = linker.predict().as_pandas_dataframe()
+    assert len(linker._intermediate_table_cache.persistent_cache) > 0
+
+    # A linker in a 'new session' with the same data and settings
+    # should read the concatenated records back from disk
+    new_linker = DuckDBLinker(df, settings)
+    new_linker.enable_persistent_cache(cache_dir)
+    cache = new_linker._intermediate_table_cache
+    df_predict_2 = new_linker.predict().as_pandas_dataframe()
+
+    assert not cache.is_in_executed_queries("__splink__df_concat_with_tf")
+    # Predictions are not stored by default
+    assert cache.is_in_executed_queries("__splink__df_predict")
+    assert len(df_predict) == len(df_predict_2)
+
+    # If the input data changes, the fingerprint changes and results are recomputed
+    df_changed = df.copy()
+    df_changed.loc[0, "first_name"] = "a_new_name"
+    changed_linker = DuckDBLinker(df_changed, settings)
+    changed_linker.enable_persistent_cache(cache_dir)
+    cache = changed_linker._intermediate_table_cache
+    changed_linker.predict()
+
+    assert cache.is_in_executed_queries("__splink__df_concat_with_tf")
+
+
+def test_persistent_cache_stores_chosen_tables(tmp_path):
+    settings = get_settings_dict()
+    cache_dir = os.path.join(tmp_path, "splink_cache")
+
+    def cache_table(templated_name):
+        return templated_name == "__splink__df_predict"
+
+    linker = DuckDBLinker(df, settings)
+    linker.enable_persistent_cache(cache_dir, cache_table=cache_table)
+    linker.predict()
+    # Only the predictions are stored, not the tables they are computed from
+    assert len(linker._intermediate_table_cache.persistent_cache) == 1
+
+    new_linker = DuckDBLinker(df, settings)
+    new_linker.enable_persistent_cache(cache_dir, cache_table=cache_table)
+    cache = new_linker._intermediate_table_cache
+    new_linker.predict()
+    assert cache.is_in_queries_retrieved_from_cache("__splink__df_predict")
+    assert not cache.is_in_executed_queries("__splink__df_predict")
+
+
+def test_persistent_cache_evicts_least_recently_used(tmp_path):
+    settings = get_settings_dict()
+    cache_dir = os.path.join(tmp_path, "splink_cache")
+
+    linker = DuckDBLinker(df, settings)
+    linker.enable_persistent_cache(cache_dir, max_size_bytes=1)
+    linker.compute_tf_table("first_name")
+    linker.compute_tf_table("surname")
+
+    # Each new entry exceeds the budget, so only the most recent is retained
+    persistent_cache = linker._intermediate_table_cache.persistent_cache
+    assert len(persistent_cache) == 1
+    assert len(os.listdir(cache_dir)) == 2  # parquet file plus manifest
+
+
+def test_memory_budget_evicts_only_unreferenced_tables():
+    settings = get_settings_dict()
+
+    linker = DuckDBLinker(df, settings)
+    cache = linker._intermediate_table_cache
+    linker.set_memory_budget(10e9)
+
+    df_predict = linker.predict()
+    concat_with_tf_name = cache["__splink__df_concat_with_tf"].physical_name
+    assert cache.total_size_bytes > 0
+    assert cache.reference_count(df_predict.physical_name) == 1
+
+    # Predictions are still referenced, so only df_concat_with_tf can be evicted
+    linker.set_memory_budget(1)
+    assert "__splink__df_concat_with_tf" not in cache
+    assert not linker._table_exists_in_database(concat_with_tf_name)
+    assert linker._table_exists_in_database(df_predict.physical_name)
+
+    # Evicted tables are recomputed when next needed
+    linker.set_memory_budget(None)
+    assert len(linker.predict().as_pandas_dataframe()) > 0
+    assert cache.is_in_executed_queries("__splink__df_concat_with_tf")
+
+    # Once no longer referenced, predictions can also be evicted
+    physical_name = df_predict.physical_name
+    del df_predict
+    linker.set_memory_budget(1)
+    assert not linker._table_exists_in_database(physical_name)
+
+
+@pytest.mark.parametrize("drop_unreferenced_tables", [True, False])
+def test_memory_budget_drops_unreferenced_tables(drop_unreferenced_tables):
+    settings = get_settings_dict()
+
+    linker = DuckDBLinker(df, settings)
+    linker.set_memory_budget(10e9, drop_unreferenced_tables=drop_unreferenced_tables)
+    df_predict = linker.predict()
+    physical_name = df_predict.physical_name
+
+    # Tables are dropped once unreferenced, however far within the budget
+    del df_predict
+    linker.compute_tf_table("surname")
+    assert linker._table_exists_in_database(physical_name) != drop_unreferenced_tables
+
+    # Tables Splink looks up by name are kept
+    cache = linker._intermediate_table_cache
+    assert "__splink__df_concat_with_tf" in cache
+    assert "__splink__df_tf_surname" in cache
@@ -0,0 +1,80 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pytest
+
+from splink.duckdb.linker import DuckDBLinker
+from splink.exceptions import MissingDependencyException
+
+from .basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+
+@pytest.mark.parametrize(
+    "to_input",
+    [
+        pytest.param(lambda t: t, id="table"),
+        pytest.param(lambda t: ds.dataset(t), id="dataset"),
+        pytest.param(lambda t: ds.dataset(t).scanner(), id="scanner"),
+    ],
+)
+def test_arrow_inputs_match_pandas_input(to_input):
+    expected = DuckDBLinker(df, get_settings_dict()).predict().as_pandas_dataframe()
+
+    arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+    linker = DuckDBLinker(to_input(arrow_table), get_settings_dict())
+    df_predict = linker.predict()
+
+    result = df_predict.as_arrow()
+    assert isinstance(result, pa.Table)
+    assert result.num_rows == len(expected)
+    assert result.column_names == list(expected.columns)
+    assert df_predict.as_arrow(limit=5).num_rows == 5
+
+
+def test_records_registered_as_arrow():
+    linker = DuckDBLinker(df, get_settings_dict())
+    records = [
+        {"unique_id": 1, "first_name": "Robin", "age": None},
+        {"unique_id": 2, "first_name": None, "age": 42},
+    ]
+    linker.register_table(records, "records")
+
+    sql = "select column_name, data_type from information_schema.columns "
+    sql += "where table_name = 'records'"
+    column_types = dict(linker._con.execute(sql).fetchall())
+    # A pandas dataframe would hold the nullable integer column as a double
+    assert column_types == {
+        "unique_id": "BIGINT",
+        "first_name": "VARCHAR",
+        "age": "BIGINT",
+    }
+
+
+def test_records_missing_keys_registered():
+    linker = DuckDBLinker(df, get_settings_dict())
+    records = [
+        {"unique_id": 1, "first_name": "Robin"},
+        {"unique_id": 2, "first_name": "Sam", "surname": "Linacre"},
+    ]
+    linker.register_table(records, "records")
+
+    result = linker.query_sql("select * from records order by unique_id")
+    assert list(result.columns) == ["unique_id", "first_name", "surname"]
+    assert result["surname"].isna().tolist() == [True, False]
+
+
+def test_to_polars():
+    linker = DuckDBLinker(df, get_settings_dict())
+    df_predict = linker.predict()
+    try:
+        import polars as pl
+    except ImportError:
+        with pytest.raises(MissingDependencyException):
+            df_predict.to_polars()
+        return
+
+    result = df_predict.to_polars(limit=10)
+    assert isinstance(result, pl.DataFrame)
+    assert len(result) == 10
@@ -0,0 +1,119 @@
+import pandas as pd
+import pytest
+
+from splink.duckdb.duckdb_helpers.resource_profiles import (
+    DuckDBResourceProfile,
+    automatic_resource_profiles,
+    stage_of_statement,
+    stage_of_table,
+)
+from splink.duckdb.linker import DuckDBLinker
+
+from .basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+SETTINGS_SQL = """
+select
+    current_setting('threads'),
+    current_setting('memory_limit'),
+    current_setting('preserve_insertion_order')
+"""
+
+
+def test_stage_of_table():
+    assert stage_of_table("__splink__df_tf_first_name") == "tf"
+    assert stage_of_table("__splink__df_blocked") == "blocking"
+    assert stage_of_table("__splink__df_predict") == "predict"
+    assert stage_of_table("__splink__df_representatives_3") == "clustering"
+    assert stage_of_table("__splink__df_concat_with_tf") == "default"
+    assert (
+        stage_of_table("__splink__marginal_neighbour_ids_blocking_rule_mk_1")
+        == "blocking"
+    )
+
+
+def test_stage_of_statement():
+    # The term frequency tables computed as CTEs of df_concat_with_tf
+    steps = ["__splink__df_concat", "__splink__df_tf_surname"]
+    assert stage_of_statement(steps + ["__splink__df_concat_with_tf"]) == "tf"
+    # The blocking CTEs of the predict pipeline
+    steps = ["__splink__df_blocked", "__splink__df_comparison_vectors"]
+    assert stage_of_statement(steps + ["__splink__df_predict"]) == "predict"
+    # A step materialised separately takes the stage of its own steps first, then of
+    # the pipeline it was split from
+    assert stage_of_statement(["__splink__df_representatives", "rep"]) == "clustering"
+    assert stage_of_statement(["__splink__df_concat_with_tf"]) == "default"
+
+
+def test_profile_settings():
+    profile = DuckDBResourceProfile(threads=2, memory_limit=3 * 1024**3)
+    assert profile.settings() == {"threads": 2, "memory_limit": "3072MiB"}
+
+    profiles = automatic_resource_profiles(cores=8, memory_bytes=10 * 1024**3)
+    assert profiles["predict"].threads == 8
+    assert profiles["clustering"].threads == 4
+    assert profiles["clustering"].memory_limit < profiles["predict"].memory_limit
+
+
+def test_profiles_applied_per_stage():
+    linker = DuckDBLinker(df, get_settings_dict())
+    settings_before = linker._con.execute(SETTINGS_SQL).fetchone()
+
+    settings_by_table = {}
+
+    def record_settings(event):
+        settings = linker._con.execute(SETTINGS_SQL).fetchone()
+        settings_by_table[event.templated_name] = settings
+
+    linker.execution_hooks.register(after=record_settings)
+    linker.set_pipeline_materialisation(reference_count_threshold=2)
+    linker.set_resource_profiles(
+        {
+            "tf": {"threads": 4},
+            "predict": {"threads": 3, "memory_limit": "1GiB"},
+            "clustering": DuckDBResourceProfile(
+                threads=2, preserve_insertion_order=False
+            ),
+        }
+    )
+    df_predict = linker.predict()
+    linker.cluster_pairwise_predictions_at_threshold(df_predict, 0.9)
+
+    # The term frequency table, which is referenced twice by df_concat_with_tf so is
+    # materialised, uses the tf profile, and the join onto df_concat the default
+    assert settings_by_table["__splink__df_tf_first_name"] == (
+        4,
+        settings_before[1],
+        settings_before[2],
+    )
+    assert settings_by_table["__splink__df_concat_with_tf"] == settings_before
+    assert settings_by_table["__splink__df_predict"] == (
+        3,
+        "1.0 GiB",
+        settings_before[2],
+    )
+    # Steps of the connected components pipeline materialised as tables of their
+    # own are executed with the clustering profile
+    for table in ["representatives", "__splink__df_representatives"]:
+        threads, _, preserve_insertion_order = settings_by_table[table]
+        assert (threads, preserve_insertion_order) == (2, False)
+
+    linker.set_resource_profiles(None)
+    threads, memory_limit, preserve_insertion_order = linker._con.execute(
+        SETTINGS_SQL
+    ).fetchone()
+    assert (threads, preserve_insertion_order) == (
+        settings_before[0],
+        settings_before[2],
+    )
+    # DuckDB reports the memory limit rounded to one decimal place
+    assert memory_limit.endswith(settings_before[1].split(" ")[1])
+
+
+def test_invalid_profiles():
+    linker = DuckDBLinker(df, get_settings_dict())
+    with pytest.raises(ValueError):
+        linker.set_resource_profiles({"scoring": {"threads": 2}})
+    with pytest.raises(ValueError):
+        linker.set_resource_profiles("fast")
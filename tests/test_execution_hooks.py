@@ -0,0 +1,144 @@
+import logging
+
+import pandas as pd
+import pytest
+
+from splink.duckdb.linker import DuckDBLinker
+from splink.exceptions import SplinkException
+from splink.execution_hooks import ExecutionHooks
+from splink.pipeline import SQLPipeline
+
+from .basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+
+def test_linker_hooks_fire_around_each_statement():
+    linker = DuckDBLinker(df, get_settings_dict())
+    before, after = [], []
+    wall_times_before_execution = []
+
+    def before_hook(event):
+        before.append(event)
+        wall_times_before_execution.append(event.wall_time_seconds)
+
+    handle = linker.execution_hooks.register(before=before_hook, after=after.append)
+
+    df_predict = linker.predict()
+
+    assert [e.templated_name for e in before] == [e.templated_name for e in after]
+    predict_event = after[-1]
+    assert predict_event.templated_name == "__splink__df_predict"
+    assert predict_event.physical_name == df_predict.physical_name
+    assert predict_event.result.physical_name == df_predict.physical_name
+    assert predict_event.wall_time_seconds >= 0
+    assert "__splink__df_match_weight_parts" in predict_event.sql
+    assert set(wall_times_before_execution) == {None}
+
+    # Cached results do not fire hooks, and removed hooks are not called
+    linker.execution_hooks.remove(handle)
+    n_events = len(after)
+    linker._initialise_df_concat_with_tf()
+    linker.predict(threshold_match_probability=0.5)
+    assert len(after) == n_events
+
+
+def test_error_hooks_fire_before_error_is_raised():
+    linker = DuckDBLinker(df, get_settings_dict())
+    errors = []
+    linker.execution_hooks.register(on_error=errors.append)
+
+    with pytest.raises(SplinkException):
+        linker.query_sql("select * from table_does_not_exist")
+
+    assert len(errors) == 1
+    assert isinstance(errors[0].exception, SplinkException)
+    assert errors[0].result is None
+
+
+def test_failing_hook_does_not_interrupt_execution(caplog):
+    def failing_hook(event):
+        raise ValueError("metrics system unavailable")
+
+    linker = DuckDBLinker(df, get_settings_dict())
+    linker.execution_hooks.register(after=failing_hook)
+
+    with caplog.at_level(logging.WARNING):
+        result = linker.query_sql("select 1 as one")
+    assert result["one"][0] == 1
+    assert "metrics system unavailable" in caplog.text
+
+
+def test_pipeline_hooks_fire_around_final_statement():
+    linker = DuckDBLinker(df, get_settings_dict())
+    events = []
+
+    pipeline = SQLPipeline()
+    pipeline.execution_hooks.register(after=events.append)
+    pipeline.enqueue_sql("select 1 as a", "__splink__first")
+    pipeline.enqueue_sql("select a + 1 as b from __splink__first", "__splink__second")
+    linker._pipeline = pipeline
+    result = linker._execute_sql_pipeline()
+
+    assert len(events) == 1
+    assert events[0].templated_name == "__splink__second"
+    assert events[0].physical_name == result.physical_name
+    assert events[0].sql.startswith("WITH __splink__first")
+
+
+def test_pipeline_hooks_fire_for_materialised_steps():
+    linker = DuckDBLinker(df, get_settings_dict())
+    linker.register_table(df, "input_table")
+    linker.set_pipeline_materialisation(reference_count_threshold=2)
+    events = []
+    linker._pipeline.execution_hooks.register(after=events.append)
+
+    linker._enqueue_sql(
+        "select city, count(*) as n from input_table group by city", "a"
+    )
+    linker._enqueue_sql(
+        "select * from a as a_l inner join a as a_r on a_l.n = a_r.n", "b"
+    )
+    linker._execute_sql_pipeline()
+
+    assert [e.templated_name for e in events] == ["a", "b"]
+    assert events[0].sql.startswith("select city")
+    assert events[1].result.templated_name == "b"
+
+
+def test_pipeline_hooks_fire_for_concurrent_term_frequency_tables(monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    settings = get_settings_dict()
+    surname_exact_match = settings["comparisons"][1]["comparison_levels"][1]
+    surname_exact_match["tf_adjustment_column"] = "surname"
+
+    linker = DuckDBLinker(df, settings)
+    events = []
+    linker._pipeline.execution_hooks.register(after=events.append)
+    linker._initialise_df_concat_with_tf()
+
+    templated_names = [e.templated_name for e in events]
+    assert "__splink__df_tf_first_name" in templated_names
+    assert "__splink__df_tf_surname" in templated_names
+    assert templated_names[-1] == "__splink__df_concat_with_tf"
+
+
+def test_pipeline_hooks_fire_for_concurrent_profiling_pipelines(monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    linker = DuckDBLinker(df, get_settings_dict())
+    events = []
+    linker._pipeline.execution_hooks.register(after=events.append)
+    linker.profile_columns(["first_name", "surname"])
+
+    templated_names = {e.templated_name for e in events}
+    assert {
+        "__splink__df_all_column_value_frequencies",
+        "__splink__df_top_n",
+        "__splink__df_bottom_n",
+    } <= templated_names
+
+
+def test_no_hooks_calls_function_directly():
+    hooks = ExecutionHooks()
+    assert len(hooks) == 0
+    assert hooks.run("a", "b", "select 1", lambda x: x + 1, 1) == 2
@@ -0,0 +1,71 @@
+import json
+
+import pandas as pd
+
+from splink.duckdb.linker import DuckDBLinker
+from splink.sqlite.linker import SQLiteLinker
+
+from .basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+
+def test_execution_profile_records_each_table():
+    linker = DuckDBLinker(df, get_settings_dict())
+    linker.predict()
+
+    profile = linker.execution_profile.as_pandas_dataframe()
+    assert "__splink__df_predict" in profile["templated_name"].values
+    assert not profile["cache_hit"].any()
+    assert (profile["wall_time_seconds"] >= 0).all()
+    # Statistics are only collected if requested
+    assert profile["row_count"].isna().all()
+    assert profile["explain_plan"].isna().all()
+
+    linker.predict()
+    profile = linker.execution_profile.as_pandas_dataframe()
+    predict_rows = profile[profile["templated_name"] == "__splink__df_predict"]
+    assert predict_rows["cache_hit"].tolist() == [False, True]
+
+
+def test_execution_profile_statistics_and_explain_plans(tmp_path):
+    linker = DuckDBLinker(df, get_settings_dict())
+    linker.execution_profile.collect_table_statistics = True
+    linker.execution_profile.explain_analyze = True
+    df_predict = linker.predict()
+
+    entry = [
+        e
+        for e in linker.execution_profile
+        if e.templated_name == "__splink__df_predict"
+    ][0]
+    assert entry.physical_name == df_predict.physical_name
+    assert entry.row_count == len(df_predict.as_pandas_dataframe())
+    assert entry.size_bytes > 0
+    assert "Total Time" in entry.explain_plan
+
+    out_path = str(tmp_path / "profile.json")
+    linker.execution_profile.to_json(out_path)
+    with open(out_path) as f:
+        records = json.load(f)
+    assert len(records) == len(linker.execution_profile)
+
+    linker.execution_profile.reset()
+    assert len(linker.execution_profile) == 0
+
+
+def test_execution_profile_where_backend_cannot_report_statistics():
+    import sqlite3
+
+    con = sqlite3.connect(":memory:")
+    df.to_sql("input_df", con)
+    linker = SQLiteLinker("input_df", get_settings_dict(), connection=con)
+    linker.execution_profile.collect_table_statistics = True
+    linker.execution_profile.explain_analyze = True
+    linker.predict()
+
+    entry = linker.execution_profile.entries[-1]
+    assert entry.templated_name == "__splink__df_predict"
+    assert entry.row_count > 0
+    assert entry.size_bytes is None
+    assert entry.explain_plan is None
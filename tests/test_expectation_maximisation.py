@@ -96,3 +96,45 @@ def test_estimate_without_term_frequencies():
 
     for r in compare.to_dict(orient="records"):
         assert r["m_probability_e"] == pytest.approx(r["m_probability_a"])
+
+
+def test_parameter_history_held_in_arrays():
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    settings = {
+        "link_type": "dedupe_only",
+        "comparisons": [
+            cl.levenshtein_at_thresholds("first_name", 2),
+            cl.exact_match("surname"),
+            cl.exact_match("dob"),
+        ],
+        "max_iterations": 3,
+        "em_convergence": 1e-12,
+    }
+    linker = DuckDBLinker(df, settings)
+    session = linker.estimate_parameters_using_expectation_maximisation(
+        "l.surname = r.surname"
+    )
+
+    # surname is deactivated, leaving the three non-null levels of first_name and
+    # two of dob
+    m_history, u_history, lambda_history = session._parameter_history
+    assert m_history.shape == (4, 5)
+    assert u_history.shape == (4, 5)
+    assert lambda_history.shape == (4,)
+
+    records = pd.DataFrame(session._iteration_history_records)
+    first_name_exact = records[
+        (records["comparison_name"] == "first_name")
+        & (records["comparison_vector_value"] == 2)
+    ]
+    assert first_name_exact["iteration"].tolist() == [0, 1, 2, 3]
+    assert first_name_exact["m_probability"].tolist() == m_history[:, 0].tolist()
+    assert (first_name_exact["bayes_factor"] == m_history[:, 0] / u_history[:, 0]).all()
+
+    # The arrays grow if the session runs for more than max_iterations
+    session._add_iteration()
+    session._add_iteration()
+    m_history, _, lambda_history = session._parameter_history
+    assert m_history.shape == (6, 5)
+    assert (m_history[-1] == m_history[3]).all()
+    assert [r["iteration"] for r in session._lambda_history_records] == list(range(6))
@@ -0,0 +1,38 @@
+import json
+import subprocess
+import sys
+
+# Modules which are slow to import, and are only needed by some of Splink's
+# functionality, so should not be imported by `import splink.duckdb.linker`
+LAZILY_IMPORTED_MODULES = ["altair", "jinja2", "jsonschema", "numpy", "pandas"]
+
+
+def _modules_imported_by(statement):
+    script = (
+        "import json, sys\n"
+        f"{statement}\n"
+        f"print(json.dumps([m for m in {LAZILY_IMPORTED_MODULES!r} "
+        "if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, text=True
+    )
+    return json.loads(result.stdout)
+
+
+def test_heavy_dependencies_not_imported_with_linker():
+    assert _modules_imported_by("import splink.duckdb.linker") == []
+
+
+def test_linker_constructed_from_file_does_not_import_pandas(tmp_path):
+    path = str(tmp_path / "df.csv")
+    with open(path, "w") as f:
+        f.write("unique_id,first_name\n1,Robin\n2,Robyn\n")
+
+    statement = (
+        "from splink.duckdb.linker import DuckDBLinker\n"
+        "linker = DuckDBLinker("
+        f"{path!r}, {{'link_type': 'dedupe_only'}}, validate_settings=False)"
+    )
+    # Settings are validated against the jsonschema whenever a linker is created
+    assert _modules_imported_by(statement) == ["jsonschema"]
@@ -0,0 +1,72 @@
+import sqlite3
+
+import pandas as pd
+import pyarrow as pa
+
+from splink.duckdb.linker import DuckDBLinker
+from splink.sqlite.linker import SQLiteLinker
+
+from .basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+
+def _check_batches_match_dataframe(splink_df, batch_size):
+    batches = list(splink_df.iter_batches(batch_size=batch_size))
+    expected = splink_df.as_pandas_dataframe()
+
+    assert all(isinstance(b, pa.RecordBatch) for b in batches)
+    assert all(b.num_rows <= batch_size for b in batches)
+    assert sum(b.num_rows for b in batches) == len(expected)
+    assert batches[0].schema.names == list(expected.columns)
+
+    unique_ids = [uid for b in batches for uid in b.column("unique_id_l").to_pylist()]
+    assert sorted(unique_ids) == sorted(expected["unique_id_l"].tolist())
+
+
+def test_iter_batches_duckdb():
+    linker = DuckDBLinker(df, get_settings_dict())
+    df_predict = linker.predict()
+    _check_batches_match_dataframe(df_predict, batch_size=1000)
+
+    # The caller can run other queries while iterating
+    batches = df_predict.iter_batches(batch_size=1000)
+    first_batch = next(batches)
+    linker.query_sql(f"select count(*) from {df_predict.physical_name}")
+    remaining_rows = sum(b.num_rows for b in batches)
+    assert first_batch.num_rows + remaining_rows == len(df_predict.as_record_dict())
+
+
+def test_iter_batches_sqlite():
+    con = sqlite3.connect(":memory:")
+    df.to_sql("input_df", con)
+    linker = SQLiteLinker("input_df", get_settings_dict(), connection=con)
+    df_predict = linker.predict()
+    _check_batches_match_dataframe(df_predict, batch_size=1000)
+
+
+def test_iter_batches_share_schema_when_leading_values_are_null():
+    con = sqlite3.connect(":memory:")
+    df.to_sql("input_df", con)
+    records = pd.DataFrame(
+        {
+            "unique_id": [1, 2, 3, 4, 5],
+            "email": [None, None, None, "a@b.com", None],
+            "score": [None, None, 0.5, None, 1.5],
+            "note": [None] * 5,
+        }
+    )
+    records.to_sql("records", con)
+    linker = SQLiteLinker("input_df", get_settings_dict(), connection=con)
+    splink_df = linker._table_to_splink_dataframe("records", "records")
+
+    batches = list(splink_df.iter_batches(batch_size=2))
+
+    assert [b.num_rows for b in batches] == [2, 2, 1]
+    assert all(b.schema == batches[0].schema for b in batches)
+    assert batches[0].schema.field("email").type == pa.string()
+    assert batches[0].schema.field("score").type == pa.float64()
+    # A column which is null in every row has the null type
+    assert batches[0].schema.field("note").type == pa.null()
+    emails = [e for b in batches for e in b.column("email").to_pylist()]
+    assert emails == [None, None, None, "a@b.com", None]
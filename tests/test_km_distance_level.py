@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -256,3 +257,47 @@ def test_haversine_level():
     for id_pair in id_comb:
         row = dict(df_e.query("id_l == {} and id_r == {}".format(*id_pair)).iloc[0])
         assert row["gamma_lat_long"] == 1
+
+
+def test_distance_in_km_level_precomputes_unit_vectors():
+    level = clld.distance_in_km_level(lat_col="lat", long_col="long", km_threshold=5)
+    precomputed_columns = level.as_dict()["precomputed_columns"]
+    assert len(precomputed_columns) == 3
+    # The condition only uses the precomputed columns, not trigonometry
+    for column in precomputed_columns:
+        assert f"{column}_l" in level.sql_condition
+    assert "radians" not in level.sql_condition
+
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv").head(200)
+    rng = np.random.default_rng(1)
+    df["lat"] = 51.5 + rng.normal(0, 0.05, len(df))
+    df["long"] = -0.1 + rng.normal(0, 0.05, len(df))
+
+    settings = {
+        "link_type": "dedupe_only",
+        "comparisons": [
+            cld.distance_in_km_at_thresholds("lat", "long", km_thresholds=[1, 5])
+        ],
+        "retain_intermediate_calculation_columns": True,
+    }
+    linker = DuckDBLinker(df, settings)
+    df_predict = linker.predict().as_pandas_dataframe()
+
+    coordinates = df.set_index("unique_id")[["lat", "long"]]
+    lat_l, long_l = np.radians(coordinates.loc[df_predict["unique_id_l"]].values.T)
+    lat_r, long_r = np.radians(coordinates.loc[df_predict["unique_id_r"]].values.T)
+    df_predict["km"] = 6371 * np.arccos(
+        np.clip(
+            np.sin(lat_l) * np.sin(lat_r)
+            + np.cos(lat_l) * np.cos(lat_r) * np.cos(long_r - long_l),
+            -1,
+            1,
+        )
+    )
+    expected_gamma = np.select(
+        [df_predict["km"] <= 1, df_predict["km"] <= 5], [2, 1], default=0
+    )
+    # Distances within a rounding error of the thresholds may fall either side
+    near_threshold = np.isclose(df_predict["km"], 1) | np.isclose(df_predict["km"], 5)
+    gamma_column = next(c for c in df_predict.columns if c.startswith("gamma_"))
+    assert (df_predict[gamma_column] == expected_gamma)[~near_threshold].all()
@@ -0,0 +1,166 @@
+import pandas as pd
+
+from splink.duckdb.linker import DuckDBLinker
+from splink.pipeline import SQLPipeline
+
+from .basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+
+def _pipeline_with_shared_step():
+    pipeline = SQLPipeline()
+    pipeline.enqueue_sql("select * from input_table", "a")
+    pipeline.enqueue_sql("select city, count(*) as n from a group by city", "b")
+    pipeline.enqueue_sql("select * from a where first_name is not null", "c")
+    pipeline.enqueue_sql(
+        "select * from b as b_l inner join b as b_r on b_l.n = b_r.n", "d"
+    )
+    return pipeline
+
+
+def test_dependency_graph():
+    pipeline = _pipeline_with_shared_step()
+
+    assert pipeline._dependency_graph() == {
+        "a": {},
+        "b": {"a": 1},
+        "c": {"a": 1},
+        "d": {"b": 2},
+    }
+    assert pipeline._reference_counts() == {"a": 2, "b": 2, "c": 0, "d": 0}
+    assert pipeline._ancestors("d") == {"a", "b"}
+
+
+def test_word_boundaries_distinguish_table_names():
+    pipeline = SQLPipeline()
+    pipeline.enqueue_sql("select 1", "__splink__df_concat")
+    pipeline.enqueue_sql("select 2", "__splink__df_concat_with_tf")
+    pipeline.enqueue_sql("select * from __splink__df_concat_with_tf", "out")
+
+    assert pipeline._reference_counts()["__splink__df_concat"] == 0
+
+
+def test_shared_steps_not_materialised_by_default():
+    pipeline = _pipeline_with_shared_step()
+    assert pipeline._next_task_to_materialise() is None
+
+
+def test_shared_costly_step_chosen_for_materialisation():
+    pipeline = _pipeline_with_shared_step()
+    pipeline.reference_count_threshold = 2
+
+    # a is referenced twice but is a cheap projection, so is not materialised
+    assert pipeline._next_task_to_materialise().output_table_name == "b"
+
+    split_pipeline = pipeline._split_off_task(pipeline.queue[1])
+    assert [t.output_table_name for t in split_pipeline.queue] == ["a", "b"]
+    # c is no longer needed by the final step so is pruned
+    assert [t.output_table_name for t in pipeline.queue] == ["d"]
+    assert pipeline._next_task_to_materialise() is None
+
+
+def test_materialisation_can_be_overridden():
+    pipeline = _pipeline_with_shared_step()
+    pipeline.reference_count_threshold = 2
+    pipeline.queue[1].materialise = False
+    assert pipeline._next_task_to_materialise() is None
+
+    pipeline = _pipeline_with_shared_step()
+    pipeline.queue[1].materialise = True
+    assert pipeline._next_task_to_materialise().output_table_name == "b"
+
+    pipeline = _pipeline_with_shared_step()
+    assert pipeline._next_task_to_materialise() is None
+
+    pipeline.cost_threshold = 2
+    assert pipeline._next_task_to_materialise().output_table_name == "b"
+
+
+def test_linker_materialises_shared_steps():
+    linker = DuckDBLinker(df, get_settings_dict())
+    linker.register_table(df, "input_table")
+    cache = linker._intermediate_table_cache
+
+    linker._pipeline = _pipeline_with_shared_step()
+    linker.set_pipeline_materialisation(reference_count_threshold=2)
+    result = linker._execute_sql_pipeline().as_pandas_dataframe()
+
+    assert cache.is_in_executed_queries("b")
+    assert not cache.is_in_executed_queries("a")
+    assert cache.is_in_executed_queries("d")
+
+    expected = df.groupby("city", dropna=False).size().value_counts().pow(2).sum()
+    assert len(result) == expected
+
+
+def _count_by_pipeline(column):
+    pipeline = SQLPipeline()
+    pipeline.enqueue_sql(
+        f"select {column}, count(*) as n from __splink__df_concat group by {column}",
+        f"__splink__df_count_by_{column}",
+    )
+    return pipeline
+
+
+def test_independent_pipelines_executed_concurrently(monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    columns = ["first_name", "surname", "city", "email"]
+
+    linker = DuckDBLinker(df, get_settings_dict())
+    df_concat = linker._initialise_df_concat(materialise=True)
+    pipelines = [_count_by_pipeline(c) for c in columns]
+    results = linker._execute_sql_pipelines_concurrently(pipelines, [df_concat])
+
+    for column, result in zip(columns, results):
+        assert result.templated_name == f"__splink__df_count_by_{column}"
+        counts = {
+            r[column]: r["n"] for r in result.as_record_dict() if r[column] is not None
+        }
+        assert counts == df[column].value_counts().to_dict()
+
+    # Re-running retrieves each result from the cache
+    pipelines = [_count_by_pipeline(c) for c in columns]
+    results_again = linker._execute_sql_pipelines_concurrently(pipelines, [df_concat])
+    assert [r.physical_name for r in results_again] == [
+        r.physical_name for r in results
+    ]
+
+
+def test_pipelines_reading_registered_dataframes_run_on_main_connection(
+    monkeypatch,
+):
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    linker = DuckDBLinker(df, get_settings_dict())
+    linker.register_table(df, "input_table")
+
+    pipelines = []
+    for column in ["first_name", "surname"]:
+        pipeline = SQLPipeline()
+        pipeline.enqueue_sql(
+            f"select distinct {column} from input_table", f"__splink__{column}"
+        )
+        pipelines.append(pipeline)
+
+    assert not linker._can_execute_concurrently(pipelines[0].queue[0].sql)
+    results = linker._execute_sql_pipelines_concurrently(pipelines)
+    assert len(results[0].as_pandas_dataframe()) == df["first_name"].nunique() + 1
+
+
+def test_term_frequency_tables_computed_concurrently(monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    settings = get_settings_dict()
+    surname_exact_match = settings["comparisons"][1]["comparison_levels"][1]
+    surname_exact_match["tf_adjustment_column"] = "surname"
+
+    linker = DuckDBLinker(df, settings)
+    concat_with_tf = linker._initialise_df_concat_with_tf().as_pandas_dataframe()
+
+    cache = linker._intermediate_table_cache
+    assert "__splink__df_tf_first_name" in cache
+    assert "__splink__df_tf_surname" in cache
+
+    expected = df["surname"].value_counts(normalize=True)
+    tf = concat_with_tf.dropna(subset=["surname"]).set_index("surname")
+    tf = tf["tf_surname"].groupby(level=0).first()
+    assert (tf - expected.reindex(tf.index)).abs().max() < 1e-9
@@ -0,0 +1,43 @@
+import sqlglot.expressions as exp
+
+from splink.settings import Settings
+from splink.sqlglot_cache import parse_one, sqlglot_cache_info
+
+from .basic_settings import get_settings_dict
+
+
+def test_cached_parse_returns_independent_trees():
+    sql = "levenshtein(first_name_l, first_name_r) <= 2"
+    hits_before = sqlglot_cache_info()["parse_one"].hits
+
+    tree = parse_one(sql, read="duckdb")
+    original_sql = tree.sql()
+    for col in tree.find_all(exp.Column):
+        col.set("table", exp.to_identifier("l"))
+    assert tree.sql() != original_sql
+
+    # Modifying the tree must not affect the cached version
+    assert parse_one(sql, read="duckdb").sql() == original_sql
+    assert sqlglot_cache_info()["parse_one"].hits > hits_before
+
+
+def test_memoised_sql_fragments_track_parameters_and_options():
+    settings_obj = Settings(get_settings_dict())
+
+    cols = settings_obj._columns_to_select_for_bayes_factor_parts
+    assert cols == settings_obj._columns_to_select_for_bayes_factor_parts
+    # Callers can't modify the memoised value
+    cols.append("extra")
+    assert "extra" not in settings_obj._columns_to_select_for_bayes_factor_parts
+    cols.pop()
+
+    # Bayes factors are embedded in the sql, so must change with the parameters
+    exact_match_level = settings_obj.comparisons[0].comparison_levels[1]
+    exact_match_level.m_probability = 0.5
+    assert settings_obj._columns_to_select_for_bayes_factor_parts != cols
+
+    settings_obj._retain_intermediate_calculation_columns = True
+    with_intermediate = settings_obj._columns_to_select_for_predict
+    settings_obj._retain_intermediate_calculation_columns = False
+    without_intermediate = settings_obj._columns_to_select_for_predict
+    assert len(with_intermediate) > len(without_intermediate)